@@ -4,3 +4,8 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = "api"
+
+    def ready(self):
+        from api_yamdb import checks  # noqa: F401
+
+        from . import signals  # noqa: F401
@@ -0,0 +1,391 @@
+"""
+Нагрузочные сценарии API: прогон через WSGI-приложение в том же
+процессе, перцентили задержки, пропускная способность, запросы к БД и
+пиковая память на запрос, сравнение с сохранённым baseline.
+"""
+import asyncio
+import io
+import json
+import os
+import platform
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.sql_instrumentation import QueryRecorder  # isort:skip
+from reviews.models import Category, Genre, Title  # isort:skip
+
+User = get_user_model()
+
+# Префикс данных generate_data, засеянных для замеров.
+BENCHMARK_PREFIX = "benchmark"
+ADMIN_USERNAME = f"{BENCHMARK_PREFIX}_admin"
+BENCHMARK_NAMESPACES = ("api", "users")
+THROTTLE_CACHE_ALIAS = "benchmark_throttle"
+
+# Сохранённый baseline, с которым по умолчанию сравнивается прогон, и
+# параметры засева, на которых он записан: с другими объёмами данных
+# сравнение не имеет смысла.
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json"
+)
+DATA_OPTIONS = ("titles", "reviews", "comments", "users", "seed")
+
+# path и data — шаблоны: {title}, {review}, {comment}, {username},
+# {category}, {genre} берутся из засеянных данных, {n} — номер запроса,
+# {run} — id прогона.
+Scenario = namedtuple(
+    "Scenario", ("name", "url_name", "method", "path", "role", "data")
+)
+
+SCENARIOS = (
+    Scenario("titles-list", "api:title-list", "GET",
+             "/api/v1/titles/", "anon", None),
+    Scenario("titles-list-filtered", "api:title-list", "GET",
+             "/api/v1/titles/?genre={genre}&ordering=-rating",
+             "user", None),
+    Scenario("titles-list-cursor", "api:title-list", "GET",
+             "/api/v1/titles/?pagination=cursor", "user", None),
+    Scenario("titles-search", "api:title-list", "GET",
+             "/api/v1/titles/?search=legend", "user", None),
+    Scenario("titles-top", "api:title-top", "GET",
+             "/api/v1/titles/top/?genre={genre}", "user", None),
+    Scenario("titles-facets", "api:title-facets", "GET",
+             "/api/v1/titles/facets/?genre={genre}&year=2000",
+             "user", None),
+    Scenario("title-detail", "api:title-detail", "GET",
+             "/api/v1/titles/{title}/", "user", None),
+    Scenario("title-update", "api:title-detail", "PATCH",
+             "/api/v1/titles/{title}/", "admin",
+             {"description": "run {run} #{n}"}),
+    Scenario("title-create", "api:title-list", "POST",
+             "/api/v1/titles/", "admin",
+             {"name": "bench {run} {n}", "year": 2000,
+              "category": "{category}", "genre": ["{genre}"]}),
+    Scenario("titles-bulk", "api:title-bulk", "POST",
+             "/api/v1/titles/bulk/", "admin",
+             [{"name": "bulk {run} {n} a", "year": 2001,
+               "category": "{category}", "genre": ["{genre}"]},
+              {"name": "bulk {run} {n} b", "year": 2002,
+               "category": "{category}", "genre": ["{genre}"]}]),
+    Scenario("genres-list", "api:genre-list", "GET",
+             "/api/v1/genres/", "anon", None),
+    Scenario("genre-delete-missing", "api:genre-detail", "DELETE",
+             "/api/v1/genres/missing-{run}/", "admin", None),
+    Scenario("categories-list", "api:category-list", "GET",
+             "/api/v1/categories/", "anon", None),
+    Scenario("category-delete-missing", "api:category-detail", "DELETE",
+             "/api/v1/categories/missing-{run}/", "admin", None),
+    Scenario("reviews-list", "api:review-list", "GET",
+             "/api/v1/titles/{title}/reviews/", "user", None),
+    Scenario("reviews-list-deep-page", "api:review-list", "GET",
+             "/api/v1/titles/{title}/reviews/?page=3", "user", None),
+    Scenario("review-detail", "api:review-detail", "GET",
+             "/api/v1/titles/{title}/reviews/{review}/", "user", None),
+    Scenario("comments-list", "api:comment-list", "GET",
+             "/api/v1/titles/{title}/reviews/{review}/comments/",
+             "user", None),
+    Scenario("comment-create", "api:comment-list", "POST",
+             "/api/v1/titles/{title}/reviews/{review}/comments/",
+             "user", {"text": "run {run} #{n}"}),
+    Scenario("comment-detail", "api:comment-detail", "GET",
+             "/api/v1/titles/{title}/reviews/{review}/comments/{comment}/",
+             "user", None),
+    Scenario("reference", "api:reference", "GET",
+             "/api/v1/reference/", "anon", None),
+    Scenario("cache-stats", "api:cache_stats", "GET",
+             "/api/v1/cache-stats/", "admin", None),
+    Scenario("export-genres", "api:export", "GET",
+             "/api/v1/export/genre/", "admin", None),
+    Scenario("signup", "users:signup", "POST",
+             "/api/v1/auth/signup/", "anon",
+             {"username": "bench_{run}_{n}",
+              "email": "bench_{run}_{n}@example.com"}),
+    Scenario("token-invalid-code", "users:obtain_token", "POST",
+             "/api/v1/auth/token/", "anon",
+             {"username": "{username}", "confirmation_code": "wrong"}),
+    Scenario("users-list", "users:user-list", "GET",
+             "/api/v1/users/", "admin", None),
+    Scenario("user-detail", "users:user-detail", "GET",
+             "/api/v1/users/{username}/", "admin", None),
+    Scenario("users-me", "users:user-me", "GET",
+             "/api/v1/users/me/", "user", None),
+)
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def route_names(namespaces=BENCHMARK_NAMESPACES):
+    """Имена всех маршрутов указанных namespace'ов (кроме api-root)."""
+
+    def walk(patterns, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(
+                    pattern.url_patterns, pattern.namespace or namespace
+                )
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                if namespace in namespaces and pattern.name != "api-root":
+                    yield f"{namespace}:{pattern.name}"
+
+    return set(walk(get_resolver().url_patterns, None))
+
+
+def uncovered_routes(scenarios=SCENARIOS):
+    return sorted(route_names() - {s.url_name for s in scenarios})
+
+
+def fixture_values():
+    """Объекты для подстановки в пути сценариев: самые «тяжёлые»."""
+    title = Title.objects.filter(
+        category__slug__startswith=f"{BENCHMARK_PREFIX}-"
+    ).order_by("-rating_count", "pk").first()
+    review = title and title.reviews.order_by(
+        "-comments_count", "pk"
+    ).first()
+    comment = review and review.comments.order_by("pk").first()
+    genre = Genre.objects.filter(
+        slug__startswith=f"{BENCHMARK_PREFIX}-"
+    ).order_by("pk").first()
+    user = User.objects.filter(
+        username__startswith=f"{BENCHMARK_PREFIX}_"
+    ).exclude(username=ADMIN_USERNAME).order_by("pk").first()
+    if not (title and review and comment and genre and user):
+        raise LookupError(
+            "No benchmark data: seed it first (without --no-seed)."
+        )
+    return {
+        "title": title.pk,
+        "review": review.pk,
+        "comment": comment.pk,
+        "category": Category.objects.get(pk=title.category_id).slug,
+        "genre": genre.slug,
+        "username": user.username,
+    }
+
+
+def tokens(username):
+    admin, _ = User.objects.get_or_create(
+        username=ADMIN_USERNAME,
+        defaults={"email": f"{ADMIN_USERNAME}@example.com",
+                  "role": User.ADMIN},
+    )
+    return {
+        "anon": None,
+        "user": str(AccessToken.for_user(User.objects.get(username=username))),
+        "admin": str(AccessToken.for_user(admin)),
+    }
+
+
+def render(template, values):
+    if isinstance(template, str):
+        return template.format(**values)
+    if isinstance(template, list):
+        return [render(item, values) for item in template]
+    if isinstance(template, dict):
+        return {key: render(item, values) for key, item in template.items()}
+    return template
+
+
+def benchmark_settings(cold=False):
+    """Настройки на время замеров.
+
+    Троттлинг замерял бы сам себя, поэтому его корзины — в DummyCache и
+    всегда полны. ``cold`` отключает и остальные кэши: каждый запрос
+    доходит до БД.
+    """
+    dummy = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    caches = {
+        alias: dummy if cold else config
+        for alias, config in settings.CACHES.items()
+    }
+    caches[THROTTLE_CACHE_ALIAS] = dummy
+    return override_settings(
+        CACHES=caches, THROTTLE_CACHE_ALIAS=THROTTLE_CACHE_ALIAS
+    )
+
+
+class WSGIClient:
+    """Вызывает WSGI-приложение проекта напрямую, без сети."""
+
+    def __init__(self):
+        self.app = get_wsgi_application()
+
+    def request(self, method, path, data=None, token=None):
+        path, _, query = path.partition("?")
+        body = b"" if data is None else json.dumps(data).encode()
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+        if token:
+            environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        setup_testing_defaults(environ)
+        status = []
+        result = self.app(
+            environ, lambda line, headers, exc_info=None: status.append(line)
+        )
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return int(status[0].split()[0])
+
+
+async def fetch(port, request):
+    """Один HTTP-запрос к серверу на localhost по отдельному соединению;
+    возвращает код ответа.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def wait_for_port(port, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+        else:
+            writer.close()
+            return
+
+
+class ScenarioRunner:
+
+    def __init__(self, requests, warmup, concurrency):
+        self.requests = requests
+        self.warmup = warmup
+        self.concurrency = concurrency
+        self.client = WSGIClient()
+        self.values = {**fixture_values(), "run": uuid.uuid4().hex[:8]}
+        self.tokens = tokens(self.values["username"])
+        self.counter = iter(range(10 ** 9))
+        self.counter_lock = threading.Lock()
+
+    def call(self, scenario):
+        with self.counter_lock:
+            number = next(self.counter)
+        values = {**self.values, "n": number}
+        return self.client.request(
+            scenario.method,
+            render(scenario.path, values),
+            render(scenario.data, values),
+            self.tokens[scenario.role],
+        )
+
+    def run(self, scenario):
+        for _ in range(self.warmup):
+            self.call(scenario)
+
+        timings, queries, statuses = [], [], Counter()
+        for _ in range(self.requests):
+            recorder = QueryRecorder()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                started = time.perf_counter()
+                statuses[self.call(scenario)] += 1
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(recorder.count)
+
+        tracemalloc.start()
+        self.call(scenario)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            "p50_ms": round(percentile(timings, 0.50), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "p99_ms": round(percentile(timings, 0.99), 3),
+            "rps": round(self.throughput(scenario), 1),
+            "queries": max(queries),
+            "peak_kb": round(peak / 1024, 1),
+            "statuses": {str(code): count for code, count in statuses.items()},
+        }
+
+    def throughput(self, scenario):
+        """Запросов в секунду при ``concurrency`` параллельных потоках."""
+
+        def worker(count):
+            try:
+                for _ in range(count):
+                    self.call(scenario)
+            finally:
+                connections.close_all()
+
+        shares = [
+            self.requests // self.concurrency
+            + (1 if index < self.requests % self.concurrency else 0)
+            for index in range(self.concurrency)
+        ]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(worker, shares))
+        return self.requests / (time.perf_counter() - started)
+
+
+def host_fingerprint():
+    """Машина прогона: задержка и память сравнимы только на той же."""
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count()} cpu"
+
+
+def compare(results, baseline, tolerance, slack_ms, timings=False):
+    """Регрессии относительно baseline: число запросов к БД — строго;
+    с timings ещё задержка p95 и память — с допуском. Их имеет смысл
+    сравнивать только на той же СУБД и машине, что и baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["queries"] > base["queries"]:
+            regressions.append(
+                f"{name}: {result['queries']} queries > {base['queries']}"
+            )
+        if not timings:
+            continue
+        limit = base["p95_ms"] * (1 + tolerance) + slack_ms
+        if result["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']} ms > {limit:.3f} ms"
+            )
+        memory_limit = base["peak_kb"] * (1 + tolerance)
+        if result["peak_kb"] > memory_limit:
+            regressions.append(
+                f"{name}: peak {result['peak_kb']} KiB > "
+                f"{memory_limit:.1f} KiB"
+            )
+    return regressions
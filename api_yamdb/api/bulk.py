@@ -0,0 +1,212 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+
+from .serializers import TitleSerializer, missing_references
+
+from reviews.models import Title  # isort:skip
+from reviews.signals import bulk_changed  # isort:skip
+
+DUPLICATE_ERRORS = {"non_field_errors": ["Title already exists."]}
+UPDATE_FIELDS = ("name", "year", "description", "category", "modified")
+
+
+def _item_error(index, errors, item_status=status.HTTP_400_BAD_REQUEST):
+    return {"index": index, "status": item_status, "errors": errors}
+
+
+def bulk_create_titles(items, context):
+    """
+    Создаёт пачку произведений, не прерываясь на ошибках отдельных
+    элементов.
+
+    Поля проверяются TitleSerializer'ом (slug'и - через реестр, без
+    запросов), дубликаты названий ищутся одним запросом на всю пачку,
+    строки вставляются bulk_create, связи с жанрами - одной вставкой в
+    through-таблицу. Возвращает результаты по элементам в исходном порядке.
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = TitleSerializer(
+            data=item, context={**context, "bulk": True}
+        )
+        if serializer.is_valid():
+            valid.append((index, None, serializer.validated_data))
+        else:
+            results[index] = _item_error(index, serializer.errors)
+
+    _write(_unique_entries(valid, results), _insert_titles, results,
+           status.HTTP_201_CREATED)
+    return results
+
+
+def bulk_update_titles(items, context):
+    """
+    Частично обновляет пачку произведений: элемент - поля PATCH вместе
+    с id. Произведения загружаются одним запросом, дальше - как при
+    создании: дубликаты ищутся на всю пачку, строки пишутся bulk_update,
+    жанры заменяются одним удалением и одной вставкой.
+    """
+    results = [None] * len(items)
+    pks = [item.get("id") if isinstance(item, dict) else None
+           for item in items]
+    titles = Title.objects.in_bulk(
+        {pk for pk in pks if type(pk) is int}
+    )
+    seen = set()
+    valid = []
+    for index, (item, pk) in enumerate(zip(items, pks)):
+        if pk is None:
+            results[index] = _item_error(
+                index, {"id": ["This field is required."]}
+            )
+            continue
+        if pk in seen:
+            results[index] = _item_error(
+                index, {"id": ["Duplicate id in request."]}
+            )
+            continue
+        title = titles.get(pk) if type(pk) is int else None
+        if title is None:
+            results[index] = _item_error(
+                index, {"detail": "Not found."}, status.HTTP_404_NOT_FOUND
+            )
+            continue
+        seen.add(pk)
+        serializer = TitleSerializer(
+            title, data=item, partial=True,
+            context={**context, "bulk": True}
+        )
+        if serializer.is_valid():
+            valid.append((index, title, serializer.validated_data))
+        else:
+            results[index] = _item_error(index, serializer.errors)
+
+    _write(_unique_entries(valid, results), _update_titles, results,
+           status.HTTP_200_OK)
+    return results
+
+
+def _title_key(title, data):
+    """Уникальная пара (название, категория) после записи элемента."""
+    category = data.get("category")
+    return (
+        data.get("name", title.name if title else None),
+        category.pk if category else title.category_id,
+    )
+
+
+def _unique_entries(entries, results):
+    """
+    Отбрасывает элементы, чья пара (название, категория) уже занята
+    в базе или предыдущим элементом пачки; один запрос на всю пачку.
+    """
+    keys = {_title_key(title, data) for _, title, data in entries}
+    existing = set(
+        Title.objects.filter(
+            name__in={name for name, _ in keys},
+            category_id__in={category_id for _, category_id in keys},
+        ).exclude(
+            # Обновляемые строки займут новые пары.
+            pk__in=[title.pk for _, title, _ in entries if title]
+        ).values_list("name", "category_id")
+    )
+    unique = []
+    for index, title, data in entries:
+        key = _title_key(title, data)
+        if key in existing:
+            results[index] = _item_error(index, DUPLICATE_ERRORS)
+            continue
+        existing.add(key)
+        unique.append((index, title, data))
+    return unique
+
+
+def _write(entries, write, results, success_status):
+    """
+    Пишет элементы одной транзакцией. Если её нарушает запись, сделанная
+    другим запросом после проверок (то же название, удалённые жанр или
+    категория), элементы пишутся по одному, и ошибку получают только
+    нарушившие.
+    """
+    try:
+        with transaction.atomic():
+            written = write(entries)
+    except IntegrityError:
+        written = []
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    written += write([entry])
+            except IntegrityError:
+                index, _, data = entry
+                results[index] = _item_error(
+                    index, missing_references(data) or DUPLICATE_ERRORS
+                )
+    if written:
+        bulk_changed.send(sender=Title, pks=[pk for _, pk in written])
+    for index, pk in written:
+        results[index] = {"index": index, "status": success_status,
+                          "id": pk}
+
+
+def _insert_titles(entries):
+    titles = Title.objects.bulk_create(
+        Title(
+            name=data["name"],
+            year=data["year"],
+            description=data.get("description"),
+            category=data["category"],
+        )
+        for _, _, data in entries
+    )
+    _fill_missing_pks(titles)
+    _add_genres(zip(titles, entries))
+    return [(index, title.pk) for title, (index, _, _) in zip(titles, entries)]
+
+
+def _update_titles(entries):
+    now = timezone.now()
+    for _, title, data in entries:
+        for field in UPDATE_FIELDS[:-1]:
+            if field in data:
+                setattr(title, field, data[field])
+        title.modified = now
+    Title.objects.bulk_update(
+        [title for _, title, _ in entries], UPDATE_FIELDS
+    )
+    with_genres = [(entry[1], entry) for entry in entries
+                   if "genre" in entry[2]]
+    Title.genre.through.objects.filter(
+        title_id__in=[title.pk for title, _ in with_genres]
+    ).delete()
+    _add_genres(with_genres)
+    return [(index, title.pk) for index, title, _ in entries]
+
+
+def _add_genres(titles_and_entries):
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.pk, genre_id=genre_id)
+        for title, (_, _, data) in titles_and_entries
+        for genre_id in {genre.pk for genre in data.get("genre", ())}
+    )
+
+
+def _fill_missing_pks(titles):
+    """
+    Только PostgreSQL возвращает id из bulk_create; на остальных СУБД
+    находим их по уникальной паре (название, категория).
+    """
+    missing = [title for title in titles if title.pk is None]
+    if not missing:
+        return
+    pks = {
+        (name, category_id): pk
+        for pk, name, category_id in Title.objects.filter(
+            name__in={title.name for title in missing},
+            category_id__in={title.category_id for title in missing},
+        ).values_list("pk", "name", "category_id")
+    }
+    for title in missing:
+        title.pk = pks[(title.name, title.category_id)]
@@ -0,0 +1,142 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+GENERATION_KEY = "api:generation:{label}"
+RESPONSE_KEY = "api:response:{name}:{digest}"
+STATS_KEY = "api:stats:{name}:{event}"
+# Заголовки, которые хранятся вместе с данными ответа (валидаторы
+# api.conditional): попадание в кэш отдаёт их без пересчёта.
+CACHED_HEADERS = ("ETag", "Last-Modified")
+
+# Имена кэшируемых viewset'ов, для которых ведётся статистика.
+CACHED_VIEWS = set()
+
+
+def get_api_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _generation_key(model):
+    return GENERATION_KEY.format(label=model._meta.label_lower)
+
+
+def get_generations(models):
+    """
+    Возвращает текущие поколения моделей. Отсутствующий счётчик
+    (новый процесс с locmem или вытеснение) заводится заново от текущего
+    времени, чтобы не совпасть с поколениями уже закэшированных ответов.
+    """
+    cache = get_api_cache()
+    keys = [_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return tuple(generations[key] for key in keys)
+
+
+def bump_generation(model):
+    """Инвалидирует все ответы, зависящие от модели."""
+    cache = get_api_cache()
+    key = _generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def _record(name, event):
+    cache = get_api_cache()
+    key = STATS_KEY.format(name=name, event=event)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_cache_stats():
+    cache = get_api_cache()
+    stats = {}
+    for name in sorted(CACHED_VIEWS):
+        hits = cache.get(STATS_KEY.format(name=name, event="hit"), 0)
+        misses = cache.get(STATS_KEY.format(name=name, event="miss"), 0)
+        total = hits + misses
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    Кэширует ответы list/retrieve viewset'а.
+
+    Ключ строится из пути, отсортированной строки запроса, роли
+    пользователя и поколений моделей из ``cache_dependencies``; запись
+    в любую из них сдвигает поколение (см. api.signals), и старые ответы
+    просто перестают находиться, а потом вытесняются по TTL. Поколения
+    видны всем процессам, только если API_CACHE_ALIAS - общий кэш.
+    Вместе с данными хранятся заголовки CACHED_HEADERS.
+    """
+    cache_name = None
+    cache_dependencies = ()
+    cache_timeout = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_name:
+            CACHED_VIEWS.add(cls.cache_name)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cache_key(self, request):
+        user = request.user
+        role = user.role if user.is_authenticated else "anonymous"
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        raw = "|".join((
+            request.path,
+            query,
+            role,
+            repr(get_generations(self.cache_dependencies)),
+        ))
+        return RESPONSE_KEY.format(
+            name=self.cache_name,
+            digest=hashlib.md5(raw.encode()).hexdigest()
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_api_cache()
+        key = self.get_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            _record(self.cache_name, "hit")
+            data, headers = entry
+            return Response(data, headers={**headers, "X-Cache": "HIT"})
+
+        _record(self.cache_name, "miss")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.cache_timeout
+            if timeout is None:
+                timeout = settings.API_CACHE_TIMEOUT
+            headers = {
+                header: response[header]
+                for header in CACHED_HEADERS if response.has_header(header)
+            }
+            cache.set(key, (response.data, headers), timeout)
+        response["X-Cache"] = "MISS"
+        return response
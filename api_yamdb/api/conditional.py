@@ -0,0 +1,72 @@
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+
+class ConditionalGetMixin:
+    """
+    Сильный ETag для list/retrieve и Last-Modified для retrieve.
+
+    Валидаторы строятся из того, что ответ и так загрузил: ETag - хеш
+    данных ответа (страницы списка вместе с count или карточки), то есть
+    только значений из БД, одинаковых во всех процессах; Last-Modified -
+    поле modified загруженной строки. Отдельных запросов для валидаторов
+    нет. Миксин стоит после CachedResponseMixin: заголовки сохраняются
+    вместе с закэшированным ответом, а If-None-Match и If-Modified-Since
+    проверяются в finalize_response, поэтому попадание в кэш отдаёт 304
+    без обращения к БД и без рендеринга.
+
+    Список не отдаёт Last-Modified: Max(modified) не меняется при
+    удалении строки, и If-Modified-Since получал бы 304 на устаревший
+    список.
+    """
+    version_field = "modified"
+
+    def list(self, request, *args, **kwargs):
+        return self.set_validators(super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.set_validators(
+            super().retrieve(request, *args, **kwargs)
+        )
+
+    def get_object(self):
+        instance = super().get_object()
+        self.last_modified = getattr(instance, self.version_field)
+        return instance
+
+    def get_etag(self, data):
+        raw = JSONRenderer().render(data)
+        # Представление зависит от выбранного рендерера (JSON, browsable).
+        media_type = self.request.accepted_renderer.media_type.encode()
+        return quote_etag(hashlib.md5(media_type + b"|" + raw).hexdigest())
+
+    def set_validators(self, response):
+        if response.status_code != 200:
+            return response
+        response["ETag"] = self.get_etag(response.data)
+        last_modified = getattr(self, "last_modified", None)
+        if self.action == "retrieve" and last_modified is not None:
+            response["Last-Modified"] = http_date(
+                timegm(last_modified.utctimetuple())
+            )
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (request.method in ("GET", "HEAD")
+                and response.status_code == 200
+                and response.has_header("ETag")):
+            not_modified = get_conditional_response(
+                request,
+                etag=response["ETag"],
+                last_modified=parse_http_date_safe(
+                    response.get("Last-Modified", "")
+                ),
+                response=response,
+            )
+            if not_modified is not None:
+                response = not_modified
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,114 @@
+from rest_framework import serializers
+
+from reviews import registry  # isort:skip
+from reviews.models import HISTOGRAM_FIELDS, Title  # isort:skip
+
+_datetime_field = serializers.DateTimeField()
+
+
+class FastListSerializer:
+    """
+    Read-only list serialization straight from ``.values()`` rows,
+    without model instances and per-field serializer dispatch.
+
+    ``fields`` lists the output keys in order as ``(key, source,
+    convert)``: ``source`` is the ``.values()`` column and ``convert``
+    an optional callable applied to its value. Output must stay
+    byte-identical to the ModelSerializer it replaces, see
+    tests/test_fast_serializers.py.
+    """
+    fields = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.values = tuple(source for _, source, _ in self.fields)
+
+    def get_rows(self, queryset):
+        return queryset.prefetch_related(None).values(*self.values)
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        return {
+            key: row[source] if convert is None else convert(row[source])
+            for key, source, convert in self.fields
+        }
+
+
+def get_genre_map(title_ids):
+    """
+    Жанры произведений страницы одним запросом к through-таблице:
+    {title_id: [...]}; названия берутся из реестра жанров.
+    """
+    genre_map = {}
+    through_rows = (
+        Title.genre.through.objects
+             .filter(title_id__in=title_ids)
+             .order_by("title_id", "-genre_id")
+             .values_list("title_id", "genre_id")
+    )
+    for title_id, genre_id in through_rows:
+        genre_map.setdefault(title_id, []).append(
+            registry.genres.get_representation(genre_id)
+        )
+    return genre_map
+
+
+class TitleListSerializer(FastListSerializer):
+    """Mirrors TitleReadOnlySerializer."""
+    fields = (
+        ("id", "id", None),
+        ("name", "name", None),
+        ("year", "year", None),
+        ("description", "description", None),
+    )
+
+    def __init__(self, context=None):
+        super().__init__(context)
+        self.values += ("category_id", "rating")
+        self.include_histogram = self.context.get("include_histogram")
+        if self.include_histogram:
+            self.values += HISTOGRAM_FIELDS
+
+    def serialize(self, rows):
+        rows = list(rows)
+        self.genre_map = get_genre_map([row["id"] for row in rows])
+        return super().serialize(rows)
+
+    def to_representation(self, row):
+        rating = row["rating"]
+        representation = super().to_representation(row)
+        representation.update({
+            "genre": self.genre_map.get(row["id"], []),
+            "category": registry.categories.get_representation(
+                row["category_id"]
+            ),
+            "rating": None if rating is None else int(rating),
+        })
+        if self.include_histogram:
+            representation["histogram"] = [
+                row[field] for field in HISTOGRAM_FIELDS
+            ]
+        return representation
+
+
+class ReviewListSerializer(FastListSerializer):
+    """Mirrors ReviewSerializer."""
+    fields = (
+        ("id", "id", None),
+        ("author", "author__username", None),
+        ("text", "text", None),
+        ("score", "score", None),
+        ("pub_date", "pub_date", _datetime_field.to_representation),
+    )
+
+
+class CommentListSerializer(FastListSerializer):
+    """Mirrors CommentSerializer."""
+    fields = (
+        ("id", "id", None),
+        ("text", "text", None),
+        ("author", "author__username", None),
+        ("pub_date", "pub_date", _datetime_field.to_representation),
+    )
@@ -1,13 +1,39 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
+
+from .search import rank_queryset, search_queryset
 
 from reviews.models import Title  # isort:skip
 
 
 class GenreFilter(filters.FilterSet):
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
+    search = filters.CharFilter(method="filter_search")
     category = filters.CharFilter(field_name="category__slug")
     genre = filters.CharFilter(field_name="genre__slug")
+    rating_min = filters.NumberFilter(field_name="rating", lookup_expr="gte")
+    rating_max = filters.NumberFilter(field_name="rating", lookup_expr="lte")
 
     class Meta:
         model = Title
         fields = ("name", "category", "genre__slug", "year")
+
+    def filter_search(self, queryset, name, value):
+        """Поиск по названию с сортировкой по релевантности."""
+        return search_queryset(queryset, "name", value, ranked=True)
+
+
+class RankedSearchFilter(SearchFilter):
+    """
+    SearchFilter, сортирующий найденное по релевантности первого поля.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        queryset = super().filter_queryset(request, queryset, view)
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        return rank_queryset(
+            queryset, search_fields[0], " ".join(search_terms)
+        )
@@ -0,0 +1,180 @@
+import json
+import logging
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api import benchmark  # isort:skip
+
+
+class Command(BaseCommand):
+    help = (u'Замер задержки, пропускной способности, числа запросов к БД '
+            u'и памяти для всех маршрутов API со сравнением с baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=100_000)
+        parser.add_argument("--reviews", type=int, default=5_000_000)
+        parser.add_argument("--comments", type=int, default=10_000_000)
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--no-seed", action="store_true",
+            help=u"Использовать уже засеянные данные"
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--scenarios", nargs="+", metavar="NAME",
+            help=u"Запустить только эти сценарии"
+        )
+        parser.add_argument(
+            "--baseline", default=benchmark.BASELINE_PATH,
+            help=u"JSON с результатами прошлого прогона"
+        )
+        parser.add_argument(
+            "--save-baseline", action="store_true",
+            help=u"Записать результаты в файл --baseline"
+        )
+        parser.add_argument(
+            "--no-baseline", action="store_true",
+            help=u"Не сравнивать с baseline"
+        )
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help=u"Допустимый рост p95 и пиковой памяти (доля); они "
+                 u"сравниваются, только если СУБД и машина совпадают "
+                 u"с baseline"
+        )
+        parser.add_argument(
+            "--slack-ms", type=float, default=1.0,
+            help=u"Абсолютный допуск p95, гасит шум быстрых запросов"
+        )
+        parser.add_argument("--output", help=u"Куда записать результаты")
+
+    def handle(self, *args, **options):
+        missing = benchmark.uncovered_routes()
+        if missing:
+            raise CommandError(
+                "Routes without a benchmark scenario: " + ", ".join(missing)
+            )
+        scenarios = self.select(options["scenarios"])
+        if not options["no_seed"]:
+            call_command(
+                "generate_data", prefix=benchmark.BENCHMARK_PREFIX,
+                titles=options["titles"], reviews=options["reviews"],
+                comments=options["comments"], users=options["users"],
+                seed=options["seed"], stdout=self.stdout,
+            )
+            # Топы после массовой вставки пересчитывает воркер очереди.
+            call_command("refresh_rankings", stdout=self.stdout)
+
+        with benchmark.benchmark_settings():
+            results = self.run(scenarios, options)
+
+        if options["output"]:
+            self.dump(options["output"], results)
+        self.check_baseline(results, options)
+
+    def select(self, names):
+        if not names:
+            return benchmark.SCENARIOS
+        known = {scenario.name: scenario for scenario in benchmark.SCENARIOS}
+        unknown = set(names) - set(known)
+        if unknown:
+            raise CommandError(
+                "Unknown scenarios: " + ", ".join(sorted(unknown))
+            )
+        return [known[name] for name in names]
+
+    def run(self, scenarios, options):
+        try:
+            runner = benchmark.ScenarioRunner(
+                options["requests"], options["warmup"], options["concurrency"]
+            )
+        except LookupError as error:
+            raise CommandError(error)
+        # Построчный лог каждого запроса исказил бы замеры; предупреждения
+        # о N+1 и бюджете остаются. Уровень задаётся после создания
+        # runner'а: get_wsgi_application() заново настраивает логирование.
+        logging.getLogger("api_yamdb.sql").setLevel(logging.WARNING)
+        self.stdout.write(
+            f"{'scenario':<26} {'p50':>8} {'p95':>8} {'p99':>8} "
+            f"{'rps':>8} {'queries':>7} {'peak KiB':>9}  statuses"
+        )
+        results = {}
+        for scenario in scenarios:
+            result = runner.run(scenario)
+            results[scenario.name] = result
+            self.stdout.write(
+                f"{scenario.name:<26} {result['p50_ms']:>8.2f} "
+                f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{result['rps']:>8.1f} {result['queries']:>7} "
+                f"{result['peak_kb']:>9.1f}  {result['statuses']}"
+            )
+        errors = [
+            name for name, result in results.items()
+            if any(code.startswith("5") for code in result["statuses"])
+        ]
+        if errors:
+            raise CommandError("Server errors in: " + ", ".join(errors))
+        return results
+
+    def dump(self, path, results):
+        with open(path, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    def check_baseline(self, results, options):
+        if options["no_baseline"]:
+            return
+        path = options["baseline"]
+        data = {name: options[name] for name in benchmark.DATA_OPTIONS}
+        if options["save_baseline"]:
+            self.dump(path, {
+                "data": data,
+                "database": connection.vendor,
+                "host": benchmark.host_fingerprint(),
+                "results": results,
+            })
+            self.stdout.write(f"Baseline saved to {path}")
+            return
+        baseline = self.load_baseline(path)
+        # С --no-seed объёмы уже засеянных данных неизвестны.
+        if not options["no_seed"] and baseline["data"] != data:
+            recorded = " ".join(
+                f"--{name} {value}" for name, value in baseline["data"].items()
+            )
+            raise CommandError(
+                f"Baseline {path} was recorded with {recorded}: rerun with "
+                "these volumes or pass --no-baseline"
+            )
+        environment = (connection.vendor, benchmark.host_fingerprint())
+        recorded = (baseline["database"], baseline.get("host"))
+        timings = recorded == environment
+        if not timings:
+            self.stderr.write(
+                f"Baseline {path} was recorded on {recorded[0]} at "
+                f"{recorded[1]}, this run uses {environment[0]} at "
+                f"{environment[1]}: comparing query counts only"
+            )
+        regressions = benchmark.compare(
+            results, baseline["results"],
+            options["tolerance"], options["slack_ms"], timings=timings,
+        )
+        if regressions:
+            raise CommandError(
+                "Performance regressions:\n" + "\n".join(regressions)
+            )
+        self.stdout.write(
+            self.style.SUCCESS("No regressions against baseline")
+        )
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise CommandError(
+                f"Baseline {path} not found, create it with --save-baseline"
+            )
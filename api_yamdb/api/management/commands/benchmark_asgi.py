@@ -0,0 +1,141 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from itertools import cycle
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import benchmark  # isort:skip
+from api_yamdb.asgi_bridge import is_read  # isort:skip
+
+SERVERS = {
+    "wsgi": ["api_yamdb.wsgi:application"],
+    "asgi": ["api_yamdb.asgi:application",
+             "--worker-class", "uvicorn.workers.UvicornWorker"],
+}
+
+
+class Command(BaseCommand):
+    help = (u'Сравнение пропускной способности чтения при одновременных '
+            u'соединениях: gunicorn с синхронными воркерами против '
+            u'uvicorn-воркеров с пулом потоков чтения')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--connections", type=int, default=64,
+            help=u"Одновременных клиентов, каждый шлёт запросы подряд",
+        )
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help=u"Процессов gunicorn в обоих вариантах",
+        )
+        parser.add_argument(
+            "--threads", type=int, default=None,
+            help=u"Потоков чтения на ASGI-воркер (ASGI_READ_THREADS)",
+        )
+        parser.add_argument(
+            "--cold", action="store_true",
+            help=u"Отключить кэши: каждый запрос доходит до БД",
+        )
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--startup-timeout", type=float, default=30,
+            help=u"Сколько секунд ждать запуска сервера",
+        )
+
+    def handle(self, *args, **options):
+        requests = self.read_requests()
+        self.stdout.write(
+            f"{len(requests)} read scenarios, {options['connections']} "
+            f"connections, {options['requests']} requests, "
+            f"{options['workers']} workers"
+        )
+        env = {
+            **os.environ,
+            "SQL_LOG_LEVEL": "WARNING",
+            "ASGI_READ_THREADS": str(
+                options["threads"] or settings.ASGI_READ_THREADS
+            ),
+        }
+        if options["cold"]:
+            env["CACHE_BACKEND"] = (
+                "django.core.cache.backends.dummy.DummyCache"
+            )
+        for name, server in SERVERS.items():
+            process = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", *server,
+                 "--workers", str(options["workers"]),
+                 "--bind", f"127.0.0.1:{options['port']}",
+                 "--log-level", "warning"],
+                cwd=settings.BASE_DIR, env=env,
+            )
+            try:
+                timings, statuses, elapsed = asyncio.run(
+                    self.load(requests, options)
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            self.report(name, timings, statuses, elapsed)
+
+    def read_requests(self):
+        """Готовые HTTP-запросы всех сценариев чтения, от пользователя:
+        у анонимов свой лимит чтения, он исказил бы замер.
+        """
+        try:
+            values = {**benchmark.fixture_values(), "run": "asgi", "n": 0}
+        except LookupError as error:
+            raise CommandError(error)
+        token = benchmark.tokens(values["username"])["user"]
+        requests = []
+        for scenario in benchmark.SCENARIOS:
+            path = benchmark.render(scenario.path, values)
+            if scenario.method == "GET" and is_read(
+                "GET", path.split("?")[0]
+            ):
+                requests.append((
+                    f"GET {path} HTTP/1.1\r\n"
+                    f"Host: 127.0.0.1\r\n"
+                    f"Authorization: Bearer {token}\r\n"
+                    f"Connection: close\r\n\r\n"
+                ).encode())
+        return requests
+
+    async def load(self, requests, options):
+        """Прогрев по запросу на соединение, затем замер."""
+        port = options["port"]
+        await benchmark.wait_for_port(port, options["startup_timeout"])
+        source = cycle(requests)
+        await asyncio.gather(*(
+            benchmark.fetch(port, next(source))
+            for _ in range(options["connections"])
+        ))
+
+        timings, statuses = [], []
+        shares = [[] for _ in range(options["connections"])]
+        for number in range(options["requests"]):
+            shares[number % len(shares)].append(next(source))
+
+        async def connection(share):
+            for request in share:
+                started = time.perf_counter()
+                statuses.append(await benchmark.fetch(port, request))
+                timings.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(connection(share) for share in shares))
+        return timings, statuses, time.perf_counter() - started
+
+    def report(self, name, timings, statuses, elapsed):
+        errors = sum(status >= 400 for status in statuses)
+        self.stdout.write(
+            f"{name}: {len(timings) / elapsed:>8.1f} rps  "
+            f"p50 {benchmark.percentile(timings, 0.50):>8.2f} ms  "
+            f"p95 {benchmark.percentile(timings, 0.95):>8.2f} ms  "
+            f"p99 {benchmark.percentile(timings, 0.99):>8.2f} ms  "
+            f"errors {errors}"
+        )
@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.benchmark import percentile  # isort:skip
+from api.search import search_queryset  # isort:skip
+from reviews.generator import WORDS  # isort:skip
+from reviews.models import Category, Title  # isort:skip
+
+
+class Command(BaseCommand):
+    help = u'Замер задержки поиска произведений по названию'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=1_000_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--keep", action="store_true",
+            help=u"Не откатывать созданные для замера произведения"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            self.seed_titles(rng, options["titles"], options["batch_size"])
+            terms = [self.make_term(rng) for _ in range(options["queries"])]
+            self.stdout.write(
+                search_queryset(Title.objects.all(), "name", terms[0])
+                .explain()
+            )
+            for ranked in (False, True):
+                self.measure(terms, ranked)
+            transaction.set_rollback(not options["keep"])
+
+    def seed_titles(self, rng, count, batch_size):
+        category, _ = Category.objects.get_or_create(
+            slug="benchmark", defaults={"name": "Benchmark"}
+        )
+        started = time.perf_counter()
+        for start in range(0, count, batch_size):
+            Title.objects.bulk_create(
+                Title(
+                    name=" ".join(rng.sample(WORDS, 3)) + f" {number}",
+                    year=rng.randint(1900, 2020),
+                    category=category,
+                )
+                for number in range(start, min(start + batch_size, count))
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Title._meta.db_table}")
+        self.stdout.write(
+            f"Создано {count} произведений "
+            f"за {time.perf_counter() - started:.1f} с."
+        )
+
+    def make_term(self, rng):
+        word = rng.choice(WORDS)
+        start = rng.randrange(len(word) - 3)
+        return word[start:start + rng.randint(3, len(word) - start)]
+
+    def measure(self, terms, ranked):
+        timings = []
+        for term in terms:
+            started = time.perf_counter()
+            list(search_queryset(
+                Title.objects.all(), "name", term, ranked=ranked
+            )[:10])
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f"{'ranked' if ranked else 'substring'}: "
+            f"p50={percentile(timings, 0.5):.1f} ms "
+            f"p95={percentile(timings, 0.95):.1f} ms "
+            f"p99={percentile(timings, 0.99):.1f} ms"
+        )
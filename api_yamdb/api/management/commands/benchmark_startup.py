@@ -0,0 +1,133 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import benchmark  # isort:skip
+
+# Профиль gunicorn.conf.py против запуска без preload и прогрева.
+PROFILES = {
+    "bare": {"GUNICORN_PRELOAD": "false", "GUNICORN_WARMUP": "false"},
+    "profile": {},
+}
+
+
+def memory_kb(pid):
+    """RSS и PSS процесса в КиБ (Linux); PSS делит общие страницы между
+    процессами, поэтому показывает выигрыш copy-on-write.
+    """
+    usage = {"rss": None, "pss": None}
+    for name, key, field in (("status", "rss", "VmRSS:"),
+                             ("smaps_rollup", "pss", "Pss:")):
+        try:
+            lines = Path(f"/proc/{pid}/{name}").read_text().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            if line.startswith(field):
+                usage[key] = int(line.split()[1])
+                break
+    return usage
+
+
+def child_pids(pid):
+    children = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue
+        if f"\nPPid:\t{pid}\n" in status:
+            children.append(int(entry.name))
+    return children
+
+
+class Command(BaseCommand):
+    help = (u'Время до первого ответа и память воркеров gunicorn: профиль '
+            u'gunicorn.conf.py против запуска без preload и прогрева')
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument(
+            "--worker-class", default="sync",
+            help=u"sync или uvicorn.workers.UvicornWorker",
+        )
+        parser.add_argument(
+            "--path", default=settings.WARMUP_PATHS[0],
+            help=u"Страница первого запроса",
+        )
+        parser.add_argument("--port", type=int, default=8766)
+        parser.add_argument("--startup-timeout", type=float, default=60)
+
+    def handle(self, *args, **options):
+        application = (
+            "api_yamdb.wsgi:application"
+            if options["worker_class"] == "sync"
+            else "api_yamdb.asgi:application"
+        )
+        request = (
+            f"GET {options['path']} HTTP/1.1\r\n"
+            f"Host: 127.0.0.1\r\nConnection: close\r\n\r\n"
+        ).encode()
+        for name, env in PROFILES.items():
+            started = time.monotonic()
+            process = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", application,
+                 "--config", "gunicorn.conf.py",
+                 "--workers", str(options["workers"]),
+                 "--worker-class", options["worker_class"],
+                 "--bind", f"127.0.0.1:{options['port']}"],
+                cwd=settings.BASE_DIR,
+                env={**os.environ, "SQL_LOG_LEVEL": "WARNING", **env},
+            )
+            try:
+                first, second = asyncio.run(self.probe(request, options))
+                ready = time.monotonic() - started
+                workers = self.worker_memory(process.pid, options)
+            finally:
+                process.terminate()
+                process.wait()
+            self.report(name, ready, first, second, workers)
+
+    def worker_memory(self, pid, options):
+        """Память воркеров, когда запустятся все."""
+        deadline = time.monotonic() + options["startup_timeout"]
+        children = child_pids(pid)
+        while (len(children) < options["workers"]
+               and time.monotonic() < deadline):
+            time.sleep(0.2)
+            children = child_pids(pid)
+        return [memory_kb(child) for child in children]
+
+    async def probe(self, request, options):
+        """Задержка первого и второго запроса после открытия порта."""
+        await benchmark.wait_for_port(
+            options["port"], options["startup_timeout"]
+        )
+        timings = []
+        for _ in range(2):
+            started = time.perf_counter()
+            await benchmark.fetch(options["port"], request)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def report(self, name, ready, first, second, workers):
+        def average(key):
+            values = [usage[key] for usage in workers if usage[key]]
+            if not values:
+                return "n/a"
+            return f"{sum(values) / len(values) / 1024:.1f} MiB"
+
+        self.stdout.write(
+            f"{name}: first response {ready:.2f} s after start, "
+            f"first request {first:.1f} ms, second {second:.1f} ms; "
+            f"{len(workers)} workers, RSS {average('rss')}, "
+            f"PSS {average('pss')} per worker"
+        )
@@ -1,4 +1,7 @@
-from rest_framework import filters
+from django.http import Http404
+from rest_framework.response import Response
+
+from .filters import RankedSearchFilter
 
 from users.permissions import IsAdminOrReadOnly  # isort:skip
 
@@ -7,8 +10,9 @@ class CommonViewSetMixin:
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = "slug"
     http_method_names = ['get', 'post', 'delete']
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (RankedSearchFilter,)
     search_fields = ('name',)
+    asgi_read_actions = ("list",)
 
 
 class NoAuthorUpdateMixin:
@@ -20,3 +24,63 @@ class NoAuthorUpdateMixin:
         """
         serializer.validated_data.pop("author", None)
         super().perform_update(serializer)  # type:ignore
+
+
+class FastListMixin:
+    """
+    Отдаёт list через сериализатор из api.fast_serializers, который
+    строит ответ из ``.values()`` без экземпляров моделей.
+    """
+    fast_list_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.fast_list_serializer_class(
+            context=self.get_serializer_context()
+        )
+        rows = serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+
+class RegistryListMixin:
+    """
+    Отдаёт list справочника из реестра процесса (reviews.registry) без
+    запроса к базе. Поиск и курсорная пагинация идут по queryset.
+    """
+    reference_registry = None
+
+    def list(self, request, *args, **kwargs):
+        if (RankedSearchFilter.search_param in request.query_params
+                or self.paginator.is_cursor_mode(request)):
+            return super().list(request, *args, **kwargs)
+        rows = self.reference_registry.as_list()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(rows)
+
+
+class ParentCounterMixin:
+    """
+    Для вложенных списков (отзывы, комментарии): общее количество берётся
+    из денормализованного счётчика родителя, а чтение родителя по
+    первичному ключу заодно проверяет, что он существует.
+    """
+    parent_model = None
+    parent_url_kwarg = None
+    parent_counter_field = None
+
+    def get_parent_count(self):
+        if not hasattr(self, "_parent_count"):
+            parents = self.parent_model.objects.filter(
+                pk=self.kwargs.get(self.parent_url_kwarg)
+            )
+            count = parents.values_list(
+                self.parent_counter_field, flat=True
+            ).first()
+            if count is None:
+                raise Http404
+            self._parent_count = count
+        return self._parent_count
@@ -0,0 +1,120 @@
+from functools import partial
+
+from django.core.paginator import Paginator
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       LimitOffsetPagination,
+                                       PageNumberPagination)
+from rest_framework.settings import api_settings
+
+
+class ModelOrderingCursorPagination(CursorPagination):
+    """
+    Пагинация по ключу в порядке Meta.ordering модели, который опирается
+    на индекс: дальние страницы стоят столько же, сколько первая, и
+    COUNT(*) не выполняется. Курсор привязан к этому порядку, поэтому
+    ?ordering= в этом режиме отклоняется с 400, а не игнорируется.
+    """
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def get_ordering(self, request, queryset, view):
+        if self.ordering_param in request.query_params:
+            raise ValidationError({
+                self.ordering_param: (
+                    "Ordering is not supported with cursor pagination."
+                )
+            })
+        return tuple(queryset.model._meta.ordering)
+
+
+class OptInCursorPagination(BasePagination):
+    """
+    По умолчанию постраничная пагинация, чтобы существующие клиенты
+    работали как раньше. Пагинация по ключу включается параметром
+    ?pagination=cursor (или переходом по ссылке с курсором).
+    """
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    offset_pagination_class = PageNumberPagination
+    cursor_pagination_class = ModelOrderingCursorPagination
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def get_paginator(self, request):
+        if self.is_cursor_mode(request):
+            return self.cursor_pagination_class()
+        return self.offset_pagination_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    @property
+    def display_page_controls(self):
+        paginator = getattr(self, "paginator", None)
+        return getattr(paginator, "display_page_controls", False)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_fields(self, view):
+        return (self.offset_pagination_class().get_schema_fields(view)
+                + self.cursor_pagination_class().get_schema_fields(view))
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.offset_pagination_class()
+                .get_schema_operation_parameters(view)
+            + self.cursor_pagination_class()
+                .get_schema_operation_parameters(view)
+        )
+
+
+class TitlePagination(OptInCursorPagination):
+    offset_pagination_class = LimitOffsetPagination
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Paginator Django, которому общее число передают готовым вместо
+    запроса COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+class ParentCountPageNumberPagination(PageNumberPagination):
+    """
+    Номера страниц с общим числом из денормализованного счётчика
+    родителя, view.get_parent_count().
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            KnownCountPaginator, count=view.get_parent_count()
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class NestedPagination(OptInCursorPagination):
+    """
+    Пагинация отзывов и комментариев: строка родителя читается один раз
+    по первичному ключу - и для проверки существования, и для общего
+    числа. В режиме курсора нужна только проверка существования.
+    """
+    offset_pagination_class = ParentCountPageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            view.get_parent_count()
+        return super().paginate_queryset(queryset, request, view)
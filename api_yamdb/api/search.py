@@ -0,0 +1,36 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Length
+
+
+def search_queryset(queryset, field, term, ranked=False):
+    """
+    Поиск подстроки в поле field.
+
+    icontains компилируется в UPPER(field::text) LIKE UPPER(...), что в
+    PostgreSQL обслуживают индексы UPPER(name) gin_trgm_ops из миграций
+    reviews. С ranked найденное сортируется по триграммному сходству в
+    PostgreSQL и по точному совпадению, префиксу и длине на остальных
+    СУБД (SQLite в тестах).
+    """
+    queryset = queryset.filter(**{f"{field}__icontains": term})
+    if ranked:
+        return rank_queryset(queryset, field, term)
+    return queryset
+
+
+def rank_queryset(queryset, field, term):
+    """Сортирует результаты поиска по релевантности term."""
+    if connections[queryset.db].vendor == "postgresql":
+        return queryset.annotate(
+            relevance=TrigramSimilarity(field, term)
+        ).order_by("-relevance", "-id")
+    return queryset.annotate(
+        relevance=Case(
+            When(**{f"{field}__iexact": term}, then=Value(0)),
+            When(**{f"{field}__istartswith": term}, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+    ).order_by("relevance", Length(field), "-id")
@@ -1,9 +1,15 @@
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import IntegrityError, router, transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 
+from reviews import registry  # isort:skip
 from reviews.models import (Category, Comment,  # isort:skip
                             Genre, Review, Title)
 
@@ -29,17 +35,63 @@ class GenreSerializer(NameSlugSerializer):
         model = Genre
 
 
+class RegistrySlugRelatedField(serializers.SlugRelatedField):
+    """
+    Resolves slugs through the in-process reference registry instead of
+    a query per slug.
+    """
+
+    def __init__(self, registry, **kwargs):
+        self.registry = registry
+        super().__init__(slug_field="slug", **kwargs)
+
+    def to_internal_value(self, data):
+        instance = self.registry.get_by_slug(smart_str(data))
+        if instance is None:
+            self.fail("does_not_exist", slug_name=self.slug_field,
+                      value=smart_str(data))
+        return instance
+
+
+def missing_references(validated_data):
+    """
+    Ошибки валидации для жанров и категории, которых уже нет в основной
+    базе, и сброс устаревшего реестра. Реестр другого процесса может
+    помнить удалённую запись, пока не заметит смену версии.
+    """
+    errors = {}
+    for field, reference_registry, instances in (
+        ("category", registry.categories,
+         [validated_data["category"]] if "category" in validated_data
+         else []),
+        ("genre", registry.genres, validated_data.get("genre", [])),
+    ):
+        model = reference_registry.model
+        existing = set(
+            model.objects.using(router.db_for_write(model)).filter(
+                pk__in=[instance.pk for instance in instances]
+            ).values_list("pk", flat=True)
+        )
+        missing = [instance.slug for instance in instances
+                   if instance.pk not in existing]
+        if missing:
+            reference_registry.invalidate()
+            errors[field] = [f"Object with slug={slug} does not exist."
+                             for slug in missing]
+    return errors
+
+
 class TitleSerializer(serializers.ModelSerializer):
     """
     Designated for title instance creation or update.
     """
-    genre = serializers.SlugRelatedField(
-        slug_field="slug",
+    genre = RegistrySlugRelatedField(
+        registry.genres,
         queryset=Genre.objects.all(),
         many=True,
     )
-    category = serializers.SlugRelatedField(
-        slug_field="slug",
+    category = RegistrySlugRelatedField(
+        registry.categories,
         queryset=Category.objects.all(),
     )
 
@@ -57,7 +109,9 @@ class TitleSerializer(serializers.ModelSerializer):
 
     def validate(self, validated_data):
         request = self.context.get("request")
-        if request and request.method == "POST":
+        # В пакетном режиме дубликаты проверяются одним запросом (api.bulk).
+        if (request and request.method == "POST"
+                and not self.context.get("bulk")):
             if Title.objects.filter(
                 name=validated_data.get("name"),
                 category=validated_data.get("category")
@@ -65,6 +119,29 @@ class TitleSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Title already exists.")
         return validated_data
 
+    def create(self, validated_data):
+        return self.save_checked(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self.save_checked(
+            partial(super().update, instance), validated_data
+        )
+
+    def save_checked(self, save, validated_data):
+        """
+        Сохраняет произведение с жанрами в одной транзакции; нарушение
+        внешнего ключа из-за устаревшего реестра - ошибка валидации.
+        """
+        try:
+            with transaction.atomic():
+                # create() забирает из словаря жанры (many-to-many).
+                return save(dict(validated_data))
+        except IntegrityError:
+            errors = missing_references(validated_data)
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
+
 
 class TitleReadOnlySerializer(serializers.ModelSerializer):
     """
@@ -73,11 +150,42 @@ class TitleReadOnlySerializer(serializers.ModelSerializer):
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
     rating = serializers.IntegerField()
+    histogram = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
 
     class Meta:
         model = Title
         fields = ("id", "name", "year", "description",
-                  "genre", "category", "rating",)
+                  "genre", "category", "rating", "histogram",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Гистограмма оценок - по запросу view (см. TitleViewSet).
+        if not self.context.get("include_histogram"):
+            self.fields.pop("histogram")
+
+
+class TitleTopQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of the top titles list.
+    """
+    genre = RegistrySlugRelatedField(
+        registry.genres,
+        queryset=Genre.objects.all(),
+        required=False,
+    )
+    category = RegistrySlugRelatedField(
+        registry.categories,
+        queryset=Category.objects.all(),
+        required=False,
+    )
+    year = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.TITLE_TOP_MAX_LIMIT,
+        default=settings.TITLE_TOP_DEFAULT_LIMIT,
+    )
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_generation
+
+from reviews.models import (Category, Comment,  # isort:skip
+                            Genre, Review, Title)
+from reviews.signals import bulk_changed  # isort:skip
+
+User = get_user_model()
+
+CACHED_MODELS = (Category, Genre, Title, Review, Comment, User)
+
+
+def invalidate_on_write(sender, **kwargs):
+    bump_generation(sender)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_on_write, sender=model)
+    post_delete.connect(invalidate_on_write, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_on_title_genre_change(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_generation(Title)
+
+
+@receiver(bulk_changed)
+def invalidate_on_bulk_change(sender, **kwargs):
+    bump_generation(sender)
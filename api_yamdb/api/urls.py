@@ -1,7 +1,8 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+from .views import (CacheStatsAPIView, CategoryViewSet, CommentViewSet,
+                    ExportAPIView, GenreViewSet, ReferenceDataAPIView,
                     ReviewViewSet, TitleViewSet)
 
 app_name = 'api'
@@ -20,5 +21,8 @@ router_v1.register(
     basename='comment')
 
 urlpatterns = [
+    path('v1/cache-stats/', CacheStatsAPIView.as_view(), name='cache_stats'),
+    path('v1/reference/', ReferenceDataAPIView.as_view(), name='reference'),
+    path('v1/export/<str:table>/', ExportAPIView.as_view(), name='export'),
     path('v1/', include(router_v1.urls)),
 ]
@@ -1,17 +1,42 @@
-from django.db.models.aggregates import Avg
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from .bulk import bulk_create_titles, bulk_update_titles
+from .cache import CachedResponseMixin, get_cache_stats
+from .conditional import ConditionalGetMixin
+from .facets import facet_counts
+from .fast_serializers import (CommentListSerializer, ReviewListSerializer,
+                               TitleListSerializer)
 from .filters import GenreFilter
-from .mixins import CommonViewSetMixin, NoAuthorUpdateMixin
+from .mixins import (CommonViewSetMixin, FastListMixin, NoAuthorUpdateMixin,
+                     ParentCounterMixin, RegistryListMixin)
+from .pagination import NestedPagination, TitlePagination
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, ReviewSerializer,
-                          TitleReadOnlySerializer, TitleSerializer)
-from reviews.models import Category, Genre, Review, Title  # isort:skip # noqa
-from users.permissions import CanPostAndEdit, IsAdminOrReadOnly  # isort:skip
+                          TitleReadOnlySerializer, TitleSerializer,
+                          TitleTopQuerySerializer)
+
+from reviews import registry  # isort:skip
+from reviews.dump import (FORMATS, TABLES,  # isort:skip
+                          export_filename, iter_export)
+from reviews.models import (Category, Comment,  # isort:skip # noqa
+                            Genre, Review, Title, TitleRanking)
+from users.permissions import (CanPostAndEdit, IsAdmin,  # isort:skip
+                               IsAdminOrReadOnly)
+from users.throttling import AnonReadThrottle, WriteThrottle  # isort:skip
+
+User = get_user_model()
 
 
 class NoRetrieveModelViewSet(viewsets.ModelViewSet):
@@ -21,46 +46,166 @@ class NoRetrieveModelViewSet(viewsets.ModelViewSet):
         return Response(msg_dict, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class GenreViewSet(CommonViewSetMixin, NoRetrieveModelViewSet):
+class GenreViewSet(CachedResponseMixin, RegistryListMixin, CommonViewSetMixin,
+                   NoRetrieveModelViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    reference_registry = registry.genres
+    cache_name = "genre"
+    cache_dependencies = (Genre,)
 
 
-class CategoryViewSet(CommonViewSetMixin, NoRetrieveModelViewSet):
+class CategoryViewSet(CachedResponseMixin, RegistryListMixin,
+                      CommonViewSetMixin, NoRetrieveModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    reference_registry = registry.categories
+    cache_name = "category"
+    cache_dependencies = (Category,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg("reviews__score")
-    ).select_related(
+class TitleViewSet(CachedResponseMixin, ConditionalGetMixin, FastListMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
         "category"
     ).prefetch_related(
         "genre"
     ).order_by('-id').all()
 
     serializer_class = TitleSerializer
+    fast_list_serializer_class = TitleListSerializer
+    # Холодный процесс: пользователь и оба справочника ещё не в кэше.
+    query_budget = {"list": 8, "retrieve": 6, "top": 8, "facets": 10}
+    asgi_read_actions = ("list", "retrieve", "top", "facets")
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = LimitOffsetPagination
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = TitlePagination
+    filter_backends = (DjangoFilterBackend, OrderingFilter)
     filterset_class = GenreFilter
+    ordering_fields = ("rating", "year", "name")
+    cache_name = "title"
+    cache_dependencies = (Title, Genre, Category, Review)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
             return TitleReadOnlySerializer
         return TitleSerializer
 
+    def get_serializer_context(self):
+        """
+        Гистограмма оценок входит в карточку произведения, а в списки -
+        только с ?include=histogram.
+        """
+        context = super().get_serializer_context()
+        include = self.request.query_params.get("include", "").split(",")
+        context["include_histogram"] = (
+            self.action == "retrieve" or "histogram" in include
+        )
+        return context
+
+    @action(detail=False, methods=["get"])
+    def top(self, request):
+        """
+        Лучшие произведения по байесовскому среднему оценок из
+        предрасчитанной таблицы reviews.TitleRanking, с фильтрами
+        ?genre=, ?category=, ?year= и размером ?limit=.
+        """
+        return self.cached_response(self.get_top_response, request)
+
+    def get_top_response(self, request):
+        params = TitleTopQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        ranked = list(TitleRanking.objects.top(**params.validated_data))
+        serializer = self.fast_list_serializer_class(
+            context=self.get_serializer_context()
+        )
+        rows = {
+            row["id"]: row
+            for row in serializer.get_rows(
+                Title.objects.filter(pk__in=[pk for pk, _ in ranked])
+            )
+        }
+        # Произведение могло быть удалено между двумя запросами.
+        ranked = [(pk, score) for pk, score in ranked if pk in rows]
+        data = serializer.serialize(rows[pk] for pk, _ in ranked)
+        for item, (_, score) in zip(data, ranked):
+            item["score"] = round(score, 2)
+        return Response(data)
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """
+        Число произведений по жанрам, категориям и годам для выборки
+        с теми же параметрами фильтра, что у списка (api.facets).
+        """
+        return self.cached_response(self.get_facets_response, request)
 
-class ReviewViewSet(NoAuthorUpdateMixin, viewsets.ModelViewSet):
+    def get_facets_response(self, request):
+        return Response(facet_counts(
+            Title.objects.all(), request.query_params, request
+        ))
+
+    @action(detail=False, methods=["post", "patch"])
+    def bulk(self, request):
+        """
+        Пакетное создание (POST) и частичное обновление по id (PATCH)
+        произведений: принимает список, отвечает результатом по каждому
+        элементу.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"detail": "Expected a list of titles."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.TITLE_BULK_MAX_ITEMS:
+            return Response(
+                {"detail": "Too many titles in one request, maximum is "
+                           f"{settings.TITLE_BULK_MAX_ITEMS}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if request.method == "PATCH":
+            write, done, done_status = (
+                bulk_update_titles, "updated", status.HTTP_200_OK
+            )
+        else:
+            write, done, done_status = (
+                bulk_create_titles, "created", status.HTTP_201_CREATED
+            )
+        results = write(items, self.get_serializer_context())
+        failed = sum(result["status"] != done_status for result in results)
+        if not failed:
+            response_status = done_status
+        elif failed == len(results):
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response(
+            {done: len(results) - failed, "failed": failed,
+             "results": results},
+            status=response_status
+        )
+
+
+class ReviewViewSet(ParentCounterMixin, CachedResponseMixin,
+                    ConditionalGetMixin, FastListMixin, NoAuthorUpdateMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    fast_list_serializer_class = ReviewListSerializer
+    query_budget = {"list": 5, "retrieve": 4}
+    asgi_read_actions = ("list", "retrieve")
     permission_classes = (CanPostAndEdit,)
+    throttle_classes = (AnonReadThrottle, WriteThrottle)
+    pagination_class = NestedPagination
+    parent_model = Title
+    parent_url_kwarg = "title_id"
+    # Каждый отзыв - ровно одна оценка, rating_count и есть число отзывов.
+    parent_counter_field = "rating_count"
+    cache_name = "review"
+    cache_dependencies = (Title, Review, User)
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return (title.reviews  # type:ignore
-                     .select_related("title", "author")
-                     .all())
+        # Существование произведения проверяет get_parent_count()
+        # при пагинации и get_object_or_404 при создании.
+        return (Review.objects.filter(title_id=self.kwargs.get("title_id"))
+                              .select_related("title", "author"))
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get("title_id")
@@ -71,15 +216,25 @@ class ReviewViewSet(NoAuthorUpdateMixin, viewsets.ModelViewSet):
         )
 
 
-class CommentViewSet(NoAuthorUpdateMixin, viewsets.ModelViewSet):
+class CommentViewSet(ParentCounterMixin, CachedResponseMixin,
+                     ConditionalGetMixin, FastListMixin, NoAuthorUpdateMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    fast_list_serializer_class = CommentListSerializer
+    query_budget = {"list": 5, "retrieve": 4}
+    asgi_read_actions = ("list", "retrieve")
     permission_classes = (CanPostAndEdit,)
+    throttle_classes = (AnonReadThrottle, WriteThrottle)
+    pagination_class = NestedPagination
+    parent_model = Review
+    parent_url_kwarg = "review_id"
+    parent_counter_field = "comments_count"
+    cache_name = "comment"
+    cache_dependencies = (Review, Comment, User)
 
     def get_queryset(self):
-        review_obj = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        return (review_obj.comments  # type:ignore
-                          .select_related("author", "review")
-                          .all())
+        return (Comment.objects.filter(review_id=self.kwargs.get("review_id"))
+                               .select_related("author", "review"))
 
     def perform_create(self, serializer):
         review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
@@ -87,3 +242,72 @@ class CommentViewSet(NoAuthorUpdateMixin, viewsets.ModelViewSet):
             author=self.request.user,
             review=review
         )
+
+
+class CacheStatsAPIView(APIView):
+    """
+    Счётчики попаданий и промахов кэша ответов API для подбора TTL.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(get_cache_stats(), status=status.HTTP_200_OK)
+
+
+class ReferenceDataAPIView(APIView):
+    """
+    Все жанры и категории одним ответом без пагинации - из реестра
+    процесса и с долгим кэшированием на клиенте.
+    """
+    permission_classes = (IsAdminOrReadOnly,)
+
+    def get(self, request):
+        etag = quote_etag(
+            f"{registry.genres.version}-{registry.categories.version}"
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(
+                {
+                    "genres": registry.genres.as_list(),
+                    "categories": registry.categories.as_list(),
+                },
+                status=status.HTTP_200_OK
+            )
+        response["ETag"] = etag
+        patch_cache_control(
+            response, public=True, max_age=settings.REFERENCE_DATA_MAX_AGE
+        )
+        return response
+
+
+class ExportAPIView(APIView):
+    """
+    Потоковая выгрузка одной таблицы в формате import_csv (csv) или
+    JSON Lines, при необходимости сжатая gzip: ?type=jsonl&compress=gzip.
+    """
+    permission_classes = (IsAdmin,)
+    content_types = {
+        "csv": "text/csv; charset=utf-8",
+        "jsonl": "application/x-ndjson; charset=utf-8",
+    }
+
+    def get(self, request, table):
+        if table not in TABLES:
+            raise Http404
+        fmt = request.query_params.get("type", "csv")
+        if fmt not in FORMATS:
+            raise ValidationError(
+                {"type": f"Expected one of: {', '.join(FORMATS)}."}
+            )
+        compress = request.query_params.get("compress") == "gzip"
+        response = StreamingHttpResponse(
+            iter_export(table, fmt, compress),
+            content_type=(
+                "application/gzip" if compress else self.content_types[fmt]
+            ),
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{export_filename(table, fmt, compress)}"'
+        )
+        return response
@@ -1,7 +1,11 @@
 import os
 
-from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+
+from api_yamdb.asgi_bridge import ThreadPoolASGIApplication
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+# В Django 2.2 нет django.core.asgi: ASGI-сервер выполняет WSGI-приложение
+# в пулах потоков (см. asgi_bridge).
+application = ThreadPoolASGIApplication(get_wsgi_application())
@@ -0,0 +1,165 @@
+"""
+ASGI-сервер (uvicorn) для Django 2.2, в которой нет ни ASGIHandler, ни
+async views: ASGI-приложение выполняет обычный WSGIHandler в пулах
+потоков.
+
+Чтение (actions из атрибута view ``asgi_read_actions``) идёт в
+ограниченный пул ASGI_READ_THREADS, остальное — в пул
+ASGI_WRITE_THREADS. Медленный запрос к БД занимает поток пула, а не весь
+воркер: event loop продолжает принимать соединения и отдавать ответы, а
+записи не ждут в очереди за чтениями. Ответы и права те же, что под
+WSGI: запрос проходит те же middleware и view.
+
+Запрос целиком, от вызова до close(), выполняется в одном потоке:
+соединения Django с БД привязаны к потоку. Поэтому потоков на воркер
+должно хватать на max_connections PostgreSQL.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+READ_METHODS = ("GET", "HEAD")
+
+
+def is_read(method, path):
+    """Обрабатывается ли запрос пулом чтения."""
+    if method not in READ_METHODS:
+        return False
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return False
+    view_class = getattr(match.func, "cls", None)
+    # HEAD обслуживается тем же action, что и GET.
+    action = (getattr(match.func, "actions", None) or {}).get("get")
+    return action in getattr(view_class, "asgi_read_actions", ())
+
+
+def build_environ(scope, body):
+    """WSGI environ по HTTP scope ASGI."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        # WSGI передаёт путь байтами, раскодированными как latin-1.
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "REMOTE_ADDR": client[0],
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        if name not in ("CONTENT_LENGTH", "CONTENT_TYPE"):
+            name = f"HTTP_{name}"
+        value = value.decode("latin-1")
+        if name in environ:
+            value = f"{environ[name]},{value}"
+        environ[name] = value
+    return environ
+
+
+async def read_body(receive):
+    """Тело запроса или None, если клиент отключился."""
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+class ThreadPoolASGIApplication:
+
+    def __init__(self, wsgi_application):
+        self.wsgi_application = wsgi_application
+        self.read_pool = ThreadPoolExecutor(
+            settings.ASGI_READ_THREADS, thread_name_prefix="asgi-read"
+        )
+        self.write_pool = ThreadPoolExecutor(
+            settings.ASGI_WRITE_THREADS, thread_name_prefix="asgi-write"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+        body = await read_body(receive)
+        if body is None:
+            return
+        pool = (
+            self.read_pool if is_read(scope["method"], scope["path"])
+            else self.write_pool
+        )
+        await asyncio.get_event_loop().run_in_executor(
+            pool, self.run_wsgi, build_environ(scope, body), send,
+            asyncio.get_event_loop(),
+        )
+
+    def run_wsgi(self, environ, send, loop):
+        """Выполняет запрос в потоке пула и передаёт ответ в event loop.
+
+        Поток ждёт отправки каждого куска, поэтому потоковые ответы
+        (выгрузка) не копятся в памяти.
+        """
+        def call(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        start = []
+
+        def start_response(status, headers, exc_info=None):
+            start[:] = [{
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers
+                ],
+            }]
+
+        result = self.wsgi_application(environ, start_response)
+        try:
+            started = False
+            for chunk in result:
+                if not started:
+                    call(start[0])
+                    started = True
+                if chunk:
+                    call({"type": "http.response.body", "body": chunk,
+                          "more_body": True})
+            if not started:
+                call(start[0])
+            call({"type": "http.response.body", "body": b""})
+        finally:
+            # close() отправляет request_finished и закрывает соединения
+            # с БД этого потока.
+            if hasattr(result, "close"):
+                result.close()
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.read_pool.shutdown(wait=False)
+                self.write_pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,99 @@
+"""
+Системные проверки настроек кэшей (manage.py check).
+
+Кэш ответов API, троттлинг, сброс кэша пользователей и привязка клиента
+к основной БД работают через кэш из CACHES. LocMemCache живёт в памяти
+одного процесса: под gunicorn каждый воркер видит только свои записи.
+Привязка к основной БД без общего кэша теряет смысл, поэтому с
+репликами это ошибка; остальное - предупреждения check --deploy.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def is_process_local(alias):
+    """Записи кэша alias не видны другим процессам."""
+    return isinstance(caches[alias], PROCESS_LOCAL_CACHES)
+
+
+def sticky_cache_error():
+    """
+    Текст ошибки, если чтения распределяются по репликам, а привязка
+    клиента к основной БД хранится в кэше одного процесса, иначе None.
+    """
+    alias = settings.DB_PRIMARY_STICKY_CACHE_ALIAS
+    if settings.DB_REPLICAS and is_process_local(alias):
+        return (
+            f"DB_PRIMARY_STICKY_CACHE_ALIAS '{alias}' is process-local, "
+            "but DB_REPLICAS is set."
+        )
+    return None
+
+
+@register(Tags.caches)
+def check_sticky_cache(app_configs, **kwargs):
+    message = sticky_cache_error()
+    if message is None:
+        return []
+    return [Error(
+        message,
+        hint=(
+            "A client that wrote in one worker would read stale replica "
+            "data in the others. Point the alias at a shared cache "
+            "(memcached, redis)."
+        ),
+        id="api_yamdb.E001",
+    )]
+
+
+@register(Tags.caches, deploy=True)
+def check_api_cache(app_configs, **kwargs):
+    if not is_process_local(settings.API_CACHE_ALIAS):
+        return []
+    return [Warning(
+        f"API_CACHE_ALIAS '{settings.API_CACHE_ALIAS}' is process-local.",
+        hint=(
+            "Model generations of the API response cache are bumped only "
+            "in the process that wrote, so other workers serve stale "
+            "responses for up to API_CACHE_TIMEOUT. Point it at a shared "
+            "cache (memcached, redis) or run a single process."
+        ),
+        id="api_yamdb.W001",
+    )]
+
+
+@register(Tags.caches, deploy=True)
+def check_throttle_cache(app_configs, **kwargs):
+    if not is_process_local(settings.THROTTLE_CACHE_ALIAS):
+        return []
+    return [Warning(
+        f"THROTTLE_CACHE_ALIAS '{settings.THROTTLE_CACHE_ALIAS}' is "
+        "process-local.",
+        hint=(
+            "Every worker keeps its own token buckets, so each rate limit "
+            "is multiplied by the number of processes. Point it at a "
+            "shared cache (memcached, redis)."
+        ),
+        id="api_yamdb.W002",
+    )]
+
+
+@register(Tags.caches, deploy=True)
+def check_auth_user_cache(app_configs, **kwargs):
+    if not is_process_local(settings.AUTH_USER_CACHE_ALIAS):
+        return []
+    return [Warning(
+        f"AUTH_USER_CACHE_ALIAS '{settings.AUTH_USER_CACHE_ALIAS}' is "
+        "process-local.",
+        hint=(
+            "The per-process user cache is disabled and every JWT request "
+            "loads its user from the database. Point it at a shared cache "
+            "(memcached, redis)."
+        ),
+        id="api_yamdb.W003",
+    )]
@@ -0,0 +1,122 @@
+"""
+Чтение с реплик, запись в основную БД (default).
+
+ReplicaRoutingMiddleware запоминает текущий запрос, ReplicaRouter
+решает по нему, куда читать:
+
+* вне запроса (management-команды, воркер очереди) — default;
+* в небезопасных запросах (POST, PATCH, DELETE...) — default;
+* клиенту, который недавно писал, — default в течение
+  DB_PRIMARY_STICKY_SECONDS, чтобы он видел свои изменения несмотря
+  на отставание реплик (read-your-writes);
+* иначе — одна случайная реплика из DB_REPLICAS на весь запрос.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import LazyObject, empty
+from rest_framework.throttling import BaseThrottle
+
+from .checks import sticky_cache_error
+
+STICKY_KEY = "db:primary:{ident}"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_current = ContextVar("db_routing_request", default=None)
+
+
+def client_ident(request):
+    """Пользователь после аутентификации, иначе IP клиента."""
+    user = request.__dict__.get("user")
+    if isinstance(user, LazyObject) and user._wrapped is empty:
+        # Ленивый пользователь сессии ещё не загружен: его загрузка сама
+        # читает БД и вернулась бы в роутер.
+        user = None
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    # Тот же адрес, что у троттлинга: с учётом NUM_PROXIES, а не первый
+    # (подставляемый клиентом) адрес X-Forwarded-For.
+    return "ip:" + (BaseThrottle().get_ident(request) or "")
+
+
+def _sticky_cache():
+    return caches[settings.DB_PRIMARY_STICKY_CACHE_ALIAS]
+
+
+class RequestRouting:
+    """Состояние маршрутизации одного запроса."""
+
+    def __init__(self, request):
+        self.request = request
+        self.pinned = request.method not in SAFE_METHODS
+        self.replica = random.choice(settings.DB_REPLICAS)
+        self._sticky = {}
+
+    def is_sticky(self):
+        # Клиент определяется заново: до аутентификации DRF это IP,
+        # после — пользователь.
+        ident = client_ident(self.request)
+        if ident not in self._sticky:
+            self._sticky[ident] = bool(
+                _sticky_cache().get(STICKY_KEY.format(ident=ident))
+            )
+        return self._sticky[ident]
+
+    def db_for_read(self):
+        if self.pinned or self.is_sticky():
+            return DEFAULT_DB_ALIAS
+        return self.replica
+
+    def stick(self):
+        """Направляет чтения клиента в default на ближайшие секунды."""
+        _sticky_cache().set(
+            STICKY_KEY.format(ident=client_ident(self.request)), True,
+            timeout=settings.DB_PRIMARY_STICKY_SECONDS,
+        )
+
+
+class ReplicaRoutingMiddleware:
+
+    def __init__(self, get_response):
+        # gunicorn не запускает системные проверки: без общего кэша
+        # процесс не стартует, а не читает молча устаревшие данные.
+        message = sticky_cache_error()
+        if message is not None:
+            raise ImproperlyConfigured(message)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DB_REPLICAS:
+            return self.get_response(request)
+        routing = RequestRouting(request)
+        token = _current.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        if routing.pinned and response.status_code < 400:
+            routing.stick()
+        return response
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        routing = _current.get()
+        if routing is None:
+            return DEFAULT_DB_ALIAS
+        return routing.db_for_read()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и default.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DB_REPLICAS
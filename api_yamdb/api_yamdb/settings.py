@@ -19,12 +19,14 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'reviews.apps.ReviewsConfig',
     'api.apps.ApiConfig',
+    'tasks.apps.TasksConfig',
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.sql_instrumentation.SQLInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -32,6 +34,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api_yamdb.db_routing.ReplicaRoutingMiddleware',
 ]
 
 INTERNAL_IPS = [
@@ -59,6 +62,20 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# ASGI (api_yamdb.asgi): потоков на воркер для чтения списков и карточек
+# и для остальных запросов. Каждый поток держит своё соединение с БД.
+ASGI_READ_THREADS = int(os.getenv('ASGI_READ_THREADS', default=32))
+ASGI_WRITE_THREADS = int(os.getenv('ASGI_WRITE_THREADS', default=8))
+
+# Страницы, которые запрашивает прогрев (api_yamdb.warmup) перед приёмом
+# трафика: заполняют кэши ответов и справочников.
+WARMUP_PATHS = [
+    '/api/v1/titles/',
+    '/api/v1/genres/',
+    '/api/v1/categories/',
+    '/api/v1/reference/',
+]
+
 DATABASES = {
     'default': {
         'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
@@ -70,6 +87,95 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения (api_yamdb.db_routing): через запятую хосты
+# PostgreSQL или, для локальной проверки, пути к файлам SQLite.
+DB_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1
+):
+    alias = f'replica{number}'
+    location = 'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        location: replica.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DB_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api_yamdb.db_routing.ReplicaRouter']
+
+# Сколько секунд после записи клиент читает из default, чтобы видеть
+# свои изменения, и в каком кэше это хранится. С DB_REPLICAS кэш должен
+# быть общим для процессов (memcached, redis), иначе приложение не
+# запустится (api_yamdb.E001).
+DB_PRIMARY_STICKY_SECONDS = 5
+DB_PRIMARY_STICKY_CACHE_ALIAS = 'default'
+
+# Кэш по умолчанию - LocMemCache одного процесса (разработка, тесты).
+# Под gunicorn с несколькими воркерами нужен общий кэш: docker-compose
+# задаёт memcached через CACHE_BACKEND и CACHE_LOCATION.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='api_yamdb'),
+    }
+}
+
+# Кэш ответов API (api.cache): алиас из CACHES и TTL по умолчанию, сек.
+# Поколения моделей хранятся в этом же кэше, поэтому с несколькими
+# процессами нужен общий кэш (memcached, redis): с LocMemCache запись
+# в одном воркере не сбрасывает ответы других (check --deploy, W001).
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 60
+
+# Реестр жанров и категорий в памяти процесса (reviews.registry):
+# как часто сверять его версию с общим кэшем и через сколько секунд
+# перечитывать данные в любом случае - предел устаревания, если кэш не
+# общий для процессов (LocMemCache).
+REFERENCE_REGISTRY_CHECK_INTERVAL = 1
+REFERENCE_REGISTRY_MAX_AGE = 60
+
+# Время кэширования клиентом ответа со всеми справочниками, сек.
+REFERENCE_DATA_MAX_AGE = 3600
+
+# Максимум произведений в одном запросе POST /api/v1/titles/bulk/.
+TITLE_BULK_MAX_ITEMS = 5000
+
+# Топы произведений (GET /api/v1/titles/top/, reviews.TitleRanking):
+# вес C байесовского среднего (C * m + сумма оценок) / (C + число оценок),
+# где m - средняя оценка по всем отзывам, и TTL кэша m (сек.); размер
+# топа по умолчанию и максимальный. Полный пересчёт с новой m - команда
+# refresh_rankings по расписанию.
+TITLE_RANKING_PRIOR_WEIGHT = 10
+TITLE_RANKING_PRIOR_TTL = 600
+TITLE_TOP_DEFAULT_LIMIT = 10
+TITLE_TOP_MAX_LIMIT = 100
+
+# Алиас кэша для корзин троттлинга (users.throttling); лимит общий для
+# всех процессов, только если кэш общий (memcached, redis), иначе каждый
+# воркер считает свой (check --deploy, W002).
+THROTTLE_CACHE_ALIAS = 'default'
+
+# Кэш пользователей для аутентификации по JWT (users.authentication):
+# размер LRU в памяти процесса, TTL записи (сек.) и алиас общего кэша,
+# через который смена роли сбрасывает записи во всех процессах. С кэшем
+# в памяти процесса (LocMemCache) LRU отключён и пользователь читается
+# из БД на каждый запрос (check --deploy, W003).
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60
+AUTH_USER_CACHE_ALIAS = 'default'
+
+# Очередь отложенных задач (tasks): размер пачки воркера, число потоков,
+# пауза опроса пустой очереди, попытки и базовая задержка повтора (сек.,
+# удваивается с каждой попыткой), через сколько секунд задача в статусе
+# running считается брошенной упавшим воркером.
+TASK_BATCH_SIZE = 100
+TASK_WORKER_THREADS = 4
+TASK_POLL_INTERVAL = 1
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 30
+TASK_LOCK_TIMEOUT = 600
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -110,13 +216,26 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.OptInCursorPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'users.throttling.AnonReadThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '5/min',
+        'token': '10/min',
+        'write': '60/min',
+        'anon_read': '600/min',
+    },
+    # Число прокси перед приложением (nginx из infra): IP клиента для
+    # троттлинга - адрес, добавленный последним прокси в X-Forwarded-For,
+    # а не адрес самого nginx. 0 - приложение доступно напрямую.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
 }
 
 SIMPLE_JWT = {
@@ -133,13 +252,24 @@ LOGGING = {
         },
     },
     'loggers': {
-        'django.db.backends': {
-            'level': 'DEBUG',
+        # Сводка по SQL на каждый запрос (api_yamdb.sql_instrumentation)
+        # вместо DEBUG-лога каждого запроса django.db.backends.
+        'api_yamdb.sql': {
+            'level': os.getenv('SQL_LOG_LEVEL', default='INFO'),
             'handlers': ['console'],
-        }
-    }
+        },
+        'api_yamdb.warmup': {
+            'level': 'INFO',
+            'handlers': ['console'],
+        },
+    },
 }
 
+# Сколько одинаковых по форме запросов за HTTP-запрос считать N+1 и
+# падать ли при превышении query_budget view (включено в тестах).
+SQL_N_PLUS_ONE_THRESHOLD = 5
+SQL_QUERY_BUDGET_STRICT = False
+
 # Length in chars twice larger in hex representation
 CONFIRMATION_CODE_BYTE_SIZE = 8
 
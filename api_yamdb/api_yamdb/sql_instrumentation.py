@@ -0,0 +1,124 @@
+"""
+Учёт SQL-запросов каждого HTTP-запроса вместо DEBUG-лога
+django.db.backends.
+
+SQLInstrumentationMiddleware подключает QueryRecorder ко всем
+соединениям через connection.execute_wrapper и после ответа:
+
+* пишет в лог ``api_yamdb.sql`` одну строку: число запросов, время в БД,
+  число повторяющихся форм запросов; то же время — в заголовке
+  Server-Timing;
+* предупреждает о вероятном N+1, если одна форма запроса повторилась
+  не меньше SQL_N_PLUS_ONE_THRESHOLD раз;
+* сверяет число запросов с бюджетом view (атрибут ``query_budget``:
+  число или словарь по action). При SQL_QUERY_BUDGET_STRICT превышение
+  бюджета — исключение (так оно роняет тесты), иначе — предупреждение.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("api_yamdb.sql")
+
+# "IN (%s, %s, %s)" и "VALUES (%s, %s), (%s, %s)" сводятся к одной форме
+# независимо от числа параметров.
+_GROUP = r"\(\s*%s(?:\s*,\s*%s)*\s*\)"
+PLACEHOLDER_GROUPS = re.compile(rf"{_GROUP}(?:\s*,\s*{_GROUP})*")
+
+
+class QueryBudgetError(Exception):
+    pass
+
+
+def query_shape(sql):
+    return PLACEHOLDER_GROUPS.sub("(...)", sql)
+
+
+class QueryRecorder:
+    """execute_wrapper: считает запросы, время и формы запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[query_shape(sql)] += 1
+
+    def repeated(self, threshold=2):
+        return [
+            (shape, count) for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+def get_query_budget(request):
+    """Бюджет запросов view, обработавшего запрос, или None."""
+    match = getattr(request, "resolver_match", None)
+    view_class = getattr(getattr(match, "func", None), "cls", None)
+    budget = getattr(view_class, "query_budget", None)
+    if not isinstance(budget, dict):
+        return budget
+    actions = getattr(match.func, "actions", None) or {}
+    return budget.get(actions.get(request.method.lower()))
+
+
+class SQLInstrumentationMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        view_name = getattr(
+            getattr(request, "resolver_match", None), "view_name", None
+        ) or request.path
+        logger.info(
+            "%s %s %s: %d queries, %.1f ms db, %d repeated",
+            request.method, view_name, response.status_code,
+            recorder.count, recorder.duration * 1000,
+            len(recorder.repeated()),
+        )
+        response["Server-Timing"] = (
+            f'db;dur={recorder.duration * 1000:.1f};'
+            f'desc="{recorder.count} queries"'
+        )
+        self.check_n_plus_one(view_name, recorder)
+        self.check_budget(request, view_name, recorder)
+        return response
+
+    def check_n_plus_one(self, view_name, recorder):
+        for shape, count in recorder.repeated(
+            settings.SQL_N_PLUS_ONE_THRESHOLD
+        ):
+            logger.warning(
+                "Possible N+1 in %s: %d x %s", view_name, count, shape
+            )
+
+    def check_budget(self, request, view_name, recorder):
+        budget = get_query_budget(request)
+        if budget is None or recorder.count <= budget:
+            return
+        message = (
+            f"{request.method} {view_name} ran {recorder.count} queries, "
+            f"budget is {budget}"
+        )
+        if settings.SQL_QUERY_BUDGET_STRICT:
+            raise QueryBudgetError(message)
+        logger.warning(message)
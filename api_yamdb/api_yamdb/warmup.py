@@ -0,0 +1,111 @@
+"""
+Прогрев процесса до приёма трафика (вызывается из gunicorn.conf.py).
+
+С preload_app прогрев выполняется в мастере до fork: воркеры получают
+готовые структуры через copy-on-write, а первые запросы после деплоя не
+платят за ленивую инициализацию. Без preload каждый воркер прогревается
+сам.
+"""
+import io
+import logging
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.serializers import BaseSerializer
+
+from reviews import registry  # isort:skip
+
+logger = logging.getLogger(__name__)
+
+
+def iter_views(patterns):
+    """Классы DRF view всех маршрутов с их actions."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, "cls", None)
+            if view_class is not None:
+                actions = getattr(pattern.callback, "actions", None) or {}
+                yield view_class, set(actions.values())
+
+
+def build_serializers(views):
+    """Строит поля сериализаторов всех actions: заодно заполняются кэши
+    _meta моделей и импортируются лениво подключаемые модули полей.
+    """
+    built = set()
+    for view_class, actions in views:
+        for action in actions or {None}:
+            view = view_class()
+            view.action = action
+            view.request = None
+            view.format_kwarg = None
+            view.kwargs = {}
+            get_class = getattr(view, "get_serializer_class", None)
+            serializer_class = get_class and get_class()
+            if (serializer_class not in built
+                    and isinstance(serializer_class, type)
+                    and issubclass(serializer_class, BaseSerializer)):
+                serializer_class(context={"view": view}).fields
+                built.add(serializer_class)
+    return len(built)
+
+
+def request(application, path):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.input": io.BytesIO(),
+    }
+    setup_testing_defaults(environ)
+    status = []
+    result = application(
+        environ, lambda line, headers, exc_info=None: status.append(line)
+    )
+    try:
+        for _ in result:
+            pass
+    finally:
+        result.close()
+    return status[0]
+
+
+def warm_up():
+    started = time.monotonic()
+    resolver = get_resolver()
+    # reverse_dict заполняет кэши resolver'а и всех вложенных.
+    resolver.reverse_dict
+    serializers = build_serializers(list(iter_views(resolver.url_patterns)))
+    registry.genres.as_list()
+    registry.categories.as_list()
+    # Запросы к самым горячим страницам прогревают всё остальное: кэши
+    # ответов, пользователей и справочников, компиляцию SQL.
+    application = get_wsgi_application()
+    for path in settings.WARMUP_PATHS:
+        status = request(application, path)
+        if not status.startswith("200"):
+            logger.warning("Warm-up request %s returned %s", path, status)
+    # Соединения мастера не должны достаться воркерам после fork.
+    connections.close_all()
+    logger.info(
+        "Warm-up: %d serializers, %d requests in %.2f s",
+        serializers, len(settings.WARMUP_PATHS), time.monotonic() - started,
+    )
+
+
+def safe_warm_up():
+    """Прогрев, который не роняет сервер: при ошибке (БД недоступна или
+    не мигрирована) процесс стартует холодным вместо перезапуска
+    контейнера по кругу.
+    """
+    try:
+        warm_up()
+    except Exception:
+        logger.warning("Warm-up failed, starting cold", exc_info=True)
+        connections.close_all()
@@ -0,0 +1,51 @@
+"""
+Профиль gunicorn для production; каждое значение переопределяется
+переменной окружения.
+
+    gunicorn api_yamdb.wsgi:application   # синхронные воркеры
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \\
+        gunicorn api_yamdb.asgi:application
+
+preload_app загружает и прогревает приложение (api_yamdb.warmup) в
+мастере до fork: воркеры делят память через copy-on-write, и первый
+запрос после деплоя не холодный; если прогрев не удался (например, БД
+ещё не мигрирована), gunicorn стартует холодным. max_requests с
+разбросом перезапускает воркеры по очереди, ограничивая рост памяти.
+"""
+import multiprocessing
+import os
+
+
+def env_flag(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+# Синхронный воркер простаивает, пока ждёт БД, поэтому их больше ядер;
+# у uvicorn-воркера ожидание берут потоки ASGI_READ_THREADS.
+workers = int(os.getenv(
+    "GUNICORN_WORKERS",
+    multiprocessing.cpu_count() * (2 if worker_class == "sync" else 1) + 1,
+))
+preload_app = env_flag("GUNICORN_PRELOAD", "true")
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+warmup = env_flag("GUNICORN_WARMUP", "true")
+
+
+def when_ready(server):
+    # Мастер, приложение уже загружено (preload), воркеров ещё нет.
+    if warmup and preload_app:
+        from api_yamdb.warmup import safe_warm_up
+        safe_warm_up()
+
+
+def post_worker_init(worker):
+    if warmup and not preload_app:
+        from api_yamdb.warmup import safe_warm_up
+        safe_warm_up()
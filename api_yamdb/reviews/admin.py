@@ -14,7 +14,8 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ("pk", "name", "year", "category", "description",)
+    list_display = ("pk", "name", "year", "category", "description",
+                    "rating",)
     list_select_related = ("category",)
     empty_value_display = "-пусто-"
 
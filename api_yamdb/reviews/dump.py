@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.text import compress_sequence
+
+from .models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+DEFAULT_CHUNK_SIZE = 2000
+
+MODELS = {
+    "user": User,
+    "category": Category,
+    "genre": Genre,
+    "title": Title,
+    "review": Review,
+    "comment": Comment,
+    "genre_title": Title.genre.through,
+}
+
+# Порядок загрузки: таблицы идут после тех, на которые ссылаются.
+TABLES = ["user", "category", "genre", "title",
+          "review", "comment", "genre_title"]
+
+# Секреты не выгружаются; при импорте пользователь получает
+# непригодный пароль и новый код подтверждения.
+EXCLUDED_FIELDS = {
+    "user": {"password", "confirmation_code"},
+}
+
+FORMATS = ("csv", "jsonl")
+
+# NULL в csv: пустая строка остаётся пустой строкой (как в COPY).
+CSV_NULL = "\\N"
+
+
+def export_fields(table):
+    """Столбцы выгрузки — те же имена, что читает import_csv."""
+    excluded = EXCLUDED_FIELDS.get(table, set())
+    return [
+        field.attname for field in MODELS[table]._meta.concrete_fields
+        if field.name not in excluded
+    ]
+
+
+def iter_rows(table, chunk_size=DEFAULT_CHUNK_SIZE, using=None):
+    """Строки таблицы в порядке pk; на PostgreSQL — серверным курсором."""
+    return (
+        MODELS[table]._base_manager.using(using)
+        .order_by("pk")
+        .values_list(*export_fields(table))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_csv(table, chunk_size=DEFAULT_CHUNK_SIZE, using=None):
+    """Выгрузка таблицы в csv кусками по ``chunk_size`` строк."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_fields(table))
+    for index, row in enumerate(iter_rows(table, chunk_size, using), 1):
+        writer.writerow(
+            CSV_NULL if value is None else value for value in row
+        )
+        if index % chunk_size == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def iter_jsonl(table, chunk_size=DEFAULT_CHUNK_SIZE, using=None):
+    """Выгрузка таблицы в JSON Lines: один объект на строку."""
+    fields = export_fields(table)
+    lines = []
+    for row in iter_rows(table, chunk_size, using):
+        lines.append(json.dumps(
+            dict(zip(fields, row)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_export(table, fmt="csv", compress=False,
+                chunk_size=DEFAULT_CHUNK_SIZE, using=None):
+    """Байтовые куски выгрузки, при ``compress`` — сжатые gzip."""
+    render = iter_jsonl if fmt == "jsonl" else iter_csv
+    chunks = (
+        chunk.encode() for chunk in render(table, chunk_size, using)
+    )
+    return compress_sequence(chunks) if compress else chunks
+
+
+def export_filename(table, fmt="csv", compress=False):
+    return f"{table}.{fmt}" + (".gz" if compress else "")
+
+
+def _drain(buffer):
+    """Забирает накопленный текст и очищает буфер."""
+    try:
+        return buffer.getvalue()
+    finally:
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,223 @@
+"""
+Синтетические данные для нагрузочного тестирования.
+
+Каждая пачка строк определяется параметрами генерации (Spec) и своим
+заданием, поэтому пачки строятся независимо в разных процессах, а запуск
+с тем же seed на той же базе даёт те же данные. Строки — в формате csv
+import_csv: списки значений под заголовком HEADERS. id задаются явно,
+чтобы ссылки между таблицами вычислялись без запросов к БД.
+
+Неравномерность задаёт ``skew`` (0 — равномерно): популярность
+произведений, категорий и жанров распределена по Zipf с этим
+показателем, число комментариев к отзыву — по Pareto с тяжёлым хвостом.
+"""
+import random
+from collections import namedtuple
+from itertools import accumulate
+
+WORDS = (
+    "amber", "battle", "canyon", "dragon", "empire", "forest", "garden",
+    "harbor", "island", "jungle", "kingdom", "legend", "mirror", "night",
+    "ocean", "palace", "quest", "river", "shadow", "thunder", "umbrella",
+    "valley", "winter", "yellow", "zephyr",
+)
+
+HEADERS = {
+    "user": ["id", "username", "email", "bio"],
+    "category": ["id", "name", "slug"],
+    "genre": ["id", "name", "slug"],
+    "title": ["id", "name", "year", "category_id", "description"],
+    "genre_title": ["title_id", "genre_id"],
+    "review": ["id", "title_id", "author_id", "text", "score"],
+    "comment": ["review_id", "author_id", "text"],
+}
+
+YEARS = (1900, 2021)
+MAX_GENRES_PER_TITLE = 3
+
+# ``first`` — первый id каждой таблицы, ``sizes`` — число строк.
+Spec = namedtuple("Spec", (
+    "seed", "prefix", "skew", "score_mean", "score_spread", "first", "sizes",
+))
+
+
+def zipf_weights(count, skew):
+    """Веса рангов 1..count по убыванию."""
+    return [1 / rank ** skew for rank in range(1, count + 1)]
+
+
+def spread(total, weights, cap):
+    """Делит ``total`` пропорционально убывающим ``weights``, но не больше
+    ``cap`` на элемент: излишек самых популярных переходит остальным.
+    """
+    rest = sum(weights)
+    for saturated, weight in enumerate(weights):
+        scale = (total - cap * saturated) / rest
+        if weight * scale <= cap:
+            return [cap] * saturated + [w * scale for w in weights[saturated:]]
+        rest -= weight
+    return [cap] * len(weights)
+
+
+def round_randomly(rng, value):
+    whole = int(value)
+    return whole + (rng.random() < value - whole)
+
+
+def review_counts(spec):
+    """Число отзывов на каждое произведение.
+
+    Не больше числа пользователей: у автора один отзыв на произведение
+    (only_one_review).
+    """
+    titles, users = spec.sizes["title"], spec.sizes["user"]
+    if not titles or not users:
+        return [0] * titles
+    rng = random.Random(f"{spec.seed}:review-counts")
+    shares = spread(
+        spec.sizes["review"], zipf_weights(titles, spec.skew), users
+    )
+    rng.shuffle(shares)
+    return [round_randomly(rng, share) for share in shares]
+
+
+def plan(spec, chunk_size):
+    """Задания на генерацию: ``[(таблица, задание), ...]`` в порядке
+    загрузки и итоговое число отзывов.
+
+    Задание — диапазон ``(start, stop)`` номеров строк. Для отзывов это
+    номера произведений, к ним добавляются число отзывов каждого из них
+    и номер первого отзыва пачки; для комментариев — номера отзывов и
+    среднее число комментариев на отзыв.
+    """
+    jobs = []
+    for table in ("user", "category", "genre", "title", "genre_title"):
+        if table == "genre_title":
+            size = spec.sizes["title"] if spec.sizes["genre"] else 0
+        else:
+            size = spec.sizes[table]
+        jobs.extend(
+            (table, (start, min(start + chunk_size, size)))
+            for start in range(0, size, chunk_size)
+        )
+
+    counts = review_counts(spec)
+    start = reviews = total_reviews = 0
+    for index, count in enumerate(counts, 1):
+        reviews += count
+        if reviews >= chunk_size or index == len(counts):
+            jobs.append((
+                "review", (start, index, counts[start:index], total_reviews)
+            ))
+            total_reviews += reviews
+            start, reviews = index, 0
+
+    if total_reviews and spec.sizes["comment"]:
+        per_review = spec.sizes["comment"] / total_reviews
+        step = max(1, int(chunk_size / per_review))
+        jobs.extend(
+            ("comment", (start, min(start + step, total_reviews), per_review))
+            for start in range(0, total_reviews, step)
+        )
+    return jobs, total_reviews
+
+
+def _words(rng, low, high):
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def _zipf_chooser(rng, count, skew):
+    cum_weights = list(accumulate(zipf_weights(count, skew)))
+    population = range(count)
+    return lambda k=1: rng.choices(population, cum_weights=cum_weights, k=k)
+
+
+def user_rows(spec, rng, job):
+    first = spec.first["user"]
+    for number in range(*job):
+        pk = first + number
+        yield [pk, f"{spec.prefix}_{pk}", f"{spec.prefix}_{pk}@example.com",
+               _words(rng, 0, 12)]
+
+
+def _reference_rows(table):
+    def rows(spec, rng, job):
+        first = spec.first[table]
+        for number in range(*job):
+            pk = first + number
+            yield [pk, f"{_words(rng, 1, 2).title()} {pk}",
+                   f"{spec.prefix}-{table}-{pk}"]
+    return rows
+
+
+def title_rows(spec, rng, job):
+    first = spec.first["title"]
+    category = _zipf_chooser(rng, spec.sizes["category"], spec.skew)
+    for number in range(*job):
+        pk = first + number
+        yield [pk, f"{_words(rng, 2, 4).capitalize()} {pk}",
+               rng.randint(*YEARS),
+               spec.first["category"] + category()[0],
+               _words(rng, 5, 40)]
+
+
+def genre_title_rows(spec, rng, job):
+    genre = _zipf_chooser(rng, spec.sizes["genre"], spec.skew)
+    limit = min(MAX_GENRES_PER_TITLE, spec.sizes["genre"])
+    for number in range(*job):
+        for index in set(genre(rng.randint(1, limit))):
+            yield [spec.first["title"] + number, spec.first["genre"] + index]
+
+
+def title_quality(spec, number):
+    """Средняя оценка произведения: у каждого своя, около score_mean."""
+    rng = random.Random(f"{spec.seed}:quality:{number}")
+    return rng.gauss(spec.score_mean, 1.5)
+
+
+def review_rows(spec, rng, job):
+    start, stop, counts, first = job
+    review_id = spec.first["review"] + first
+    for number, count in zip(range(start, stop), counts):
+        quality = title_quality(spec, number)
+        for author in rng.sample(range(spec.sizes["user"]), count):
+            score = round(rng.gauss(quality, spec.score_spread))
+            yield [review_id, spec.first["title"] + number,
+                   spec.first["user"] + author, _words(rng, 5, 60),
+                   min(10, max(1, score))]
+            review_id += 1
+
+
+def comment_rows(spec, rng, job):
+    start, stop, per_review = job
+    # Тяжёлый хвост: вес отзыва ~ Pareto, нормированный на пачку, чтобы
+    # итоговое число комментариев оставалось близко к заданному.
+    alpha = 1 + 1 / spec.skew if spec.skew > 0 else None
+    weights = [
+        rng.paretovariate(alpha) if alpha else 1.0
+        for _ in range(start, stop)
+    ]
+    scale = per_review * len(weights) / sum(weights)
+    users = spec.sizes["user"]
+    for number, weight in zip(range(start, stop), weights):
+        for _ in range(round_randomly(rng, weight * scale)):
+            yield [spec.first["review"] + number,
+                   spec.first["user"] + rng.randrange(users),
+                   _words(rng, 3, 30)]
+
+
+ROWS = {
+    "user": user_rows,
+    "category": _reference_rows("category"),
+    "genre": _reference_rows("genre"),
+    "title": title_rows,
+    "genre_title": genre_title_rows,
+    "review": review_rows,
+    "comment": comment_rows,
+}
+
+
+def generate_rows(spec, table, job):
+    """Строки одной пачки; генератор случайных чисел — свой у пачки."""
+    rng = random.Random(f"{spec.seed}:{table}:{job[0]}")
+    return list(ROWS[table](spec, rng, job))
@@ -0,0 +1,55 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from reviews.dump import (DEFAULT_CHUNK_SIZE, FORMATS,  # isort:skip
+                          TABLES, export_filename, iter_export)
+
+
+class Command(BaseCommand):
+    help = u'Выгрузка базы данных в csv (формат import_csv) или jsonl'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir", default="export",
+            help=u"Каталог для файлов выгрузки",
+        )
+        parser.add_argument(
+            "--format", dest="fmt", choices=FORMATS, default="csv",
+        )
+        parser.add_argument(
+            "--gzip", action="store_true",
+            help=u"Сжимать файлы gzip",
+        )
+        parser.add_argument(
+            "--tables", nargs="+", choices=TABLES, default=TABLES,
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+            help=u"Количество строк, читаемых из БД за раз",
+        )
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS,
+        )
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for table in options["tables"]:
+            path = output_dir / export_filename(
+                table, options["fmt"], options["gzip"]
+            )
+            started = time.monotonic()
+            size = 0
+            with path.open("wb") as target:
+                for chunk in iter_export(
+                    table, options["fmt"], options["gzip"],
+                    options["chunk_size"], options["database"],
+                ):
+                    target.write(chunk)
+                    size += len(chunk)
+            self.stdout.write(
+                f"{path}: {size} байт за {time.monotonic() - started:.2f} с"
+            )
@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+
+from reviews.dump import MODELS  # isort:skip
+from reviews.generator import HEADERS, Spec, generate_rows, plan  # isort:skip
+from reviews.management.commands.import_csv import (  # isort:skip
+    get_fields, map_ordered, prepare_chunk, reset_sequences, write_bulk,
+    write_copy)
+from reviews.models import Review, Title  # isort:skip
+from reviews.signals import bulk_changed  # isort:skip
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def generate_chunk(spec, table, job, alias, use_copy):
+    """Генерирует и готовит к вставке одну пачку; работает в пуле."""
+    rows = generate_rows(spec, table, job)
+    return prepare_chunk(table, HEADERS[table], rows, alias, use_copy)
+
+
+class Command(BaseCommand):
+    help = u'Генерация синтетических данных для нагрузочного тестирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--genres", type=int, default=50)
+        parser.add_argument("--titles", type=int, default=100_000)
+        parser.add_argument("--reviews", type=int, default=1_000_000)
+        parser.add_argument("--comments", type=int, default=2_000_000)
+        parser.add_argument(
+            "--skew", type=float, default=1.0,
+            help=u"Неравномерность популярности (показатель Zipf); "
+                 u"0 — равномерно",
+        )
+        parser.add_argument(
+            "--score-mean", type=float, default=7.0,
+            help=u"Средняя оценка произведений",
+        )
+        parser.add_argument(
+            "--score-spread", type=float, default=2.0,
+            help=u"Разброс оценок одного произведения",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--prefix", default="gen",
+            help=u"Префикс имён пользователей и slug категорий и жанров",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+            help=u"Количество строк в одной пачке вставки",
+        )
+        parser.add_argument(
+            "--jobs", type=int, default=os.cpu_count() or 1,
+            help=u"Количество процессов генерации; 1 — без пула",
+        )
+        parser.add_argument(
+            "--no-copy", action="store_true",
+            help=u"Не использовать COPY даже на PostgreSQL",
+        )
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS,
+        )
+
+    def handle(self, *args, **options):
+        if options["titles"] and not options["categories"]:
+            raise CommandError(u"Для произведений нужна хотя бы одна "
+                               u"категория (--categories)")
+        if options["reviews"] and not options["users"]:
+            raise CommandError(u"Для отзывов нужен хотя бы один "
+                               u"пользователь (--users)")
+        alias = options["database"]
+        connection = connections[alias]
+        use_copy = connection.vendor == "postgresql" and not options["no_copy"]
+        spec = Spec(
+            seed=options["seed"],
+            prefix=options["prefix"],
+            skew=options["skew"],
+            score_mean=options["score_mean"],
+            score_spread=options["score_spread"],
+            first=self.first_ids(alias),
+            sizes={
+                "user": options["users"],
+                "category": options["categories"],
+                "genre": options["genres"],
+                "title": options["titles"],
+                "review": options["reviews"],
+                "comment": options["comments"],
+            },
+        )
+        jobs, total_reviews = plan(spec, options["chunk_size"])
+        if total_reviews < spec.sizes["review"]:
+            self.stdout.write(
+                f"review: {total_reviews} вместо {spec.sizes['review']}: "
+                f"у пользователя один отзыв на произведение"
+            )
+
+        started = time.monotonic()
+        pool = self.make_pool(options["jobs"])
+        try:
+            chunks = map_ordered(
+                pool, generate_chunk,
+                ((spec, table, job, alias, use_copy) for table, job in jobs),
+                window=2 * max(options["jobs"], 1),
+            )
+            tables = (table for table, _ in jobs)
+            for table, group in groupby(zip(tables, chunks), lambda x: x[0]):
+                self.load_table(
+                    connection, table, (chunk for _, chunk in group), use_copy
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        # Как в import_csv: bulk_create и COPY не отправляют сигналы.
+        Title.objects.using(alias).recalculate_histograms()
+        Review.objects.using(alias).recalculate_comments_count()
+        for model in MODELS.values():
+            bulk_changed.send(sender=model)
+        self.stdout.write(self.style.SUCCESS(
+            f"Генерация завершена за {time.monotonic() - started:.2f} с"
+        ))
+
+    def first_ids(self, alias):
+        """Первые свободные id таблиц, на которые ссылаются другие."""
+        return {
+            table: (
+                MODELS[table]._base_manager.using(alias)
+                .aggregate(last=Max("pk"))["last"] or 0
+            ) + 1
+            for table in ("user", "category", "genre", "title", "review")
+        }
+
+    def make_pool(self, jobs):
+        if jobs <= 1:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+
+    def load_table(self, connection, table, chunks, use_copy):
+        """Пишет пачки таблицы в одной транзакции, пока пул готовит
+        следующие.
+        """
+        model = MODELS[table]
+        fields = get_fields(model, HEADERS[table])
+        write = write_copy if use_copy else write_bulk
+        started = time.monotonic()
+        total = 0
+        with transaction.atomic(using=connection.alias):
+            for count, data in chunks:
+                write(connection, model, fields, data)
+                total += count
+            if model._meta.pk in fields:
+                reset_sequences(connection, model)
+        elapsed = time.monotonic() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{table}: {total} строк за {elapsed:.2f} с, {rate:.0f} строк/с"
+        )
@@ -1,90 +1,517 @@
 import csv
-from collections import defaultdict
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from itertools import islice
 from pathlib import Path
 
+import django
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
 
-from reviews.models import (Category, Comment, Genre,  # isort:skip  # noqa
-                            Review, Title)
+from reviews.dump import CSV_NULL, MODELS, TABLES  # isort:skip
+from reviews.models import ImportCheckpoint, Review, Title  # isort:skip
+from reviews.signals import bulk_changed  # isort:skip
 
 User = get_user_model()
 
 DIR_PATH = settings.BASE_DIR
 
-MODELS = {
-    "category": Category,
-    "comment": Comment,
-    "genre": Genre,
-    "review": Review,
-    "title": Title,
+DEFAULT_CHUNK_SIZE = 5000
+
+# Маркер NULL для COPY - тот же, что пишет выгрузка.
+COPY_NULL = CSV_NULL
+
+# Естественные ключи для инкрементального импорта; остальные таблицы
+# сопоставляются по первичному ключу.
+UPSERT_KEYS = {
+    "user": "username",
+    "category": "slug",
+    "genre": "slug",
 }
 
-TABLES = ["user", "category", "genre", "title",
-          "review", "comment", "genre_title"]
-
-
-def process_users(path):
-    with path.open() as source:
-        csv_reader = csv.reader(source, delimiter=",")
-        header = None
-        for row in csv_reader:
-            if not header:
-                header = row
-                continue
-            keyargs = dict(zip(header, row))
-            User.objects.create_user(**keyargs)  # type:ignore
-
-
-def process_genre_title(path):
-    obj_dict = defaultdict(list)
-    with path.open() as source:
-        csv_reader = csv.reader(source, delimiter=",")
-        header = None
-        for row in csv_reader:
-            if not header:
-                header = row
-                continue
-            keyargs = dict(zip(header, row))
-            title = Title.objects.get(pk=keyargs.get("title_id"))
-            genre = Genre.objects.get(pk=keyargs.get("genre_id"))
-            obj_dict[title].append(genre)
-    for title in obj_dict:
-        title.genre.set(obj_dict[title], clear=True)
-
-
-def process_table(model, path):
-    with path.open() as source:
-        obj_list = []
-        csv_reader = csv.reader(source, delimiter=",")
-        header = None
-        for row in csv_reader:
-            if not header:
-                header = row
-                continue
-            keyargs = dict(zip(header, row))
-            obj_list.append(model(**keyargs))  # type:ignore
-        model.objects.bulk_create(  # type:ignore
-            obj_list, ignore_conflicts=True
+
+def table_dependencies(tables):
+    """Граф зависимостей таблиц по внешним ключам их моделей.
+
+    Для каждой таблицы — множество таблиц, которые должны быть загружены
+    раньше неё (например, ``review`` -> ``{"user", "title"}``).
+    """
+    owners = {MODELS[table]: table for table in tables}
+    graph = {}
+    for table in tables:
+        model = MODELS[table]
+        graph[table] = {
+            owners[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model is not model
+            and field.related_model in owners
+        }
+    return graph
+
+
+def read_header(path):
+    with path.open(newline="") as source:
+        return next(csv.reader(source, delimiter=","), None)
+
+
+def read_chunks(path, size, skip=0):
+    """Читает строки csv пачками, не загружая файл в память целиком.
+
+    Первые ``skip`` строк данных пропускаются.
+    """
+    with path.open(newline="") as source:
+        reader = csv.reader(source, delimiter=",")
+        next(reader, None)
+        reader = islice(reader, skip, None)
+        while True:
+            rows = list(islice(reader, size))
+            if not rows:
+                return
+            yield rows
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with path.open("rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_instances(model, header, rows):
+    """Превращает строки csv в экземпляры модели.
+
+    Заголовок может содержать как имя поля (``category``), так и имя
+    столбца (``category_id``) — оба сводятся к ``attname``.
+    """
+    fields = [model._meta.get_field(key) for key in header]
+    # NULL в csv - маркер CSV_NULL (так пишет выгрузка); для nullable-полей,
+    # где пустая строка недопустима (числа, даты), NULL и пустая строка.
+    nulls = {
+        field.attname: (
+            (CSV_NULL,) if field.empty_strings_allowed else (CSV_NULL, "")
+        )
+        for field in fields if field.null
+    }
+    attnames = [field.attname for field in fields]
+    is_user = model is User
+    for row in rows:
+        values = dict(zip(attnames, row))
+        for attname, markers in nulls.items():
+            if values[attname] in markers:
+                values[attname] = None
+        if is_user and not values.get("password"):
+            # Как create_user(), но без хеширования: make_password(None)
+            # лишь формирует непригодный пароль.
+            values["password"] = make_password(None)
+        yield model(**values)
+
+
+def get_fields(model, header):
+    """Поля для вставки; автоинкрементный pk — только если он есть в csv."""
+    pk = model._meta.pk
+    provided = {model._meta.get_field(key).attname for key in header}
+    return [
+        field for field in model._meta.concrete_fields
+        if field is not pk or pk.attname in provided
+    ]
+
+
+def render_copy(connection, fields, objs):
+    """Готовит пачку в формате csv для COPY FROM STDIN."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for obj in objs:
+        row = []
+        for field in fields:
+            value = field.get_db_prep_save(
+                field.pre_save(obj, add=True), connection
+            )
+            row.append(COPY_NULL if value is None else value)
+        writer.writerow(row)
+    return buffer.getvalue()
+
+
+def prepare_chunk(table, header, rows, alias, use_copy):
+    """Разбирает пачку строк; выполняется в пуле процессов.
+
+    Возвращает число строк и данные для вставки: для COPY — готовый
+    текст, иначе — список экземпляров модели.
+    """
+    model = MODELS[table]
+    objs = list(build_instances(model, header, rows))
+    if use_copy:
+        fields = get_fields(model, header)
+        return len(objs), render_copy(connections[alias], fields, objs)
+    return len(objs), objs
+
+
+def write_copy(connection, model, fields, data):
+    """Вставляет пачку через COPY FROM STDIN (только PostgreSQL)."""
+    quote_name = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '{}')".format(
+        quote_name(model._meta.db_table),
+        ", ".join(quote_name(field.column) for field in fields),
+        COPY_NULL,
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, io.StringIO(data))
+
+
+def write_bulk(connection, model, fields, objs):
+    model._base_manager.using(connection.alias).bulk_create(
+        objs, ignore_conflicts=True
+    )
+
+
+def get_upsert_fields(model, header, key=None):
+    """Поле сопоставления и обновляемые поля для инкрементального импорта.
+
+    Обновляются только столбцы, присутствующие в csv. Поля, которые
+    ведёт само приложение (auto_now, денормализованные счётчики с
+    editable=False), не сравниваются и не перезаписываются: иначе
+    повторный импорт того же файла считал бы строки изменёнными. Если
+    ключа в csv нет, возвращается ``(None, [])`` — строки только
+    вставляются.
+    """
+    key_field = model._meta.get_field(key) if key else model._meta.pk
+    provided = {model._meta.get_field(name).attname for name in header}
+    if key_field.attname not in provided:
+        return None, []
+    update_fields = [
+        field for field in model._meta.concrete_fields
+        if field.attname in provided
+        and field.editable
+        and not field.primary_key
+        and field is not key_field
+    ]
+    return key_field, update_fields
+
+
+def split_changed(key_field, update_fields, objs, existing):
+    """Делит пачку на новые и изменившиеся строки; остальные отбрасывает.
+
+    ``existing`` — ``{ключ: (pk, *значения update_fields)}`` из БД.
+    """
+    to_create, to_update = [], []
+    for obj in objs:
+        key = key_field.to_python(getattr(obj, key_field.attname))
+        if key not in existing:
+            to_create.append(obj)
+            continue
+        pk, *current = existing[key]
+        incoming = [
+            field.to_python(getattr(obj, field.attname))
+            for field in update_fields
+        ]
+        if incoming != current:
+            obj.pk = pk
+            to_update.append(obj)
+    return to_create, to_update
+
+
+def upsert_chunk(connection, model, key_field, update_fields, objs):
+    """Вставляет новые и обновляет изменившиеся строки пачки.
+
+    Возвращает количество созданных и обновлённых строк.
+    """
+    manager = model._base_manager.using(connection.alias)
+    if key_field is None or not update_fields:
+        manager.bulk_create(objs, ignore_conflicts=True)
+        return len(objs), 0
+    # При повторе ключа в пачке побеждает последняя строка.
+    objs = list({
+        key_field.to_python(getattr(obj, key_field.attname)): obj
+        for obj in objs
+    }.values())
+    existing = {
+        row[0]: row[1:]
+        for row in manager.filter(**{
+            f"{key_field.attname}__in": [
+                getattr(obj, key_field.attname) for obj in objs
+            ]
+        }).values_list(
+            key_field.attname, "pk",
+            *(field.attname for field in update_fields)
+        )
+    }
+    to_create, to_update = split_changed(
+        key_field, update_fields, objs, existing
+    )
+    manager.bulk_create(to_create, ignore_conflicts=True)
+    if to_update:
+        # bulk_update не вызывает pre_save, auto_now обновляем сами.
+        auto_now = [
+            field for field in model._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        ]
+        for obj in to_update:
+            for field in auto_now:
+                field.pre_save(obj, add=False)
+        manager.bulk_update(
+            to_update, [field.name for field in update_fields + auto_now]
         )
+    return len(to_create), len(to_update)
+
+
+def reset_sequences(connection, model):
+    """После вставки с явными id сдвигает последовательности pk."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def map_ordered(pool, func, items, window):
+    """Как ``pool.map``, но держит в работе не больше ``window`` задач.
+
+    Без пула выполняет ``func`` в текущем процессе.
+    """
+    if pool is None:
+        for item in items:
+            yield func(*item)
+        return
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(func, *item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 
 class Command(BaseCommand):
     help = u'Импорт из csv файла в базу данных'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+            help=u"Количество строк в одной пачке вставки",
+        )
+        parser.add_argument(
+            "--jobs", type=int, default=os.cpu_count() or 1,
+            help=u"Количество процессов разбора csv; 1 — без пула",
+        )
+        parser.add_argument(
+            "--data-dir", default=Path(DIR_PATH, "static", "data"),
+            help=u"Каталог с csv файлами",
+        )
+        parser.add_argument(
+            "--no-copy", action="store_true",
+            help=u"Не использовать COPY даже на PostgreSQL "
+                 u"(bulk_create пропускает уже существующие строки)",
+        )
+        parser.add_argument(
+            "--incremental", action="store_true",
+            help=u"Обновлять существующие строки, пропускать неизменённые "
+                 u"файлы и продолжать прерванный импорт с контрольной точки",
+        )
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS,
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.output_lock = threading.Lock()
+        connection = connections[options["database"]]
+        self.use_copy = (
+            connection.vendor == "postgresql"
+            and not options["no_copy"]
+            and not options["incremental"]
+        )
+        # SQLite не допускает параллельных писателей.
+        writers = 1 if connection.vendor == "sqlite" else len(TABLES)
+
+        started = time.monotonic()
+        # Таблицы, в которых импорт вставил или изменил строки.
+        self.changed = set()
+        self.pool = self.make_pool(options["jobs"])
+        try:
+            timings = self.schedule(table_dependencies(TABLES), writers)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+
+        # bulk_create и COPY не отправляют сигналы, счётчики пересчитываем
+        # разом - только если изменились таблицы, из которых они считаются.
+        if self.changed & {"title", "review"}:
+            Title.objects.using(connection.alias).recalculate_histograms()
+        if self.changed & {"review", "comment"}:
+            Review.objects.using(
+                connection.alias
+            ).recalculate_comments_count()
+        for table in TABLES:
+            if table in self.changed:
+                bulk_changed.send(sender=MODELS[table])
 
         for table in TABLES:
-            path = Path(DIR_PATH, "static", "data", f"{table}.csv")
+            total, elapsed = timings[table]
+            self.stdout.write(f"{table}: {total} строк за {elapsed:.2f} с")
+        self.stdout.write(self.style.SUCCESS(
+            f"Импорт завершён за {time.monotonic() - started:.2f} с"
+        ))
+
+    def make_pool(self, jobs):
+        if jobs <= 1:
+            return None
+        # Процессы запускаются через spawn и не наследуют открытые
+        # соединения с БД; Django настраивается до импорта этого модуля.
+        return ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+
+    def schedule(self, graph, writers):
+        """Загружает таблицу, как только загружены все её зависимости.
+
+        Независимые таблицы (user, category, genre) грузятся одновременно,
+        у каждой — свой поток-писатель.
+        """
+        timings = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=writers) as executor:
+            while len(timings) < len(graph):
+                for table in TABLES:
+                    ready = (
+                        table not in timings
+                        and table not in running.values()
+                        and graph[table] <= timings.keys()
+                    )
+                    if ready:
+                        future = executor.submit(self.load_table, table)
+                        running[future] = table
+                if not running:
+                    raise CommandError(
+                        u"Циклическая зависимость таблиц: "
+                        + ", ".join(sorted(set(graph) - timings.keys()))
+                    )
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    timings[running.pop(future)] = future.result()
+        return timings
 
-            if path.stem == "user":
-                process_users(path)
-                continue
+    def load_table(self, table):
+        """Загружает одну таблицу; работает в своём потоке-писателе.
+
+        Разбор пачек идёт в пуле процессов, вставка — только здесь.
+        """
+        alias = self.options["database"]
+        connection = connections[alias]
+        path = Path(self.options["data_dir"], f"{table}.csv")
+        started = time.monotonic()
+        try:
+            header = read_header(path)
+            if header is None:
+                return 0, 0.0
+            if self.options["incremental"]:
+                total = self.load_incremental(connection, table, path, header)
+            else:
+                total = self.load_full(connection, table, path, header)
+        finally:
+            # Соединения Django привязаны к потоку; закрываем своё.
+            connection.close()
+        return total, time.monotonic() - started
+
+    def prepare(self, table, path, header, skip=0):
+        chunks = (
+            (table, header, rows, self.options["database"], self.use_copy)
+            for rows in read_chunks(path, self.options["chunk_size"], skip)
+        )
+        window = 2 * max(self.options["jobs"], 1)
+        return map_ordered(self.pool, prepare_chunk, chunks, window)
+
+    def load_full(self, connection, table, path, header):
+        """Вся таблица — в одной транзакции."""
+        model = MODELS[table]
+        fields = get_fields(model, header)
+        write = write_copy if self.use_copy else write_bulk
+        started = time.monotonic()
+        total = 0
+        with transaction.atomic(using=connection.alias):
+            for count, data in self.prepare(table, path, header):
+                write(connection, model, fields, data)
+                total += count
+                self.report(table, total, started)
+            if model._meta.pk in fields:
+                reset_sequences(connection, model)
+        if total:
+            self.changed.add(table)
+        return total
+
+    def load_incremental(self, connection, table, path, header):
+        """Upsert пачками; каждая пачка коммитится вместе с контрольной
+        точкой, поэтому повторный запуск продолжает с места остановки.
+        """
+        model = MODELS[table]
+        alias = connection.alias
+        content_hash = file_hash(path)
+        checkpoint, _ = ImportCheckpoint.objects.using(alias).get_or_create(
+            table=table, defaults={"content_hash": content_hash}
+        )
+        if checkpoint.content_hash != content_hash:
+            # Файл изменился: upsert идемпотентен, начинаем сначала.
+            checkpoint.content_hash = content_hash
+            checkpoint.rows_done = 0
+            checkpoint.completed = False
+        if checkpoint.completed:
+            self.write(f"{table}: файл не изменился, пропуск")
+            return 0
+        if checkpoint.rows_done:
+            # Прерванный запуск уже записал часть строк, но не дошёл до
+            # пересчёта счётчиков.
+            self.changed.add(table)
+            self.write(
+                f"{table}: продолжение со строки {checkpoint.rows_done}"
+            )
+
+        key_field, update_fields = get_upsert_fields(
+            model, header, UPSERT_KEYS.get(table)
+        )
+        started = time.monotonic()
+        total = created = updated = 0
+        for count, objs in self.prepare(
+            table, path, header, skip=checkpoint.rows_done
+        ):
+            with transaction.atomic(using=alias):
+                stats = upsert_chunk(
+                    connection, model, key_field, update_fields, objs
+                )
+                checkpoint.rows_done += count
+                checkpoint.save(using=alias)
+            total += count
+            created += stats[0]
+            updated += stats[1]
+            self.report(
+                table, total, started,
+                f", создано {created}, обновлено {updated}",
+            )
+        with transaction.atomic(using=alias):
+            reset_sequences(connection, model)
+            checkpoint.completed = True
+            checkpoint.save(using=alias)
+        if created or updated:
+            self.changed.add(table)
+        return total
 
-            if path.stem == "genre_title":
-                process_genre_title(path)
-                continue
+    def report(self, table, total, started, extra=""):
+        elapsed = time.monotonic() - started
+        rate = total / elapsed if elapsed else 0
+        self.write(f"{table}: {total} строк, {rate:.0f} строк/с{extra}")
 
-            model = MODELS.get(f"{path.stem}")
-            process_table(model, path)
+    def write(self, message):
+        with self.output_lock:
+            self.stdout.write(message)
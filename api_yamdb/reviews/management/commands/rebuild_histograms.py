@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title  # isort:skip
+from reviews.signals import bulk_changed  # isort:skip
+
+
+class Command(BaseCommand):
+    help = (u'Пересчёт гистограмм оценок и рейтинга всех произведений '
+            u'за один проход по таблице отзывов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help=u"Произведений в одном UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        titles = Title.objects.recalculate_histograms(options["batch_size"])
+        bulk_changed.send(sender=Title)
+        self.stdout.write(
+            f"Пересчитаны гистограммы оценок {titles} произведений "
+            "с отзывами."
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Review, Title  # isort:skip
+from reviews.signals import bulk_changed  # isort:skip
+
+
+class Command(BaseCommand):
+    help = (u'Пересчёт денормализованного рейтинга произведений '
+            u'и счётчиков комментариев отзывов')
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            titles = Title.objects.recalculate_ratings()
+            reviews = Review.objects.recalculate_comments_count()
+        bulk_changed.send(sender=Title)
+        bulk_changed.send(sender=Review)
+        self.stdout.write(
+            f"Пересчитан рейтинг {titles} произведений "
+            f"и счётчики комментариев {reviews} отзывов."
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import TitleRanking  # isort:skip
+
+
+class Command(BaseCommand):
+    help = (u'Полный пересчёт топов произведений (reviews.TitleRanking) '
+            u'с текущей средней оценкой; запускается по расписанию')
+
+    def handle(self, *args, **kwargs):
+        TitleRanking.objects.rebuild()
+        self.stdout.write(
+            f"Пересчитано {TitleRanking.objects.count()} строк топов, "
+            f"средняя оценка {TitleRanking.objects.get_prior():.2f}."
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:05
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    ('title_name_trgm_idx', 'reviews_title'),
+    ('genre_name_trgm_idx', 'reviews_genre'),
+    ('category_name_trgm_idx', 'reviews_category'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes exist only in PostgreSQL; other backends keep
+    # sequential scans for substring search.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table in TRIGRAM_INDEXES:
+        # Expression matches the SQL Django emits for `icontains`.
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin ((UPPER(name::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comments_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = (Comment.objects.filter(review=OuterRef('pk'))
+                               .order_by()
+                               .values('review')
+                               .annotate(total=Count('id'))
+                               .values('total'))
+    Review.objects.update(comments_count=Coalesce(Subquery(comments), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of comments to the review', verbose_name='comments count'),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
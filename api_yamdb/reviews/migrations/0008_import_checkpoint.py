@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(help_text='Imported table name', max_length=64, unique=True, verbose_name='table')),
+                ('content_hash', models.CharField(help_text='SHA-256 of the imported file', max_length=64, verbose_name='content hash')),
+                ('rows_done', models.PositiveIntegerField(default=0, help_text='Number of committed rows', verbose_name='rows done')),
+                ('completed', models.BooleanField(default=False, help_text='Whether the whole file was imported', verbose_name='completed')),
+                ('modified', models.DateTimeField(auto_now=True, help_text='Last modification time', verbose_name='modified')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка импорта',
+                'verbose_name_plural': 'Контрольные точки импорта',
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_title_ranking(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    weight = settings.TITLE_RANKING_PRIOR_WEIGHT
+    totals = Title.objects.aggregate(
+        total=models.Sum('rating_sum'), count=models.Sum('rating_count')
+    )
+    # Без отзывов - середина шкалы 1-10, как в TitleRanking.get_prior().
+    mean = totals['total'] / totals['count'] if totals['count'] else 5.5
+    genre_map = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+        'title_id', 'genre_id'
+    ).iterator():
+        genre_map.setdefault(title_id, []).append(genre_id)
+    rows = Title.objects.values_list(
+        'pk', 'category_id', 'year', 'rating_sum', 'rating_count'
+    )
+    TitleRanking.objects.bulk_create(
+        (
+            TitleRanking(
+                title_id=pk, genre_id=genre_id, category_id=category_id,
+                year=year,
+                score=(weight * mean + rating_sum) / (weight + rating_count),
+            )
+            for pk, category_id, year, rating_sum, rating_count
+            in rows.iterator()
+            for genre_id in [None, *genre_map.get(pk, ())]
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(help_text='Title publish year', verbose_name='year')),
+                ('score', models.FloatField(help_text='Bayesian average review score', verbose_name='score')),
+                ('category', models.ForeignKey(help_text='Title category', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.Category', verbose_name='category')),
+                ('genre', models.ForeignKey(blank=True, help_text='Genre of the ranking, empty for the overall one', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.Genre', verbose_name='genre')),
+                ('title', models.ForeignKey(help_text='Ranked title', on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Title', verbose_name='title')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг произведения',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', '-score', 'title'], name='ranking_genre_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'category', '-score', 'title'], name='ranking_category_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'year', '-score', 'title'], name='ranking_year_score_idx'),
+        ),
+        migrations.RunPython(fill_title_ranking, migrations.RunPython.noop),
+    ]
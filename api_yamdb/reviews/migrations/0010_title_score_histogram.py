@@ -0,0 +1,83 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_score_histogram(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = (Review.objects.filter(title=OuterRef('pk'))
+                             .order_by()
+                             .values('title'))
+    Title.objects.update(**{
+        f'score_{score}_count': Coalesce(
+            Subquery(reviews.filter(score=score)
+                            .annotate(total=Count('id'))
+                            .values('total')),
+            0
+        )
+        for score in range(1, 11)
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 1', verbose_name='score 1 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 2', verbose_name='score 2 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 3', verbose_name='score 3 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 4', verbose_name='score 4 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 5', verbose_name='score 5 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 6', verbose_name='score 6 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 7', verbose_name='score 7 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 8', verbose_name='score 8 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 9', verbose_name='score 9 count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_10_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews scoring 10', verbose_name='score 10 count'),
+        ),
+        migrations.RunPython(fill_score_histogram, migrations.RunPython.noop),
+    ]
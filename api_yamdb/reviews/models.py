@@ -1,11 +1,37 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Avg, Count, ExpressionWrapper, F, FloatField,
+                              OuterRef, Q, Subquery, Sum, Value)
+from django.db.models.functions import Cast, Coalesce, Now, NullIf
 
 from .validators import validate_title_year
 
 User = get_user_model()
 
+MIN_SCORE = 1
+MAX_SCORE = 10
+SCORES = range(MIN_SCORE, MAX_SCORE + 1)
+# Счётчики отзывов с каждой оценкой: гистограмма оценок произведения.
+HISTOGRAM_FIELDS = tuple(f"score_{score}_count" for score in SCORES)
+# Денормализованные поля произведения, которые меняет только TitleQuerySet.
+RATING_FIELDS = ("rating_sum", "rating_count", "rating", *HISTOGRAM_FIELDS)
+
+
+def stored_fields(instance, excluded):
+    """
+    update_fields для сохранения существующей строки без полей excluded
+    или None для новой строки и явно переданных полей.
+    """
+    if instance._state.adding:
+        return None
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in excluded
+    ]
+
 
 class Category(models.Model):
     """Категории (типы) произведений."""
@@ -53,6 +79,123 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def shift_rating(self, added=None, removed=None):
+        """
+        Сдвигает денормализованный рейтинг и гистограмму оценок
+        произведений одним UPDATE, не читая строки в Python: added -
+        появившаяся оценка, removed - исчезнувшая (при изменении отзыва
+        обе). Всё меняется атомарно относительно конкурентных отзывов.
+        """
+        for score in (added, removed):
+            if score is not None and score not in SCORES:
+                raise ValueError(
+                    f"Score {score} is out of range "
+                    f"{MIN_SCORE}..{MAX_SCORE}."
+                )
+        new_sum = F("rating_sum") + (added or 0) - (removed or 0)
+        new_count = (F("rating_count") + (added is not None)
+                     - (removed is not None))
+        histogram = {}
+        for score, delta in ((added, 1), (removed, -1)):
+            if score is not None:
+                field = HISTOGRAM_FIELDS[score - MIN_SCORE]
+                histogram[field] = histogram.get(field, 0) + delta
+        return self.update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=Cast(new_sum, FloatField()) / NullIf(new_count, 0),
+            modified=Now(),
+            **{field: F(field) + delta
+               for field, delta in histogram.items() if delta},
+        )
+
+    def recalculate_ratings(self):
+        """
+        Пересчитывает рейтинг и гистограмму оценок произведений по
+        таблице отзывов.
+        """
+        reviews = (Review.objects.filter(title=OuterRef("pk"))
+                                 .order_by()
+                                 .values("title"))
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum("score"))
+                                .values("total")),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count("id"))
+                                .values("total")),
+                0
+            ),
+            rating=Subquery(
+                reviews.annotate(average=Avg("score")).values("average"),
+                output_field=FloatField()
+            ),
+            modified=Now(),
+            **{
+                field: Coalesce(
+                    Subquery(reviews.filter(score=score)
+                                    .annotate(total=Count("id"))
+                                    .values("total")),
+                    0
+                )
+                for score, field in zip(SCORES, HISTOGRAM_FIELDS)
+            },
+        )
+
+    def recalculate_histograms(self, batch_size=1000):
+        """
+        Пересчитывает гистограммы оценок и выводимые из них сумму,
+        количество и среднее за один проход по таблице отзывов (группировка
+        по произведению со счётчиком каждой оценки) вместо подзапроса на
+        каждое поле, как в recalculate_ratings. Для всех произведений это
+        быстрее. Возвращает число произведений с отзывами.
+        """
+        rows = (
+            Review.objects.using(self.db)
+                  .filter(title__in=self.values("pk"))
+                  .order_by()
+                  .values("title_id")
+                  .annotate(**{
+                      field: Count("id", filter=Q(score=score))
+                      for score, field in zip(SCORES, HISTOGRAM_FIELDS)
+                  })
+        )
+        reviewed = 0
+        with transaction.atomic(using=self.db):
+            self.update(
+                rating_sum=0, rating_count=0, rating=None, modified=Now(),
+                **{field: 0 for field in HISTOGRAM_FIELDS}
+            )
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(self._from_histogram(row))
+                if len(batch) == batch_size:
+                    self.bulk_update(batch, RATING_FIELDS)
+                    reviewed += len(batch)
+                    batch = []
+            self.bulk_update(batch, RATING_FIELDS)
+        return reviewed + len(batch)
+
+    def _from_histogram(self, row):
+        histogram = {field: row[field] for field in HISTOGRAM_FIELDS}
+        rating_sum = sum(
+            score * histogram[field]
+            for score, field in zip(SCORES, HISTOGRAM_FIELDS)
+        )
+        rating_count = sum(histogram.values())
+        return self.model(
+            pk=row["title_id"],
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=rating_sum / rating_count,
+            **histogram
+        )
+
+
 class Title(models.Model):
     """
     Произведения, к которым пишут отзывы (определённый фильм, книга или песня).
@@ -84,6 +227,94 @@ class Title(models.Model):
         verbose_name="genre",
         help_text="Title genre set"
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="rating sum",
+        help_text="Sum of review scores"
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="rating count",
+        help_text="Number of review scores"
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name="rating",
+        help_text="Average review score"
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name="modified",
+        help_text="Last modification time"
+    )
+    # Гистограмма оценок, поля HISTOGRAM_FIELDS.
+    score_1_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 1 count",
+        help_text="Number of reviews scoring 1"
+    )
+    score_2_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 2 count",
+        help_text="Number of reviews scoring 2"
+    )
+    score_3_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 3 count",
+        help_text="Number of reviews scoring 3"
+    )
+    score_4_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 4 count",
+        help_text="Number of reviews scoring 4"
+    )
+    score_5_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 5 count",
+        help_text="Number of reviews scoring 5"
+    )
+    score_6_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 6 count",
+        help_text="Number of reviews scoring 6"
+    )
+    score_7_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 7 count",
+        help_text="Number of reviews scoring 7"
+    )
+    score_8_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 8 count",
+        help_text="Number of reviews scoring 8"
+    )
+    score_9_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 9 count",
+        help_text="Number of reviews scoring 9"
+    )
+    score_10_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="score 10 count",
+        help_text="Number of reviews scoring 10"
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ("-id",)
@@ -95,10 +326,209 @@ class Title(models.Model):
                 name="unique_title_name_category"
             ),
         ]
+        # Фильтры и фасеты списка (api.facets): группировки по году и по
+        # категории с годом читаются из индексов.
+        indexes = [
+            models.Index(fields=["year"], name="title_year_idx"),
+            models.Index(
+                fields=["category", "year"],
+                name="title_category_year_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Сохранение существующего произведения не пишет RATING_FIELDS:
+        их сдвигают отзывы через F(), и устаревшие значения экземпляра
+        затёрли бы конкурентные сдвиги.
+        """
+        if kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = stored_fields(self, RATING_FIELDS)
+        super().save(*args, **kwargs)
+
+    @property
+    def histogram(self):
+        """Число отзывов с каждой оценкой от MIN_SCORE до MAX_SCORE."""
+        return [getattr(self, field) for field in HISTOGRAM_FIELDS]
+
+
+class TitleRankingQuerySet(models.QuerySet):
+    prior_key = "reviews:rankings:prior"
+
+    def get_prior(self, refresh=False):
+        """
+        Средняя оценка по всем отзывам, к которой байесовское среднее
+        притягивает произведения с малым числом отзывов. Кэшируется на
+        TITLE_RANKING_PRIOR_TTL; refresh пересчитывает её. Пока отзывов
+        нет, это середина шкалы.
+        """
+        prior = None if refresh else cache.get(self.prior_key)
+        if prior is not None:
+            return prior
+        totals = Title.objects.using(self.db).aggregate(
+            total=Sum("rating_sum"), count=Sum("rating_count")
+        )
+        if not totals["count"]:
+            return (MIN_SCORE + MAX_SCORE) / 2
+        prior = totals["total"] / totals["count"]
+        cache.set(self.prior_key, prior, settings.TITLE_RANKING_PRIOR_TTL)
+        return prior
+
+    def refresh_scores(self):
+        """
+        Пересчитывает оценку строк одним UPDATE по счётчикам рейтинга
+        их произведений: (C * m + сумма оценок) / (C + число оценок).
+        """
+        weight = float(settings.TITLE_RANKING_PRIOR_WEIGHT)
+        titles = Title.objects.filter(pk=OuterRef("title_id"))
+        return self.update(score=ExpressionWrapper(
+            (Value(weight * self.get_prior())
+             + Subquery(titles.values("rating_sum")))
+            / (Value(weight) + Subquery(titles.values("rating_count"))),
+            output_field=FloatField()
+        ))
+
+    def top(self, limit, genre=None, category=None, year=None):
+        """
+        (title_id, score) лучших произведений: без жанра - общий топ.
+        Каждый вариант фильтра - чтение диапазона одного из индексов.
+        """
+        rankings = self.filter(genre=genre)
+        if category is not None:
+            rankings = rankings.filter(category=category)
+        if year is not None:
+            rankings = rankings.filter(year=year)
+        return rankings.order_by("-score", "title_id").values_list(
+            "title_id", "score"
+        )[:limit]
+
+    def rebuild(self, title_ids=None, batch_size=1000):
+        """
+        Заново строит строки рейтинга произведений: одна строка на
+        произведение и по одной на каждый его жанр. Полный пересчёт (без
+        title_ids) берёт свежую среднюю оценку, пересчёт отдельных
+        произведений - закэшированную, без агрегации по всем
+        произведениям.
+        """
+        weight = settings.TITLE_RANKING_PRIOR_WEIGHT
+        mean = self.get_prior(refresh=title_ids is None)
+        titles = Title.objects.using(self.db).order_by("pk")
+        rankings = self.all()
+        if title_ids is not None:
+            titles = titles.filter(pk__in=title_ids)
+            rankings = rankings.filter(title_id__in=title_ids)
+        rows = titles.values_list(
+            "pk", "category_id", "year", "rating_sum", "rating_count"
+        )
+        with transaction.atomic(using=self.db):
+            rankings.delete()
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) == batch_size:
+                    self._create_rows(batch, weight * mean, weight)
+                    batch = []
+            self._create_rows(batch, weight * mean, weight)
+
+    def _create_rows(self, titles, prior_total, weight):
+        genre_map = {}
+        through_rows = (
+            Title.genre.through.objects.using(self.db)
+                 .filter(title_id__in=[row[0] for row in titles])
+                 .values_list("title_id", "genre_id")
+        )
+        for title_id, genre_id in through_rows:
+            genre_map.setdefault(title_id, []).append(genre_id)
+        self.bulk_create(
+            self.model(
+                title_id=pk, genre_id=genre_id, category_id=category_id,
+                year=year,
+                score=(prior_total + rating_sum) / (weight + rating_count),
+            )
+            for pk, category_id, year, rating_sum, rating_count in titles
+            for genre_id in [None, *genre_map.get(pk, ())]
+        )
+
+
+class TitleRanking(models.Model):
+    """
+    Предрасчитанный рейтинг произведений для топов: байесовское среднее
+    оценок, одна строка на произведение (genre пуст) и по строке на
+    каждый его жанр, чтобы топ по жанру, категории или году был чтением
+    диапазона индекса.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name="rankings",
+        verbose_name="title",
+        help_text="Ranked title"
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="genre",
+        help_text="Genre of the ranking, empty for the overall one"
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="category",
+        help_text="Title category"
+    )
+    year = models.PositiveSmallIntegerField(
+        verbose_name="year",
+        help_text="Title publish year"
+    )
+    score = models.FloatField(
+        verbose_name="score",
+        help_text="Bayesian average review score"
+    )
+
+    objects = TitleRankingQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Рейтинг произведения"
+        verbose_name_plural = "Рейтинги произведений"
+        indexes = [
+            models.Index(
+                fields=["genre", "-score", "title"],
+                name="ranking_genre_score_idx"
+            ),
+            models.Index(
+                fields=["genre", "category", "-score", "title"],
+                name="ranking_category_score_idx"
+            ),
+            models.Index(
+                fields=["genre", "year", "-score", "title"],
+                name="ranking_year_score_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title_id}: {self.score:.2f}"
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def recalculate_comments_count(self):
+        """
+        Пересчитывает счётчик комментариев отзывов по таблице комментариев.
+        """
+        comments = (Comment.objects.filter(review=OuterRef("pk"))
+                                   .order_by()
+                                   .values("review")
+                                   .annotate(total=Count("id"))
+                                   .values("total"))
+        return self.update(comments_count=Coalesce(Subquery(comments), 0))
+
 
 class Review(models.Model):
     """Отзывы."""
@@ -128,15 +558,28 @@ class Review(models.Model):
     )
     score = models.IntegerField(
         validators=[
-            MinValueValidator(1, "Score can not be less than one."),
-            MaxValueValidator(10, "Score can not be more than ten.")
+            MinValueValidator(MIN_SCORE, "Score can not be less than one."),
+            MaxValueValidator(MAX_SCORE, "Score can not be more than ten.")
         ],
         verbose_name="score",
         help_text="Review's title score"
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name="modified",
+        help_text="Last modification time"
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="comments count",
+        help_text="Number of comments to the review"
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
-        ordering = ("-pub_date",)
+        ordering = ("-pub_date", "id")
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
         constraints = [
@@ -144,11 +587,46 @@ class Review(models.Model):
                 fields=["author", "title"],
                 name="only_one_review"
             ),
+            # Валидаторы score не работают для bulk_create, update и
+            # импорта, а оценка вне шкалы сломала бы гистограмму.
+            models.CheckConstraint(
+                check=Q(score__gte=MIN_SCORE, score__lte=MAX_SCORE),
+                name="review_score_range"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "id"],
+                name="review_title_pub_date_idx"
+            ),
         ]
 
     def __str__(self):
         return self.title.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating()
+        return instance
+
+    def remember_rating(self):
+        """
+        Запоминает сохранённые в базе произведение и оценку, чтобы при
+        изменении отзыва сдвинуть рейтинг на разницу, а не пересчитывать.
+        """
+        self._saved_rating = (self.__dict__.get("title_id"),
+                              self.__dict__.get("score"))
+
+    def save(self, *args, **kwargs):
+        # comments_count сдвигают только комментарии, как рейтинг
+        # произведения (см. Title.save).
+        if kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = stored_fields(self, ("comments_count",))
+        # Рейтинг произведения обновляется в post_save той же транзакцией.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Комментарии к отзывам."""
@@ -176,11 +654,67 @@ class Comment(models.Model):
         verbose_name="pub_date",
         help_text="Date of comment publication"
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name="modified",
+        help_text="Last modification time"
+    )
 
     class Meta:
         ordering = ("-id",)
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=["review", "-id"],
+                name="comment_review_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.review}"
+
+    def save(self, *args, **kwargs):
+        # Счётчик комментариев отзыва обновляется в post_save той же
+        # транзакцией.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Прогресс инкрементального импорта csv (одна запись на таблицу).
+    """
+    table = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name="table",
+        help_text="Imported table name"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        verbose_name="content hash",
+        help_text="SHA-256 of the imported file"
+    )
+    rows_done = models.PositiveIntegerField(
+        default=0,
+        verbose_name="rows done",
+        help_text="Number of committed rows"
+    )
+    completed = models.BooleanField(
+        default=False,
+        verbose_name="completed",
+        help_text="Whether the whole file was imported"
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name="modified",
+        help_text="Last modification time"
+    )
+
+    class Meta:
+        verbose_name = "Контрольная точка импорта"
+        verbose_name_plural = "Контрольные точки импорта"
+
+    def __str__(self):
+        return f"{self.table}: {self.rows_done}"
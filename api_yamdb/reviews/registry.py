@@ -0,0 +1,125 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+
+from .models import Category, Genre
+
+
+class RegistryData:
+
+    def __init__(self, version, rows, loaded_at):
+        self.version = version
+        self.loaded_at = loaded_at
+        self.rows = rows
+        self.by_id = {}
+        self.by_slug = {}
+        self.representations = []
+        for pk, name, slug in rows:
+            representation = {"name": name, "slug": slug}
+            self.by_id[pk] = representation
+            self.by_slug[slug] = (pk, name, slug)
+            self.representations.append(representation)
+
+
+class ReferenceRegistry:
+    """
+    Кэш небольшого справочника (жанры, категории) в памяти процесса:
+    slug -> id -> name.
+
+    Данные загружаются одним запросом и живут до инвалидации. В своём
+    процессе её делает сигнал записи (после коммита), другие процессы
+    замечают сдвиг общей версии в кэше Django, которую проверяют не чаще
+    раза в REFERENCE_REGISTRY_CHECK_INTERVAL секунд. Версия видна другим
+    процессам, только если кэш общий; с LocMemCache их данные
+    перечитываются не реже раза в REFERENCE_REGISTRY_MAX_AGE секунд.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f"reviews:registry:{model._meta.label_lower}"
+        self._data = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Реестр общий для процесса; поля сериализаторов, которые его
+        # хранят, копируются DRF для каждого экземпляра сериализатора.
+        return self
+
+    def invalidate(self):
+        self._data = None
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, time.time_ns(), timeout=None)
+
+    def _shared_version(self):
+        version = cache.get(self.version_key)
+        if version is not None:
+            return version
+        cache.add(self.version_key, time.time_ns(), timeout=None)
+        return cache.get(self.version_key)
+
+    def _get_data(self, reload=False):
+        data = self._data
+        now = time.monotonic()
+        interval = settings.REFERENCE_REGISTRY_CHECK_INTERVAL
+        max_age = settings.REFERENCE_REGISTRY_MAX_AGE
+        if (not reload and data is not None
+                and now - self._checked_at < interval):
+            return data
+        version = self._shared_version()
+        if (reload or data is None or data.version != version
+                or now - data.loaded_at >= max_age):
+            with self._lock:
+                data = RegistryData(
+                    version,
+                    list(self.model.objects.values_list("id", "name", "slug")),
+                    now
+                )
+                self._data = data
+        self._checked_at = now
+        return data
+
+    @property
+    def version(self):
+        return self._get_data().version
+
+    def get_by_slug(self, slug):
+        """Экземпляр модели по slug без запроса к базе или None."""
+        row = self._get_data().by_slug.get(slug)
+        if row is None:
+            # Запись могла появиться в другом процессе после проверки версии.
+            row = self._get_data(reload=True).by_slug.get(slug)
+        if row is None:
+            return None
+        return self.model.from_db(
+            router.db_for_write(self.model), ("id", "name", "slug"), row
+        )
+
+    def get_representation(self, pk):
+        """
+        Представление {"name", "slug"} по id. Если записи нет и после
+        перезагрузки (реестр читает реплику, которая отстаёт), она
+        читается из основной базы; удалённая запись - None.
+        """
+        representation = self._get_data().by_id.get(pk)
+        if representation is None:
+            representation = self._get_data(reload=True).by_id.get(pk)
+        if representation is not None:
+            return representation
+        return (
+            self.model.objects.using(router.db_for_write(self.model))
+                .filter(pk=pk).values("name", "slug").first()
+        )
+
+    def as_list(self):
+        """Все записи в порядке Meta.ordering модели."""
+        return self._get_data().representations
+
+
+genres = ReferenceRegistry(Genre)
+categories = ReferenceRegistry(Category)
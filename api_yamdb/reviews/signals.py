@@ -0,0 +1,145 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from . import registry
+from .models import Category, Comment, Genre, Review, Title, TitleRanking
+from .tasks import rebuild_rankings
+
+from tasks.queue import enqueue  # isort:skip
+
+# Отправляется после массовых операций (bulk_create, update), которые
+# не вызывают post_save/post_delete; sender - изменённая модель, pks -
+# первичные ключи изменённых записей, если они известны.
+bulk_changed = Signal()
+
+
+def refresh_rankings(title_ids):
+    TitleRanking.objects.filter(
+        title_id__in=[pk for pk in title_ids if pk is not None]
+    ).refresh_scores()
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    old_title_id, old_score = getattr(
+        instance, "_saved_rating", (None, None)
+    )
+    if created:
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            added=instance.score
+        )
+    elif old_title_id is None or old_score is None:
+        Title.objects.filter(
+            pk=instance.title_id
+        ).recalculate_ratings()
+    elif old_title_id != instance.title_id:
+        Title.objects.filter(pk=old_title_id).shift_rating(
+            removed=old_score
+        )
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            added=instance.score
+        )
+    elif old_score != instance.score:
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            added=instance.score, removed=old_score
+        )
+    if (old_title_id, old_score) != (instance.title_id, instance.score):
+        refresh_rankings((old_title_id, instance.title_id))
+    instance.remember_rating()
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    Title.objects.filter(pk=instance.title_id).shift_rating(
+        removed=instance.score
+    )
+    refresh_rankings((instance.title_id,))
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Review.objects.filter(pk=instance.review_id).update(
+            comments_count=F("comments_count") + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    Review.objects.filter(pk=instance.review_id).update(
+        comments_count=F("comments_count") - 1
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_title_on_genre_change(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    # Жанры входят в представление произведения, поэтому их смена
+    # должна сдвигать его Last-Modified.
+    if reverse:
+        if action == "pre_clear":
+            titles = Title.objects.filter(genre=instance)
+        elif action in ("post_add", "post_remove"):
+            titles = Title.objects.filter(pk__in=pk_set)
+        else:
+            return
+    elif action in ("post_add", "post_remove", "post_clear"):
+        titles = Title.objects.filter(pk=instance.pk)
+    else:
+        return
+    titles.update(modified=Now())
+
+
+@receiver(post_save, sender=Title)
+def rebuild_rankings_on_title_save(sender, instance, raw, **kwargs):
+    # Категория и год копируются в строки топов.
+    if not raw:
+        TitleRanking.objects.rebuild([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def rebuild_rankings_on_genre_change(sender, instance, action, reverse,
+                                     pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        TitleRanking.objects.rebuild([instance.pk])
+    elif action == "post_clear":
+        TitleRanking.objects.filter(genre=instance).delete()
+    else:
+        TitleRanking.objects.rebuild(pk_set)
+
+
+@receiver(bulk_changed, sender=Title)
+@receiver(bulk_changed, sender=Review)
+@receiver(bulk_changed, sender=Title.genre.through)
+def rebuild_rankings_on_bulk_change(sender, pks=None, **kwargs):
+    # Массовые записи пересчитываются воркером очереди, задачи одной
+    # пачки объединяются (reviews.tasks).
+    enqueue(rebuild_rankings, title_ids=pks if sender is Title else None)
+
+
+def invalidate_registry(reference_registry):
+    # Сразу - для чтений внутри этой транзакции, после коммита - чтобы
+    # другие потоки и процессы не закэшировали данные до коммита.
+    reference_registry.invalidate()
+    transaction.on_commit(reference_registry.invalidate)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(bulk_changed, sender=Genre)
+def invalidate_genre_registry(sender, **kwargs):
+    invalidate_registry(registry.genres)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(bulk_changed, sender=Category)
+def invalidate_category_registry(sender, **kwargs):
+    invalidate_registry(registry.categories)
@@ -0,0 +1,20 @@
+from .models import TitleRanking
+
+from tasks.queue import task  # isort:skip
+
+
+@task("reviews.rebuild_rankings", batch=True)
+def rebuild_rankings(payloads):
+    """Пересчитывает топы после массовых изменений одним проходом.
+
+    Пачка задач объединяется: пересчитываются произведения из всех
+    payload, а если хоть в одном они не указаны — все.
+    """
+    title_ids = set()
+    for payload in payloads:
+        if payload.get("title_ids") is None:
+            TitleRanking.objects.rebuild()
+            return {}
+        title_ids.update(payload["title_ids"])
+    TitleRanking.objects.rebuild(title_ids)
+    return {}
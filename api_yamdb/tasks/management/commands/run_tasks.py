@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.worker import run_pending  # isort:skip
+
+
+class Command(BaseCommand):
+    help = u'Воркер очереди отложенных задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads", type=int, default=settings.TASK_WORKER_THREADS,
+            help=u"Количество потоков выполнения",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.TASK_BATCH_SIZE,
+            help=u"Сколько задач забирать за раз",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help=u"Выполнить готовые задачи и выйти",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done = run_pending(options["batch_size"], options["threads"])
+            if done:
+                self.stdout.write(f"Выполнено задач: {done}")
+            if options["once"]:
+                return
+            if not done:
+                time.sleep(settings.TASK_POLL_INTERVAL)
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:02
+
+from django.db import migrations, models
+import django.utils.timezone
+import tasks.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Registered task name', max_length=128, verbose_name='name')),
+                ('payload', models.TextField(default='{}', help_text='Task keyword arguments as JSON', verbose_name='payload')),
+                ('status', models.CharField(choices=[('queued', 'queued'), ('running', 'running'), ('failed', 'failed')], default='queued', help_text='Task status', max_length=16, verbose_name='status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Number of started attempts', verbose_name='attempts')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=tasks.models.default_max_attempts, help_text='Attempts before the task is marked failed', verbose_name='max attempts')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time to run the task', verbose_name='run at')),
+                ('locked_at', models.DateTimeField(blank=True, help_text='When a worker claimed the task', null=True, verbose_name='locked at')),
+                ('last_error', models.TextField(blank=True, help_text='Traceback of the last failed attempt', verbose_name='last error')),
+                ('created', models.DateTimeField(auto_now_add=True, help_text='Enqueue time', verbose_name='created')),
+            ],
+            options={
+                'verbose_name': 'Задача',
+                'verbose_name_plural': 'Задачи',
+                'ordering': ('run_at', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+import json
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+def default_max_attempts():
+    return settings.TASK_MAX_ATTEMPTS
+
+
+class Task(models.Model):
+    """
+    Отложенная задача. Выполненные задачи удаляются, неудачные после
+    исчерпания попыток остаются со статусом failed.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "queued"),
+        (RUNNING, "running"),
+        (FAILED, "failed"),
+    )
+
+    name = models.CharField(
+        max_length=128,
+        verbose_name="name",
+        help_text="Registered task name"
+    )
+    payload = models.TextField(
+        default="{}",
+        verbose_name="payload",
+        help_text="Task keyword arguments as JSON"
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name="status",
+        help_text="Task status"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="attempts",
+        help_text="Number of started attempts"
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=default_max_attempts,
+        verbose_name="max attempts",
+        help_text="Attempts before the task is marked failed"
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="run at",
+        help_text="Earliest time to run the task"
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="locked at",
+        help_text="When a worker claimed the task"
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name="last error",
+        help_text="Traceback of the last failed attempt"
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="created",
+        help_text="Enqueue time"
+    )
+
+    class Meta:
+        ordering = ("run_at", "id")
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+        indexes = [
+            models.Index(
+                fields=["status", "run_at"],
+                name="task_status_run_at_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
+
+    @property
+    def kwargs(self):
+        return json.loads(self.payload)
@@ -0,0 +1,44 @@
+import json
+from collections import namedtuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Task
+
+TaskSpec = namedtuple("TaskSpec", ("name", "func", "batch"))
+
+registry = {}
+
+
+def task(name=None, batch=False):
+    """Регистрирует функцию как задачу очереди.
+
+    Обычная задача вызывается как ``func(**payload)``. Пакетная
+    (``batch=True``) получает список payload всех взятых задач с этим
+    именем и может вернуть ``{индекс: ошибка}`` для неудавшихся —
+    остальные считаются выполненными.
+    """
+    def decorator(func):
+        spec = TaskSpec(name or f"{func.__module__}.{func.__name__}",
+                        func, batch)
+        registry[spec.name] = spec
+        func.task_name = spec.name
+        return func
+    return decorator
+
+
+def enqueue(func, run_at=None, using=None, **kwargs):
+    """Ставит задачу в очередь.
+
+    Запись создаётся в текущей транзакции, поэтому при её откате задача
+    тоже не появится.
+    """
+    name = getattr(func, "task_name", func)
+    if name not in registry:
+        raise LookupError(f"Task {name!r} is not registered.")
+    return Task.objects.using(using).create(
+        name=name,
+        payload=json.dumps(kwargs, cls=DjangoJSONEncoder),
+        run_at=run_at or timezone.now(),
+    )
@@ -0,0 +1,150 @@
+import logging
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .queue import registry
+
+logger = logging.getLogger(__name__)
+
+
+def claim(batch_size, using=None):
+    """Забирает до ``batch_size`` готовых задач и помечает их running.
+
+    Задачи, зависшие в running дольше TASK_LOCK_TIMEOUT (упавший
+    воркер), забираются повторно. На PostgreSQL параллельные воркеры
+    не мешают друг другу благодаря SKIP LOCKED.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    tasks = Task.objects.using(using)
+    with transaction.atomic(using=using):
+        ids = list(
+            tasks.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Task.QUEUED, run_at__lte=now)
+                | Q(status=Task.RUNNING, locked_at__lt=stale)
+            )
+            .order_by("run_at", "id")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        tasks.filter(pk__in=ids).update(
+            status=Task.RUNNING, locked_at=now, attempts=F("attempts") + 1
+        )
+    return list(tasks.filter(pk__in=ids))
+
+
+def complete(tasks):
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).delete()
+
+
+def fail(tasks, error):
+    """Откладывает задачи с экспоненциальной задержкой или, если попытки
+    исчерпаны, помечает их failed.
+    """
+    now = timezone.now()
+    for task in tasks:
+        task.last_error = error
+        task.locked_at = None
+        if task.attempts >= task.max_attempts:
+            task.status = Task.FAILED
+            logger.error("Task %s failed: %s", task, error)
+        else:
+            task.status = Task.QUEUED
+            task.run_at = now + timedelta(
+                seconds=settings.TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+            )
+        task.save(update_fields=(
+            "last_error", "locked_at", "status", "run_at"
+        ))
+
+
+def execute(name, tasks):
+    """Выполняет взятые задачи одного имени."""
+    spec = registry.get(name)
+    if spec is None:
+        fail(tasks, f"Task {name!r} is not registered.")
+    elif spec.batch:
+        run_batch(spec, tasks)
+    else:
+        for task in tasks:
+            run_single(spec, task)
+
+
+def run_batch(spec, tasks):
+    try:
+        errors = spec.func([task.kwargs for task in tasks]) or {}
+    except Exception:
+        fail(tasks, traceback.format_exc())
+        return
+    for index, error in errors.items():
+        fail([tasks[index]], str(error))
+    complete([
+        task for index, task in enumerate(tasks) if index not in errors
+    ])
+
+
+def run_single(spec, task):
+    try:
+        spec.func(**task.kwargs)
+    except Exception:
+        fail([task], traceback.format_exc())
+        return
+    complete([task])
+
+
+def split_work(tasks):
+    """Пакетные задачи — одна единица работы на имя, остальные — по одной
+    задаче, чтобы их можно было раздать разным потокам.
+    """
+    groups = defaultdict(list)
+    for task in tasks:
+        groups[task.name].append(task)
+    units = []
+    for name, group in groups.items():
+        spec = registry.get(name)
+        if spec is not None and not spec.batch:
+            units.extend((name, [task]) for task in group)
+        else:
+            units.append((name, group))
+    return units
+
+
+def run_unit(name, tasks):
+    try:
+        execute(name, tasks)
+    except Exception:
+        logger.exception("Task worker thread failed on %s", name)
+    finally:
+        # Соединения Django привязаны к потоку.
+        connections.close_all()
+
+
+def run_pending(batch_size=None, threads=1):
+    """Выполняет все готовые задачи и возвращает их количество.
+
+    При ``threads > 1`` единицы работы выполняются в пуле потоков,
+    иначе — в текущем потоке.
+    """
+    batch_size = batch_size or settings.TASK_BATCH_SIZE
+    total = 0
+    while True:
+        tasks = claim(batch_size)
+        if not tasks:
+            return total
+        total += len(tasks)
+        units = split_work(tasks)
+        if threads <= 1:
+            for name, group in units:
+                execute(name, group)
+            continue
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for name, group in units:
+                executor.submit(run_unit, name, group)
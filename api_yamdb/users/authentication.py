@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from api_yamdb.checks import is_process_local  # isort:skip
+
+User = get_user_model()
+
+USER_VERSION_KEY = "auth:user:{pk}"
+ALL_USERS_VERSION_KEY = "auth:users"
+
+
+def _shared_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def _versions(pk):
+    keys = [USER_VERSION_KEY.format(pk=pk), ALL_USERS_VERSION_KEY]
+    versions = _shared_cache().get_many(keys)
+    return tuple(versions.get(key) for key in keys)
+
+
+def _bump(key):
+    cache = _shared_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+class UserCache:
+    """
+    LRU-кэш пользователей в памяти процесса с коротким TTL.
+
+    Хранятся значения полей, а не сами объекты: каждый запрос получает
+    собственный экземпляр User, без общих изменяемых данных между
+    потоками. Запись сверяется с версией пользователя в общем кэше
+    (один запрос к кэшу вместо запроса к БД), поэтому смена роли
+    в другом процессе видна сразу, а не через TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, pk):
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is not None:
+                self._entries.move_to_end(pk)
+        if entry is None:
+            return None
+        expires, versions, values = entry
+        if expires < time.monotonic() or versions != _versions(pk):
+            self.discard(pk)
+            return None
+        return User.from_db(
+            router.db_for_read(User), list(values), list(values.values())
+        )
+
+    def set(self, user, versions):
+        """Кладёт пользователя в кэш.
+
+        ``versions`` нужно прочитать до загрузки пользователя из БД,
+        иначе параллельная смена роли может остаться незамеченной.
+        """
+        values = {
+            field.attname: getattr(user, field.attname)
+            for field in User._meta.concrete_fields
+        }
+        entry = (
+            time.monotonic() + settings.AUTH_USER_CACHE_TTL,
+            versions,
+            values,
+        )
+        with self._lock:
+            self._entries[user.pk] = entry
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > settings.AUTH_USER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def discard(self, pk):
+        with self._lock:
+            self._entries.pop(pk, None)
+
+    def invalidate(self, pk=None):
+        """Сбрасывает пользователя (или всех) во всех процессах."""
+        if pk is None:
+            with self._lock:
+                self._entries.clear()
+            _bump(ALL_USERS_VERSION_KEY)
+        else:
+            self.discard(pk)
+            _bump(USER_VERSION_KEY.format(pk=pk))
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication без запроса пользователя к БД на каждый запрос:
+    активный пользователь берётся из user_cache, при промахе — из БД.
+
+    Если AUTH_USER_CACHE_ALIAS не общий для процессов (LocMemCache),
+    версии пользователей видны только своему процессу, и понижение роли
+    или блокировка в другом воркере остались бы незамеченными до TTL.
+    Тогда кэш не используется и пользователь читается из БД.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if (user_id is None
+                or api_settings.USER_ID_FIELD != User._meta.pk.name
+                or is_process_local(settings.AUTH_USER_CACHE_ALIAS)):
+            return super().get_user(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            versions = _versions(user_id)
+            user = super().get_user(validated_token)
+            user_cache.set(user, versions)
+        return user
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+
+from reviews.signals import bulk_changed  # isort:skip
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Смена роли через UserViewSet, /users/me/ или админку.
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(bulk_changed, sender=User)
+def invalidate_cached_users(sender, **kwargs):
+    user_cache.invalidate()
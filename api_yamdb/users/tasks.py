@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.core.mail import get_connection
+
+from .utils import confirmation_code_message
+
+from tasks.queue import task  # isort:skip
+
+User = get_user_model()
+
+
+@task("users.send_confirmation_codes", batch=True)
+def send_confirmation_codes(payloads):
+    """Отправляет коды подтверждения пачкой через одно SMTP-соединение.
+
+    Код берётся из БД в момент отправки. Возвращает ошибки по индексам
+    payload, чтобы повторялись только неотправленные письма.
+    """
+    users = User.objects.in_bulk([payload["user_id"] for payload in payloads])
+    errors = {}
+    with get_connection() as connection:
+        for index, payload in enumerate(payloads):
+            user = users.get(payload["user_id"])
+            if user is None:
+                continue
+            try:
+                confirmation_code_message(user, connection).send()
+            except Exception as error:
+                errors[index] = error
+    return errors
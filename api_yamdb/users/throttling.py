@@ -0,0 +1,89 @@
+import math
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import permissions
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket: ёмкость корзины — число запросов из rate scope'а
+    (DEFAULT_THROTTLE_RATES), токены восстанавливаются равномерно за
+    период. В кэше THROTTLE_CACHE_ALIAS хранится пара (токены, время)
+    вместо истории запросов, как у SimpleRateThrottle.
+
+    Чтение и запись корзины атомарны внутри процесса; с общим кэшем
+    (memcached, redis) параллельные процессы могут пропустить
+    несколько лишних запросов, что для защиты БД допустимо.
+    """
+    cache_format = "throttle:%(scope)s:%(ident)s"
+    lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        refill = self.num_requests / self.duration
+        with self.lock:
+            now = self.timer()
+            tokens, updated = self.cache.get(key, (self.num_requests, now))
+            tokens = min(self.num_requests, tokens + (now - updated) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.cache.set(key, (tokens, now), self.duration)
+        if not allowed:
+            self.wait_seconds = (1 - tokens) / refill
+        return allowed
+
+    def wait(self):
+        # DRF отдаёт это значение в заголовке Retry-After.
+        if self.wait_seconds is None:
+            return None
+        return math.ceil(self.wait_seconds)
+
+
+class SignupThrottle(TokenBucketThrottle):
+    scope = "signup"
+
+
+class TokenObtainThrottle(TokenBucketThrottle):
+    scope = "token"
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Ограничивает только изменяющие запросы (отзывы, комментарии)."""
+    scope = "write"
+
+    def allow_request(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return super().allow_request(request, view)
+
+
+class AnonReadThrottle(TokenBucketThrottle):
+    """Ограничивает чтение анонимами; по умолчанию для всех views."""
+    scope = "anon_read"
+
+    def allow_request(self, request, view):
+        if (request.method not in permissions.SAFE_METHODS
+                or request.user and request.user.is_authenticated):
+            return True
+        return super().allow_request(request, view)
@@ -1,7 +1,7 @@
 import os
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
 
 
 def set_confirmation_code(size=settings.CONFIRMATION_CODE_BYTE_SIZE):
@@ -11,10 +11,15 @@ def set_confirmation_code(size=settings.CONFIRMATION_CODE_BYTE_SIZE):
     return os.urandom(size).hex()
 
 
-def send_confirmation_code(user_obj):
-    send_mail(
+def confirmation_code_message(user_obj, connection=None):
+    return EmailMessage(
         "Confirmation code",
         f"Your confirmation code is {user_obj.confirmation_code}.",
         settings.ADMIN_EMAIL,
         [user_obj.email],
+        connection=connection,
     )
+
+
+def send_confirmation_code(user_obj):
+    confirmation_code_message(user_obj).send()
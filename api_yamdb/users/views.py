@@ -10,7 +10,10 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from .permissions import IsAdmin
 from .serializers import (UserSerializer, UserSignupSerializer,
                           UserTokenObtainingSerializer)
-from .utils import send_confirmation_code
+from .tasks import send_confirmation_codes
+from .throttling import SignupThrottle, TokenObtainThrottle
+
+from tasks.queue import enqueue  # isort:skip
 
 User = get_user_model()
 
@@ -21,6 +24,7 @@ class UserSignupAPIView(APIView):
     by user.
     """
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (SignupThrottle,)
 
     def post(self, request):
         serializer = UserSignupSerializer(data=request.data)
@@ -37,7 +41,8 @@ class UserSignupAPIView(APIView):
                 user.set_unusable_password()  # type:ignore
                 user.save()
 
-        send_confirmation_code(user)
+        # Письмо отправит воркер очереди (manage.py run_tasks).
+        enqueue(send_confirmation_codes, user_id=user.pk)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -46,6 +51,7 @@ class TokenObtainAPIView(APIView):
     Obtaining authorization token with email and confirmation_code provided.
     """
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (TokenObtainThrottle,)
 
     def post(self, request):
         serializer = UserTokenObtainingSerializer(data=request.data)
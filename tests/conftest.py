@@ -1,9 +1,89 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Превышение query_budget view в тестах — ошибка, а не warning."""
+    settings.SQL_QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture
+def make_catalog():
+    """
+    Фабрика каталога для тестов: каждый тест передаёт только то, что ему
+    важно, остальное берётся по умолчанию.
+
+    categories и genres - {slug: name}; titles - словари с полями
+    произведения, category и genre задаются slug'ами (по умолчанию первая
+    категория, без жанров); users - число пользователей user0, user1...;
+    staff - роли, для каждой создаётся пользователь с именем роли;
+    reviews - тройки (индекс произведения, индекс автора, оценка);
+    comments - по комментарию автора отзыва к каждому отзыву.
+    """
+    from types import SimpleNamespace
+
+    from django.core.cache import cache
+    from reviews.models import Category, Comment, Genre, Review, Title
+    from users.models import User
+
+    def make(titles=(), categories=None, genres=None, users=0, staff=(),
+             reviews=(), comments=False):
+        cache.clear()
+        catalog = SimpleNamespace(
+            categories={
+                slug: Category.objects.create(name=name, slug=slug)
+                for slug, name in (categories or {'film': 'Фильм'}).items()
+            },
+            genres={
+                slug: Genre.objects.create(name=name, slug=slug)
+                for slug, name in (genres or {}).items()
+            },
+            users=[
+                User.objects.create(username=f'user{number}',
+                                    email=f'user{number}@example.com')
+                for number in range(users)
+            ],
+            staff={
+                role: User.objects.create(
+                    username=role, email=f'{role}@example.com', role=role
+                )
+                for role in staff
+            },
+        )
+        catalog.titles = []
+        for fields in titles:
+            fields = {'year': 2000, **fields}
+            genre = fields.pop('genre', ())
+            category = fields.pop('category', None)
+            title = Title.objects.create(
+                category=catalog.categories[
+                    category or next(iter(catalog.categories))
+                ],
+                **fields
+            )
+            title.genre.set([catalog.genres[slug] for slug in genre])
+            catalog.titles.append(title)
+        catalog.reviews = [
+            Review.objects.create(
+                title=catalog.titles[title], author=catalog.users[author],
+                text='Отзыв', score=score
+            )
+            for title, author, score in reviews
+        ]
+        if comments:
+            for review in catalog.reviews:
+                Comment.objects.create(author=review.author, review=review,
+                                       text='Да')
+        return catalog
+
+    return make
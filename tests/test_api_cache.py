@@ -0,0 +1,79 @@
+import pytest
+
+
+@pytest.fixture
+def cached_genres():
+    from django.core.cache import cache
+    from reviews.models import Genre
+    from users.models import User
+
+    cache.clear()
+    Genre.objects.create(name='Драма', slug='drama')
+    return User.objects.create(username='admin', email='admin@example.com',
+                               role='admin')
+
+
+@pytest.mark.django_db
+class TestApiCache:
+    url = '/api/v1/genres/'
+
+    def get(self, client, expected):
+        response = client.get(self.url)
+        assert response.status_code == 200
+        assert response['X-Cache'] == expected, (
+            f'GET {self.url}: ожидался X-Cache {expected}, '
+            f'получен {response["X-Cache"]}'
+        )
+        return [genre['slug'] for genre in response.json()['results']]
+
+    def test_hit_and_miss(self, client, cached_genres):
+        from api.cache import get_cache_stats
+
+        assert self.get(client, 'MISS') == self.get(client, 'HIT') == [
+            'drama'
+        ], 'Повторный запрос должен отдаваться из кэша с тем же ответом'
+        assert get_cache_stats()['genre'] == {
+            'hits': 1, 'misses': 1, 'hit_ratio': 0.5
+        }
+
+    def test_write_bumps_generation(self, client, cached_genres):
+        from reviews.models import Genre
+
+        self.get(client, 'MISS')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        assert self.get(client, 'MISS') == ['comedy', 'drama'], (
+            'Запись в зависимую модель должна сбрасывать закэшированные '
+            'ответы'
+        )
+        Genre.objects.filter(slug='comedy').delete()
+        Genre.objects.get(slug='drama').delete()
+        assert self.get(client, 'MISS') == [], (
+            'Удаление должно сбрасывать закэшированные ответы'
+        )
+
+    def test_role_in_key(self, client, cached_genres):
+        from rest_framework.test import APIClient
+
+        admin_client = APIClient()
+        admin_client.force_authenticate(user=cached_genres)
+        self.get(client, 'MISS')
+        self.get(admin_client, 'MISS')
+        self.get(admin_client, 'HIT')
+        self.get(client, 'HIT')
+
+    def test_process_local_cache_warning(self, settings, tmp_path):
+        from api_yamdb.checks import check_api_cache
+
+        assert [warning.id for warning in check_api_cache(None)] == [
+            'api_yamdb.W001'
+        ], 'check --deploy должен предупреждать о кэше API в памяти процесса'
+        settings.CACHES = {
+            **settings.CACHES,
+            'shared': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            },
+        }
+        settings.API_CACHE_ALIAS = 'shared'
+        assert check_api_cache(None) == []
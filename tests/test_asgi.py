@@ -0,0 +1,60 @@
+import asyncio
+
+
+def call(app, method, path, headers=()):
+    """Прогоняет запрос через ASGI-приложение, возвращает статус и тело."""
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method,
+        'path': path, 'query_string': b'', 'headers': list(headers),
+    }
+    messages = [{'type': 'http.request', 'body': b''}]
+    sent = []
+
+    async def receive():
+        return messages.pop()
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return sent[0]['status'], body
+
+
+class TestASGI:
+
+    def test_read_actions_use_read_pool(self):
+        from api_yamdb.asgi_bridge import is_read
+
+        assert is_read('GET', '/api/v1/titles/')
+        assert is_read('GET', '/api/v1/titles/1/reviews/2/')
+        assert is_read('HEAD', '/api/v1/genres/')
+        assert not is_read('POST', '/api/v1/titles/')
+        assert not is_read('GET', '/api/v1/users/me/'), (
+            'Пул чтения — только для списков и карточек контента'
+        )
+        assert not is_read('GET', '/missing/')
+
+    def test_environ_from_scope(self):
+        from api_yamdb.asgi_bridge import build_environ
+
+        environ = build_environ({
+            'method': 'GET', 'path': '/api/v1/titles/',
+            'query_string': b'year=2000', 'http_version': '1.1',
+            'headers': [(b'content-type', b'application/json'),
+                        (b'authorization', b'Bearer x'),
+                        (b'accept', b'a'), (b'accept', b'b')],
+        }, b'')
+        assert environ['QUERY_STRING'] == 'year=2000'
+        assert environ['CONTENT_TYPE'] == 'application/json'
+        assert environ['HTTP_AUTHORIZATION'] == 'Bearer x'
+        assert environ['HTTP_ACCEPT'] == 'a,b'
+
+    def test_request_is_served_by_wsgi_handler(self):
+        from django.core.wsgi import get_wsgi_application
+
+        from api_yamdb.asgi_bridge import ThreadPoolASGIApplication
+
+        app = ThreadPoolASGIApplication(get_wsgi_application())
+        status, _ = call(app, 'GET', '/missing/')
+        assert status == 404
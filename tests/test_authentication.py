@@ -0,0 +1,104 @@
+import pytest
+
+
+@pytest.fixture
+def shared_user_cache(settings, tmp_path):
+    """Кэш версий пользователей, общий для процессов (файловый)."""
+    from users.authentication import user_cache
+
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }
+    settings.AUTH_USER_CACHE_ALIAS = 'shared'
+    user_cache.invalidate()
+    yield
+    user_cache.invalidate()
+
+
+@pytest.fixture
+def admin():
+    from users.models import User
+
+    return User.objects.create(username='admin', email='admin@example.com',
+                               role='admin')
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def get_me(self, user):
+        from django.test import Client
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        return Client().get(
+            '/api/v1/users/me/',
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+
+    def role(self, user):
+        response = self.get_me(user)
+        assert response.status_code == 200, (
+            f'GET /api/v1/users/me/ вернул {response.status_code}'
+        )
+        return response.json()['role']
+
+    def test_other_process_invalidation(self, shared_user_cache, admin):
+        from users.authentication import UserCache
+        from users.models import User
+
+        assert self.role(admin) == 'admin'
+        # Другой процесс понижает роль: в этом процессе сигналов нет,
+        # сброс приходит только через версию в общем кэше.
+        User.objects.filter(pk=admin.pk).update(role='user')
+        assert self.role(admin) == 'admin', (
+            'Без сброса версии пользователь берётся из LRU процесса'
+        )
+        UserCache().invalidate(admin.pk)
+        assert self.role(admin) == 'user', (
+            'Сброс версии в общем кэше должен быть виден всем процессам'
+        )
+        User.objects.filter(pk=admin.pk).update(is_active=False)
+        UserCache().invalidate()
+        assert self.get_me(admin).status_code == 401, (
+            'Заблокированный пользователь не должен проходить '
+            'аутентификацию после сброса'
+        )
+
+    def test_shared_cache_skips_user_query(self, shared_user_cache, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        assert self.role(admin) == 'admin'
+        with CaptureQueriesContext(connection) as queries:
+            assert self.role(admin) == 'admin'
+        assert len(queries) == 0, (
+            'С общим кэшем повторный запрос не должен читать пользователя '
+            'из БД'
+        )
+
+    def test_process_local_cache_disables_lru(self, admin):
+        from users.authentication import user_cache
+        from users.models import User
+
+        user_cache.invalidate()
+        assert self.role(admin) == 'admin'
+        assert user_cache.get(admin.pk) is None, (
+            'С LocMemCache пользователь не должен попадать в LRU'
+        )
+        User.objects.filter(pk=admin.pk).update(role='user')
+        assert self.role(admin) == 'user', (
+            'С кэшем в памяти процесса смена роли видна сразу'
+        )
+        User.objects.filter(pk=admin.pk).delete()
+        assert self.get_me(admin).status_code == 401
+
+    def test_process_local_cache_warning(self):
+        from api_yamdb.checks import check_auth_user_cache
+
+        assert [warning.id for warning in check_auth_user_cache(None)] == [
+            'api_yamdb.W003'
+        ], 'check --deploy должен предупреждать об отключённом кэше'
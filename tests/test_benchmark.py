@@ -0,0 +1,43 @@
+class TestBenchmark:
+
+    def test_every_route_has_scenario(self):
+        from api.benchmark import uncovered_routes
+
+        assert uncovered_routes() == [], (
+            'Добавьте сценарий в api.benchmark.SCENARIOS для новых маршрутов'
+        )
+
+    def test_compare_reports_regressions(self):
+        from api.benchmark import compare
+
+        baseline = {'titles': {'p95_ms': 10.0, 'queries': 3, 'peak_kb': 100}}
+        same = {'titles': {'p95_ms': 12.0, 'queries': 3, 'peak_kb': 110}}
+        assert compare(same, baseline, tolerance=0.2, slack_ms=1.0) == []
+
+        slower = {'titles': {'p95_ms': 14.0, 'queries': 4, 'peak_kb': 130}}
+        regressions = compare(slower, baseline, tolerance=0.2, slack_ms=1.0)
+        assert regressions == ['titles: 4 queries > 3'], (
+            'По умолчанию сравнивается только число запросов'
+        )
+        regressions = compare(slower, baseline, tolerance=0.2, slack_ms=1.0,
+                              timings=True)
+        assert len(regressions) == 3, (
+            'На той же машине сравниваются ещё задержка и память'
+        )
+
+    def test_baseline_matches_defaults(self):
+        import json
+
+        from api.benchmark import BASELINE_PATH, DATA_OPTIONS, SCENARIOS
+        from api.management.commands.benchmark_api import Command
+
+        with open(BASELINE_PATH) as file:
+            baseline = json.load(file)
+        assert set(baseline['results']) == {s.name for s in SCENARIOS}, (
+            'Перезапишите baseline (--save-baseline) после изменения '
+            'сценариев'
+        )
+        defaults = Command().create_parser('manage.py', 'benchmark_api')
+        assert baseline['data'] == {
+            name: defaults.get_default(name) for name in DATA_OPTIONS
+        }, 'Baseline должен быть записан на объёмах по умолчанию'
@@ -0,0 +1,173 @@
+import pytest
+
+
+@pytest.fixture
+def admin_client():
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+    from reviews.models import Category, Genre, Title
+    from users.models import User
+
+    cache.clear()
+    category = Category.objects.create(name='Фильм', slug='film')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+    Title.objects.create(name='Уже есть', year=2000, category=category)
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create(
+        username='admin', email='admin@example.com', role='admin'
+    ))
+    return client
+
+
+def item(name, genre=('drama',), category='film', year=2000):
+    return {'name': name, 'year': year, 'genre': list(genre),
+            'category': category}
+
+
+@pytest.mark.django_db
+class TestTitleBulk:
+    url = '/api/v1/titles/bulk/'
+
+    def post(self, client, items, expected_status):
+        response = client.post(self.url, items, format='json')
+        assert response.status_code == expected_status, (
+            f'POST {self.url} вернул {response.status_code}, '
+            f'ожидался {expected_status}'
+        )
+        return response.json()
+
+    def test_multi_status_report(self, admin_client):
+        from reviews.models import Title
+
+        data = self.post(admin_client, [
+            item('Новый', genre=('drama', 'comedy', 'drama')),
+            item('Без жанра', genre=('missing',)),
+            item('Уже есть'),
+            item('Новый'),
+            item('Второй', category='missing'),
+            item('Третий'),
+        ], 207)
+        assert (data['created'], data['failed']) == (2, 4)
+        assert [result['status'] for result in data['results']] == [
+            201, 400, 400, 400, 400, 201
+        ], 'Результаты должны идти по элементам в исходном порядке'
+        assert [result['index'] for result in data['results']] == list(
+            range(6)
+        )
+        assert 'genre' in data['results'][1]['errors']
+        assert 'category' in data['results'][4]['errors']
+        for index in (2, 3):
+            assert data['results'][index]['errors'] == {
+                'non_field_errors': ['Title already exists.']
+            }, 'Дубликаты в базе и внутри пачки должны отклоняться'
+        created = Title.objects.get(pk=data['results'][0]['id'])
+        assert created.name == 'Новый'
+        assert sorted(created.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ], 'Повторяющийся жанр элемента должен связываться один раз'
+        assert Title.objects.get(pk=data['results'][5]['id']).name == (
+            'Третий'
+        )
+
+    def test_all_or_nothing_statuses(self, admin_client):
+        assert self.post(
+            admin_client, [item('Первый'), item('Второй')], 201
+        )['created'] == 2
+        assert self.post(
+            admin_client, [item('Первый'), item('Уже есть')], 400
+        )['failed'] == 2
+        assert self.post(admin_client, {'name': 'Не список'}, 400)
+
+    def test_duplicate_check_is_set_based(self, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        # Первый запрос загружает реестры справочников.
+        self.post(admin_client, [item('Прогрев')], 201)
+        counts = []
+        for size, prefix in ((2, 'Малая'), (20, 'Большая')):
+            with CaptureQueriesContext(connection) as queries:
+                self.post(admin_client, [
+                    item(f'{prefix} {number}') for number in range(size)
+                ], 201)
+            counts.append(len(queries))
+        assert counts[0] == counts[1], (
+            'Число запросов пакетного создания не должно зависеть от '
+            f'размера пачки: {counts}'
+        )
+
+    def test_fill_missing_pks(self, admin_client):
+        from api.bulk import _fill_missing_pks
+        from reviews.models import Category, Title
+
+        category = Category.objects.get(slug='film')
+        other = Category.objects.create(name='Книга', slug='book')
+        rows = [Title(name='Общее', year=2000, category=category),
+                Title(name='Общее', year=2000, category=other),
+                Title(name='Своё', year=2000, category=other)]
+        Title.objects.bulk_create(rows)
+        for title in rows:
+            title.pk = None
+        _fill_missing_pks(rows)
+        assert [title.pk for title in rows] == [
+            Title.objects.get(name=title.name, category=title.category).pk
+            for title in rows
+        ], 'id должны находиться по паре (название, категория)'
+
+    def test_race_with_other_request(self, admin_client, monkeypatch):
+        from api import bulk
+        from reviews.models import Title
+
+        # Другой запрос успел создать 'Уже есть' после проверки дубликатов.
+        monkeypatch.setattr(bulk, '_unique_entries',
+                            lambda entries, results: entries)
+        data = self.post(admin_client, [
+            item('Первый'), item('Уже есть'), item('Второй'),
+        ], 207)
+        assert [result['status'] for result in data['results']] == [
+            201, 400, 201
+        ], 'Гонка должна отклонять один элемент, а не всю пачку'
+        assert data['results'][1]['errors'] == {
+            'non_field_errors': ['Title already exists.']
+        }
+        assert Title.objects.filter(name__in=['Первый', 'Второй']).count() == 2
+
+    def test_bulk_update(self, admin_client):
+        from reviews.models import Title
+
+        created = self.post(admin_client, [item('Первый'), item('Второй')],
+                            201)['results']
+        first, second = (result['id'] for result in created)
+        response = admin_client.patch(self.url, [
+            {'id': first, 'year': 1999, 'genre': ['comedy']},
+            {'id': second, 'name': 'Уже есть'},
+            {'id': 0, 'year': 1999},
+            {'year': 1999},
+            {'id': first, 'description': 'Описание'},
+        ], format='json')
+        assert response.status_code == 207, (
+            f'PATCH {self.url} вернул {response.status_code}, ожидался 207'
+        )
+        data = response.json()
+        assert (data['updated'], data['failed']) == (1, 4)
+        assert [result['status'] for result in data['results']] == [
+            200, 400, 404, 400, 400
+        ]
+        assert data['results'][4]['errors'] == {
+            'id': ['Duplicate id in request.']
+        }, 'Повторный id в пачке неоднозначен и должен отклоняться'
+        title = Title.objects.get(pk=first)
+        assert (title.name, title.year, title.description) == (
+            'Первый', 1999, None
+        ), (
+            'Поля, которых нет в элементе, не должны меняться'
+        )
+        assert list(title.genre.values_list('slug', flat=True)) == [
+            'comedy'
+        ], 'Жанры элемента должны заменять прежние'
+        title = Title.objects.get(pk=second)
+        assert title.name == 'Второй', 'Дубликат не должен записываться'
+        assert list(title.genre.values_list('slug', flat=True)) == [
+            'drama'
+        ]
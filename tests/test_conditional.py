@@ -0,0 +1,121 @@
+import pytest
+
+
+@pytest.fixture
+def titles(make_catalog):
+    return make_catalog(
+        titles=[{'name': f'Фильм {number}'} for number in range(3)]
+    ).titles
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    list_url = '/api/v1/titles/'
+
+    def test_not_modified(self, client, titles):
+        detail_url = f'{self.list_url}{titles[0].pk}/'
+        for url in (self.list_url, detail_url):
+            response = client.get(url)
+            etag = response['ETag']
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=etag
+            ).status_code == 304, (
+                f'GET {url} с совпавшим If-None-Match должен давать 304'
+            )
+        response = client.get(detail_url)
+        assert client.get(
+            detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 304, (
+            'Карточка с If-Modified-Since не раньше modified - 304'
+        )
+
+    def test_precondition_failed(self, client, titles):
+        for url in (self.list_url, f'{self.list_url}{titles[0].pk}/'):
+            assert client.get(
+                url, HTTP_IF_MATCH='"stale"'
+            ).status_code == 412, (
+                f'GET {url} с несовпавшим If-Match должен давать 412'
+            )
+            etag = client.get(url)['ETag']
+            assert client.get(url, HTTP_IF_MATCH=etag).status_code == 200
+
+    def test_list_delete_changes_validators(self, client, titles):
+        response = client.get(self.list_url)
+        assert not response.has_header('Last-Modified'), (
+            'Список не должен отдавать Last-Modified: Max(modified) не '
+            'меняется при удалении'
+        )
+        etag = response['ETag']
+        # Удаляется не самое новое произведение: Max(modified) прежний.
+        titles[0].delete()
+        assert client.get(
+            self.list_url,
+            HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        ).status_code == 200, (
+            'If-Modified-Since не должен давать 304 на список после '
+            'удаления'
+        )
+        response = client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'После удаления произведения список не должен отдавать 304'
+        )
+        assert response.json()['count'] == 2
+        assert response['ETag'] != etag
+
+    def test_detail_update_changes_etag(self, client, titles):
+        url = f'{self.list_url}{titles[1].pk}/'
+        etag = client.get(url)['ETag']
+        titles[1].name = 'Новое название'
+        titles[1].save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Изменение произведения должно менять ETag карточки'
+        )
+        assert response.json()['name'] == 'Новое название'
+
+    def test_cached_not_modified_without_queries(self, client, titles):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        etag = client.get(self.list_url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert len(queries) == 0, (
+            'Попадание в кэш ответов должно давать 304 без запросов к БД'
+        )
+
+    def test_etag_is_same_in_every_process(self, client, titles):
+        from django.core.cache import cache
+
+        urls = (self.list_url, f'{self.list_url}{titles[0].pk}/')
+        etags = [client.get(url)['ETag'] for url in urls]
+        # Новый процесс: пустой кэш, поколения моделей заводятся заново.
+        cache.clear()
+        assert [client.get(url)['ETag'] for url in urls] == etags, (
+            'ETag должен зависеть только от данных из БД, а не от '
+            'поколений кэша конкретного процесса'
+        )
+
+    def test_no_validator_queries(self, client, titles):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Review
+        from users.models import User
+
+        author = User.objects.create(username='author',
+                                     email='author@example.com')
+        Review.objects.create(author=author, title=titles[0], text='Отзыв',
+                              score=5)
+        urls = (
+            f'{self.list_url}?pagination=cursor',
+            f'{self.list_url}{titles[0].pk}/reviews/',
+        )
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                assert client.get(url).status_code == 200
+            sql = ' '.join(query['sql'] for query in queries).upper()
+            assert 'COUNT(' not in sql and 'MAX(' not in sql, (
+                f'GET {url} не должен считать валидаторы отдельными '
+                'агрегатами'
+            )
@@ -0,0 +1,72 @@
+import pytest
+
+
+@pytest.fixture
+def review_thread(make_catalog):
+    catalog = make_catalog(
+        titles=[{'name': 'Фильм'}],
+        users=3,
+        reviews=[(0, author, 5) for author in range(3)],
+    )
+    return catalog.titles[0], catalog.reviews, catalog.users
+
+
+@pytest.mark.django_db
+class TestParentCounters:
+
+    def assert_counts(self, client, title, reviews):
+        from reviews.models import Comment, Review
+
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        assert client.get(url).json()['count'] == Review.objects.filter(
+            title=title
+        ).count(), f'count в {url} расходится с числом отзывов'
+        for review in reviews:
+            url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+            response = client.get(url)
+            if not Review.objects.filter(pk=review.pk).exists():
+                assert response.status_code == 404
+                continue
+            assert response.json()['count'] == Comment.objects.filter(
+                review=review
+            ).count(), f'count в {url} расходится с числом комментариев'
+
+    def test_creates_and_deletes(self, client, review_thread):
+        from rest_framework.test import APIClient
+        from reviews.models import Comment
+
+        title, reviews, authors = review_thread
+        self.assert_counts(client, title, reviews)
+        author_client = APIClient()
+        author_client.force_authenticate(user=authors[0])
+        for review in reviews[:2]:
+            for _ in range(2):
+                assert author_client.post(
+                    f'/api/v1/titles/{title.pk}/reviews/{review.pk}'
+                    '/comments/', {'text': 'Да'}
+                ).status_code == 201
+        Comment.objects.create(author=authors[1], review=reviews[2],
+                               text='Нет')
+        self.assert_counts(client, title, reviews)
+
+        Comment.objects.filter(review=reviews[0]).first().delete()
+        self.assert_counts(client, title, reviews)
+        # Каскад: комментарии и отзыв автора удаляются вместе с ним.
+        authors[1].delete()
+        self.assert_counts(client, title, reviews)
+        reviews[0].delete()
+        self.assert_counts(client, title, reviews)
+
+    def test_stale_review_save_keeps_count(self, review_thread):
+        from reviews.models import Comment, Review
+
+        _, reviews, authors = review_thread
+        stale = Review.objects.get(pk=reviews[0].pk)
+        Comment.objects.create(author=authors[1], review=reviews[0],
+                               text='Да')
+        stale.text = 'Исправленный отзыв'
+        stale.save()
+        assert Review.objects.get(pk=stale.pk).comments_count == 1, (
+            'Сохранение устаревшего отзыва не должно затирать счётчик '
+            'комментариев'
+        )
@@ -0,0 +1,93 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+
+@pytest.fixture
+def replicas(settings, tmp_path):
+    """Одна реплика и общий для процессов (файловый) кэш привязки."""
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }
+    settings.DB_REPLICAS = ['replica1']
+    settings.DB_PRIMARY_STICKY_SECONDS = 60
+    settings.DB_PRIMARY_STICKY_CACHE_ALIAS = 'shared'
+    return settings
+
+
+def route(method, status=200, remote_addr='10.0.0.1', **extra):
+    """Прогоняет запрос через middleware и возвращает базу чтения."""
+    from api_yamdb.db_routing import ReplicaRouter, ReplicaRoutingMiddleware
+
+    seen = []
+
+    def view(request):
+        seen.append(ReplicaRouter().db_for_read(None))
+        return HttpResponse(status=status)
+
+    request = getattr(RequestFactory(), method)(
+        '/', REMOTE_ADDR=remote_addr, **extra
+    )
+    ReplicaRoutingMiddleware(view)(request)
+    return seen[0]
+
+
+class TestReplicaRouting:
+
+    def test_outside_request_reads_primary(self, replicas):
+        from api_yamdb.db_routing import ReplicaRouter
+
+        assert ReplicaRouter().db_for_read(None) == 'default'
+        assert ReplicaRouter().db_for_write(None) == 'default'
+
+    def test_safe_methods_read_replica(self, replicas):
+        assert route('get', remote_addr='10.0.1.1') == 'replica1'
+
+    def test_unsafe_methods_read_primary(self, replicas):
+        assert route('post', remote_addr='10.0.2.1') == 'default'
+
+    def test_client_sticks_to_primary_after_write(self, replicas):
+        route('post', remote_addr='10.0.3.1')
+        assert route('get', remote_addr='10.0.3.1') == 'default'
+        assert route('get', remote_addr='10.0.3.2') == 'replica1', (
+            'Другие клиенты должны продолжать читать с реплики'
+        )
+
+    def test_client_behind_proxy(self, replicas):
+        nginx = '172.18.0.5'
+        route('post', remote_addr=nginx, HTTP_X_FORWARDED_FOR='10.0.5.1')
+        assert route('get', remote_addr=nginx,
+                     HTTP_X_FORWARDED_FOR='10.0.5.1') == 'default'
+        assert route('get', remote_addr=nginx,
+                     HTTP_X_FORWARDED_FOR='10.0.5.1, 10.0.5.2') == (
+            'replica1'
+        ), 'Клиент определяется по адресу, добавленному прокси'
+
+    def test_failed_write_does_not_stick(self, replicas):
+        route('post', status=400, remote_addr='10.0.4.1')
+        assert route('get', remote_addr='10.0.4.1') == 'replica1'
+
+    def test_replicas_are_not_migrated(self, replicas):
+        from api_yamdb.db_routing import ReplicaRouter
+
+        assert not ReplicaRouter().allow_migrate('replica1', 'reviews')
+        assert ReplicaRouter().allow_migrate('default', 'reviews')
+
+    def test_process_local_sticky_cache_fails(self, replicas):
+        from django.core.checks import run_checks
+        from django.core.exceptions import ImproperlyConfigured
+
+        from api_yamdb.db_routing import ReplicaRoutingMiddleware
+
+        replicas.DB_PRIMARY_STICKY_CACHE_ALIAS = 'default'
+        with pytest.raises(ImproperlyConfigured):
+            ReplicaRoutingMiddleware(HttpResponse)
+        assert 'api_yamdb.E001' in [
+            message.id for message in run_checks()
+        ], 'Реплики с кэшем привязки в памяти процесса - ошибка настройки'
+        replicas.DB_REPLICAS = []
+        ReplicaRoutingMiddleware(HttpResponse)
@@ -27,3 +27,25 @@ class TestDockerfileCompose:
         assert re.search(r'image:\s+([a-zA-Z0-9]+)\/([a-zA-Z0-9_\.])+(\:[a-zA-Z0-9_-]+)?', docker_compose), (
             'Проверьте, что добавили сборку контейнера из образа на вашем DockerHub в файл docker-compose.yaml'
         )
+
+    def test_task_worker(self):
+        with open(os.path.join(infra_dir_path, 'docker-compose.yaml')) as f:
+            docker_compose = f.read()
+
+        assert re.search(r'command:\s+python manage\.py run_tasks',
+                         docker_compose), (
+            'Проверьте, что в docker-compose.yaml есть сервис, выполняющий '
+            'очередь задач (manage.py run_tasks)'
+        )
+
+    def test_shared_cache(self):
+        with open(os.path.join(infra_dir_path, 'docker-compose.yaml')) as f:
+            docker_compose = f.read()
+
+        assert re.search(r'image:\s+memcached:', docker_compose), (
+            'Проверьте, что docker-compose.yaml запускает общий для воркеров '
+            'кэш (memcached)'
+        )
+        assert 'backends.memcached.' in docker_compose, (
+            'Проверьте, что web получает общий кэш через CACHE_BACKEND'
+        )
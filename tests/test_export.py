@@ -0,0 +1,94 @@
+import pytest
+
+
+@pytest.fixture
+def export_catalog(make_catalog):
+    return make_catalog(
+        titles=[{'name': f'Фильм {number}'} for number in range(5)],
+        staff=('user', 'moderator', 'admin'),
+    ).staff
+
+
+@pytest.mark.django_db
+class TestExportEndpoint:
+
+    def client_for(self, user=None):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user=user)
+        return client
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_permissions(self, export_catalog):
+        url = '/api/v1/export/title/'
+        assert self.client_for().get(url).status_code == 401, (
+            'Выгрузка недоступна анонимному пользователю'
+        )
+        for role in ('user', 'moderator'):
+            assert self.client_for(
+                export_catalog[role]
+            ).get(url).status_code == 403, (
+                f'Выгрузка недоступна роли {role}'
+            )
+
+    def test_streams_csv(self, export_catalog):
+        import csv
+        import io
+
+        from reviews.dump import export_fields
+
+        response = self.client_for(export_catalog['admin']).get(
+            '/api/v1/export/title/'
+        )
+        assert response.status_code == 200
+        assert response.streaming, 'Выгрузка должна отдаваться потоком'
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        assert response['Content-Disposition'] == (
+            'attachment; filename="title.csv"'
+        )
+        rows = list(csv.reader(io.StringIO(
+            self.content(response).decode()
+        )))
+        assert rows[0] == export_fields('title')
+        assert [row[1] for row in rows[1:]] == [
+            f'Фильм {number}' for number in range(5)
+        ], 'Строки выгрузки должны идти в порядке pk'
+
+    def test_streams_gzip_jsonl(self, export_catalog):
+        import gzip
+        import json
+
+        response = self.client_for(export_catalog['admin']).get(
+            '/api/v1/export/user/?type=jsonl&compress=gzip'
+        )
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/gzip'
+        lines = gzip.decompress(self.content(response)).decode().splitlines()
+        users = [json.loads(line) for line in lines]
+        assert [user['username'] for user in users] == [
+            'user', 'moderator', 'admin'
+        ]
+        assert not {'password', 'confirmation_code'} & users[0].keys(), (
+            'Секреты пользователей не должны выгружаться'
+        )
+
+    def test_chunked(self, export_catalog):
+        from reviews.dump import iter_csv
+
+        chunks = list(iter_csv('title', chunk_size=2))
+        assert [chunk.count('\n') for chunk in chunks] == [3, 2, 1], (
+            'Выгрузка должна отдаваться кусками по chunk_size строк, '
+            'а не целиком'
+        )
+
+    def test_bad_requests(self, export_catalog):
+        client = self.client_for(export_catalog['admin'])
+        assert client.get('/api/v1/export/missing/').status_code == 404
+        assert client.get(
+            '/api/v1/export/title/?type=xml'
+        ).status_code == 400
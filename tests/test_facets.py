@@ -0,0 +1,69 @@
+import pytest
+
+
+@pytest.fixture
+def faceted_titles(make_catalog):
+    make_catalog(
+        categories={'film': 'Фильм', 'book': 'Книга'},
+        genres={'drama': 'Драма', 'comedy': 'Комедия'},
+        titles=[
+            {'name': 'Первый', 'genre': ['drama']},
+            {'name': 'Второй', 'year': 2001, 'genre': ['drama', 'comedy']},
+            {'name': 'Третий', 'category': 'book', 'genre': ['comedy']},
+            {'name': 'Четвёртый', 'category': 'book', 'genre': ['drama']},
+        ],
+    )
+
+
+@pytest.mark.django_db
+class TestTitleFacets:
+
+    def facets(self, client, query=''):
+        response = client.get(f'/api/v1/titles/facets/{query}')
+        assert response.status_code == 200, (
+            f'GET /api/v1/titles/facets/{query} вернул '
+            f'{response.status_code}'
+        )
+        data = response.json()
+        return {
+            'count': data['count'],
+            'genre': {item['slug']: item['count'] for item in data['genre']},
+            'category': {
+                item['slug']: item['count'] for item in data['category']
+            },
+            'year': {item['year']: item['count'] for item in data['year']},
+        }
+
+    def test_counts_match_filtered_lists(self, client, faceted_titles):
+        query = '?genre=drama&category=film'
+        facets = self.facets(client, query)
+        assert facets['count'] == client.get(
+            f'/api/v1/titles/{query}'
+        ).json()['count'], 'count должен совпадать с размером списка'
+        # Фасет не сужается собственным фильтром.
+        for facet, values in (('genre', facets['genre']),
+                              ('category', facets['category']),
+                              ('year', facets['year'])):
+            for value, count in values.items():
+                params = {'genre': 'drama', 'category': 'film', facet: value}
+                listed = client.get('/api/v1/titles/', params).json()
+                assert count == listed['count'], (
+                    f'Фасет {facet}={value} расходится со списком '
+                    f'с этим фильтром'
+                )
+        assert facets['genre'] == {'drama': 2, 'comedy': 1}
+
+    def test_invalid_filter(self, client, faceted_titles):
+        response = client.get('/api/v1/titles/facets/?year=abc')
+        assert response.status_code == 400, (
+            'Некорректный фильтр должен давать 400'
+        )
+
+    def test_cached_per_filter(self, client, faceted_titles):
+        client.get('/api/v1/titles/facets/?year=2000')
+        assert client.get(
+            '/api/v1/titles/facets/?year=2000'
+        )['X-Cache'] == 'HIT', 'Повторный запрос фасетов должен браться из кэша'
+        assert client.get(
+            '/api/v1/titles/facets/?year=2001'
+        )['X-Cache'] == 'MISS', 'Кэш фасетов разный для разных фильтров'
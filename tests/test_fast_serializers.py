@@ -0,0 +1,82 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+
+@pytest.fixture
+def catalog(make_catalog):
+    return make_catalog(
+        genres={'drama': 'Драма', 'comedy': 'Комедия'},
+        titles=[
+            {'name': 'С описанием', 'year': 1999,
+             'description': 'Текст "в кавычках"',
+             'genre': ['drama', 'comedy']},
+            {'name': 'Без отзывов'},
+        ],
+        users=3,
+        reviews=[(0, 0, 7), (0, 1, 8), (0, 2, 10)],
+        comments=True,
+    ).titles[0]
+
+
+@pytest.mark.django_db
+class TestFastSerializers:
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_titles_match(self, catalog):
+        from api.fast_serializers import TitleListSerializer
+        from api.serializers import TitleReadOnlySerializer
+        from reviews.models import Title
+
+        queryset = Title.objects.select_related(
+            'category'
+        ).prefetch_related('genre').order_by('-id')
+        fast = TitleListSerializer()
+        assert self.render(
+            fast.serialize(fast.get_rows(queryset))
+        ) == self.render(
+            TitleReadOnlySerializer(queryset, many=True).data
+        ), 'Быстрый сериализатор произведений расходится с TitleReadOnlySerializer'
+
+    def test_titles_with_histogram_match(self, catalog):
+        from api.fast_serializers import TitleListSerializer
+        from api.serializers import TitleReadOnlySerializer
+        from reviews.models import Title
+
+        queryset = Title.objects.select_related(
+            'category'
+        ).prefetch_related('genre').order_by('-id')
+        context = {'include_histogram': True}
+        fast = TitleListSerializer(context=context)
+        assert self.render(
+            fast.serialize(fast.get_rows(queryset))
+        ) == self.render(
+            TitleReadOnlySerializer(queryset, many=True, context=context).data
+        ), ('Быстрый сериализатор произведений с гистограммой расходится '
+            'с TitleReadOnlySerializer')
+
+    def test_reviews_match(self, catalog):
+        from api.fast_serializers import ReviewListSerializer
+        from api.serializers import ReviewSerializer
+
+        queryset = catalog.reviews.select_related('author')
+        fast = ReviewListSerializer()
+        assert self.render(
+            fast.serialize(fast.get_rows(queryset))
+        ) == self.render(
+            ReviewSerializer(queryset, many=True).data
+        ), 'Быстрый сериализатор отзывов расходится с ReviewSerializer'
+
+    def test_comments_match(self, catalog):
+        from api.fast_serializers import CommentListSerializer
+        from api.serializers import CommentSerializer
+        from reviews.models import Comment
+
+        queryset = Comment.objects.select_related('author')
+        fast = CommentListSerializer()
+        assert self.render(
+            fast.serialize(fast.get_rows(queryset))
+        ) == self.render(
+            CommentSerializer(queryset, many=True).data
+        ), 'Быстрый сериализатор комментариев расходится с CommentSerializer'
@@ -0,0 +1,48 @@
+def make_spec(**sizes):
+    from reviews.generator import Spec
+
+    return Spec(
+        seed=0, prefix='gen', skew=1.2, score_mean=7.0, score_spread=2.0,
+        first={'user': 1, 'category': 1, 'genre': 1, 'title': 1,
+               'review': 1},
+        sizes={'user': 20, 'category': 3, 'genre': 5, 'title': 50,
+               'review': 600, 'comment': 900, **sizes},
+    )
+
+
+def all_rows(spec, chunk_size=64):
+    from reviews.generator import generate_rows, plan
+
+    jobs, _ = plan(spec, chunk_size)
+    rows = {}
+    for table, job in jobs:
+        rows.setdefault(table, []).extend(generate_rows(spec, table, job))
+    return rows
+
+
+class TestGenerator:
+
+    def test_spread_caps_and_keeps_total(self):
+        from reviews.generator import spread, zipf_weights
+
+        shares = spread(100, zipf_weights(10, 1.5), cap=20)
+        assert max(shares) <= 20
+        assert round(sum(shares)) == 100
+
+    def test_one_review_per_author_and_title(self):
+        rows = all_rows(make_spec())
+        pairs = [(title, author) for _, title, author, *_ in rows['review']]
+        assert len(pairs) == len(set(pairs))
+        assert all(1 <= row[4] <= 10 for row in rows['review'])
+        assert len({row[0] for row in rows['review']}) == len(pairs), (
+            'id отзывов должны идти подряд без повторов'
+        )
+
+    def test_references_point_to_generated_rows(self):
+        rows = all_rows(make_spec())
+        reviews = {row[0] for row in rows['review']}
+        assert {row[0] for row in rows['comment']} <= reviews
+        assert {row[3] for row in rows['title']} <= {1, 2, 3}
+
+    def test_same_seed_same_data(self):
+        assert all_rows(make_spec()) == all_rows(make_spec())
@@ -0,0 +1,83 @@
+import pytest
+
+
+@pytest.fixture
+def reviewed_title(make_catalog):
+    return make_catalog(
+        titles=[{'name': 'Фильм'}],
+        users=4,
+        reviews=[(0, author, score)
+                 for author, score in enumerate((3, 7, 7, 10))],
+    ).titles[0]
+
+
+def histogram(**counts):
+    return [counts.get(f's{score}', 0) for score in range(1, 11)]
+
+
+@pytest.mark.django_db
+class TestScoreHistogram:
+
+    def test_review_writes_update_histogram(self, reviewed_title):
+        from reviews.models import Review, Title
+
+        title = Title.objects.get(pk=reviewed_title.pk)
+        assert title.histogram == histogram(s3=1, s7=2, s10=1), (
+            'Создание отзыва должно увеличивать счётчик его оценки'
+        )
+        review = Review.objects.filter(title=title, score=7).first()
+        review.score = 1
+        review.save()
+        Review.objects.filter(title=title, score=10).get().delete()
+        title.refresh_from_db()
+        assert title.histogram == histogram(s1=1, s3=1, s7=1), (
+            'Изменение и удаление отзыва должны сдвигать гистограмму'
+        )
+        assert (title.rating_sum, title.rating_count) == (11, 3)
+
+    def test_out_of_range_score(self, reviewed_title):
+        from django.db import IntegrityError, transaction
+        from reviews.models import Review, Title
+
+        for score in (0, 11):
+            with pytest.raises(ValueError):
+                Title.objects.filter(pk=reviewed_title.pk).shift_rating(
+                    added=score
+                )
+            with pytest.raises(IntegrityError), transaction.atomic():
+                Review.objects.filter(title=reviewed_title).update(
+                    score=score
+                )
+        assert Title.objects.get(pk=reviewed_title.pk).histogram == (
+            histogram(s3=1, s7=2, s10=1)
+        ), 'Оценка вне шкалы не должна попадать в гистограмму'
+
+    def test_rebuild_command(self, reviewed_title):
+        from django.core.management import call_command
+        from reviews.models import Title
+
+        expected = Title.objects.values_list(
+            'rating_sum', 'rating_count', 'rating', 'score_7_count'
+        ).get()
+        Title.objects.update(rating_sum=0, rating_count=0, score_7_count=9)
+        call_command('rebuild_histograms', batch_size=1)
+        assert Title.objects.values_list(
+            'rating_sum', 'rating_count', 'rating', 'score_7_count'
+        ).get() == expected, (
+            'rebuild_histograms должна восстанавливать гистограмму и '
+            'рейтинг по отзывам'
+        )
+
+    def test_api_representation(self, client, reviewed_title):
+        detail = client.get(f'/api/v1/titles/{reviewed_title.pk}/').json()
+        assert detail['histogram'] == histogram(s3=1, s7=2, s10=1), (
+            'Карточка произведения должна содержать гистограмму оценок'
+        )
+        listed = client.get('/api/v1/titles/').json()['results'][0]
+        assert 'histogram' not in listed, (
+            'Список произведений без ?include=histogram не меняется'
+        )
+        listed = client.get(
+            '/api/v1/titles/?include=histogram'
+        ).json()['results'][0]
+        assert listed['histogram'] == detail['histogram']
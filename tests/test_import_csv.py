@@ -0,0 +1,288 @@
+import pytest
+
+# Время записи ставится при импорте заново (auto_now, auto_now_add).
+IMPORT_STAMPED = {'modified', 'pub_date'}
+
+
+@pytest.fixture
+def catalog(make_catalog):
+    from users.models import User
+
+    make_catalog(
+        genres={'drama': 'Драма', 'comedy': 'Комедия'},
+        titles=[
+            {'name': 'С описанием', 'year': 1999, 'description': '',
+             'genre': ['drama', 'comedy']},
+            {'name': 'Без описания', 'genre': ['drama']},
+        ],
+        users=2,
+        reviews=[(0, 0, 3), (0, 1, 9)],
+        comments=True,
+    )
+    User.objects.update(bio='Текст, с "кавычками"\nи переносом')
+
+
+def snapshot():
+    """Строки всех таблиц выгрузки без полей, которые ставит импорт."""
+    from reviews.dump import MODELS, TABLES, export_fields
+
+    return {
+        table: list(
+            MODELS[table]._base_manager.order_by('pk').values_list(*(
+                field for field in export_fields(table)
+                if field not in IMPORT_STAMPED
+            ))
+        )
+        for table in TABLES
+    }
+
+
+def clear_catalog():
+    from reviews.models import Category, Genre, Title
+    from users.models import User
+
+    Title.objects.all().delete()
+    for model in (Category, Genre, User):
+        model.objects.all().delete()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportCsv:
+
+    def test_export_import_round_trip(self, catalog, tmp_path):
+        from django.core.management import call_command
+
+        expected = snapshot()
+        call_command('export_data', output_dir=str(tmp_path))
+        clear_catalog()
+        call_command('import_csv', data_dir=str(tmp_path), jobs=1)
+        assert snapshot() == expected, (
+            'Выгрузка export_data, загруженная import_csv в пустую базу, '
+            'должна восстанавливать те же строки'
+        )
+
+    def test_copy_rendering(self):
+        import csv
+        import io
+
+        from django.db import connection
+        from reviews.management.commands.import_csv import (COPY_NULL,
+                                                            get_fields,
+                                                            render_copy)
+        from reviews.models import Title
+
+        header = ['id', 'name', 'year', 'category_id', 'description']
+        fields = get_fields(Title, header)
+        objs = [
+            Title(id=1, name='Имя, с "запятой"', year=2000, category_id=1,
+                  description=None),
+            Title(id=2, name='Пусто', year=2001, category_id=1,
+                  description=''),
+        ]
+        rows = list(csv.reader(io.StringIO(render_copy(
+            connection, fields, objs
+        ))))
+        columns = [field.attname for field in fields]
+        assert columns[:5] == header, (
+            'Столбцы COPY должны начинаться с pk, если он есть в csv'
+        )
+        first, second = (dict(zip(columns, row)) for row in rows)
+        assert first['name'] == 'Имя, с "запятой"'
+        assert first['description'] == COPY_NULL, (
+            'NULL должен передаваться в COPY маркером, а не пустой строкой'
+        )
+        assert second['description'] == ''
+        assert first['rating_sum'] == '0', (
+            'Поля, которых нет в csv, получают значения по умолчанию'
+        )
+
+    def test_parallel_round_trip(self, catalog, tmp_path):
+        from django.core.management import call_command
+
+        expected = snapshot()
+        call_command('export_data', output_dir=str(tmp_path))
+        clear_catalog()
+        call_command('import_csv', data_dir=str(tmp_path), jobs=2,
+                     chunk_size=1)
+        assert snapshot() == expected, (
+            'Разбор пачек в пуле процессов должен сохранять строки и их '
+            'порядок'
+        )
+
+
+def import_incremental(data_dir, **options):
+    """
+    Запускает import_csv --incremental; последний отчёт о ходе импорта
+    по каждой таблице.
+    """
+    import io
+
+    from django.core.management import call_command
+
+    output = io.StringIO()
+    call_command('import_csv', data_dir=str(data_dir), jobs=1,
+                 incremental=True, stdout=output, **options)
+    last = {}
+    for line in output.getvalue().splitlines():
+        table, _, message = line.partition(': ')
+        if 'создано' in message or 'пропуск' in message:
+            last[table] = message
+    return last
+
+
+@pytest.mark.django_db(transaction=True)
+class TestIncrementalImport:
+
+    def test_upsert_counts(self, catalog, tmp_path, monkeypatch):
+        from django.core.management import call_command
+        from reviews.models import ImportCheckpoint, Title
+        from reviews.signals import bulk_changed
+
+        call_command('export_data', output_dir=str(tmp_path))
+        expected = snapshot()
+        clear_catalog()
+        assert import_incremental(tmp_path)['title'].endswith(
+            'создано 2, обновлено 0'
+        )
+        assert snapshot() == expected
+        modified = list(Title.objects.values_list('modified', flat=True))
+
+        # Повтор того же файла без контрольных точек: ничего не меняется.
+        ImportCheckpoint.objects.all().delete()
+        output = import_incremental(tmp_path)
+        for table in ('user', 'title', 'review', 'comment'):
+            assert output[table].endswith('создано 0, обновлено 0'), (
+                f'Повторный импорт того же {table}.csv не должен считать '
+                f'строки обновлёнными: {output[table]}'
+            )
+        assert list(
+            Title.objects.values_list('modified', flat=True)
+        ) == modified, 'Повторный импорт не должен сдвигать modified'
+
+        # Изменённый файл: обновляется только изменившаяся строка, прочие
+        # таблицы пропускаются без пересчёта счётчиков.
+        path = tmp_path / 'title.csv'
+        path.write_text(path.read_text().replace(
+            'Без описания', 'Новое название'
+        ))
+        recalculated = []
+        monkeypatch.setattr(
+            type(Title.objects.all()), 'recalculate_histograms',
+            lambda queryset: recalculated.append(True)
+        )
+        senders = []
+
+        def receiver(sender, **kwargs):
+            senders.append(sender)
+
+        bulk_changed.connect(receiver)
+        try:
+            output = import_incremental(tmp_path)
+        finally:
+            bulk_changed.disconnect(receiver)
+        assert output['title'].endswith('создано 0, обновлено 1')
+        assert output['user'] == 'файл не изменился, пропуск'
+        assert senders == [Title] and recalculated == [True], (
+            'После импорта пересчитываются и сбрасываются только '
+            'изменившиеся таблицы'
+        )
+        senders.clear()
+        recalculated.clear()
+        import_incremental(tmp_path)
+        assert senders == [] and recalculated == [], (
+            'Если все файлы пропущены, пересчёт не нужен'
+        )
+
+    def test_resume_from_checkpoint(self, catalog, tmp_path, monkeypatch):
+        from django.core.management import call_command
+        from reviews.management.commands import import_csv
+        from reviews.models import ImportCheckpoint
+
+        call_command('export_data', output_dir=str(tmp_path))
+        expected = snapshot()
+        clear_catalog()
+        upsert_chunk = import_csv.upsert_chunk
+        calls = []
+
+        def failing_upsert(connection, model, *args):
+            if model is import_csv.MODELS['review']:
+                calls.append(model)
+                if len(calls) == 2:
+                    raise RuntimeError('Импорт прерван')
+            return upsert_chunk(connection, model, *args)
+
+        monkeypatch.setattr(import_csv, 'upsert_chunk', failing_upsert)
+        with pytest.raises(RuntimeError):
+            import_incremental(tmp_path, chunk_size=1)
+        checkpoint = ImportCheckpoint.objects.get(table='review')
+        assert (checkpoint.rows_done, checkpoint.completed) == (1, False), (
+            'Контрольная точка должна хранить число закоммиченных строк'
+        )
+
+        monkeypatch.setattr(import_csv, 'upsert_chunk', upsert_chunk)
+        output = import_incremental(tmp_path, chunk_size=1)
+        assert output['review'].endswith('создано 1, обновлено 0'), (
+            'Повторный запуск должен продолжать с контрольной точки'
+        )
+        assert output['user'] == 'файл не изменился, пропуск'
+        assert snapshot() == expected, (
+            'После продолжения импорта данные и счётчики должны совпадать '
+            'с исходными'
+        )
+
+
+class TestImportScheduler:
+
+    def run_schedule(self, graph, writers):
+        import threading
+        import time
+
+        from reviews.management.commands.import_csv import Command
+
+        events = []
+        lock = threading.Lock()
+
+        def load_table(table):
+            with lock:
+                events.append(('start', table))
+            time.sleep(0.02)
+            with lock:
+                events.append(('end', table))
+            return 1, 0.0
+
+        command = Command()
+        command.load_table = load_table
+        command.schedule(graph, writers)
+        return events
+
+    def test_tables_wait_for_foreign_keys(self):
+        from reviews.dump import TABLES
+        from reviews.management.commands.import_csv import table_dependencies
+
+        graph = table_dependencies(TABLES)
+        assert graph['review'] == {'user', 'title'}
+        assert graph['genre_title'] == {'genre', 'title'}
+        events = self.run_schedule(graph, writers=len(TABLES))
+        for table in TABLES:
+            started = events.index(('start', table))
+            for dependency in graph[table]:
+                assert events.index(('end', dependency)) < started, (
+                    f'{table} начал загружаться раньше, чем закончилась '
+                    f'{dependency}'
+                )
+        first_end = min(events.index(('end', table)) for table in TABLES)
+        assert {
+            table for kind, table in events[:first_end] if kind == 'start'
+        } == {'user', 'category', 'genre'}, (
+            'Независимые таблицы должны загружаться одновременно'
+        )
+
+    def test_cycle_is_reported(self):
+        from django.core.management.base import CommandError
+        from reviews.dump import TABLES
+        from reviews.management.commands.import_csv import table_dependencies
+
+        graph = table_dependencies(TABLES)
+        graph['user'] = {'comment'}
+        with pytest.raises(CommandError):
+            self.run_schedule(graph, writers=2)
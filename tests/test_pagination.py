@@ -0,0 +1,88 @@
+import pytest
+
+
+@pytest.fixture
+def many_reviews(make_catalog):
+    catalog = make_catalog(
+        titles=[{'name': f'Фильм {number}', 'year': 2000 + number}
+                for number in range(12)],
+        users=12,
+        reviews=[(0, author, 5) for author in range(12)],
+        staff=('admin',),
+    )
+    return catalog.titles[0], catalog.staff['admin']
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def walk(self, client, url):
+        """Все id по страницам ?pagination=cursor и ссылкам next."""
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'GET {url} вернул {response.status_code}'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'В режиме курсора ответ не должен содержать count'
+        )
+        ids = [item.get('id', item.get('username')) for item in
+               data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            ids += [item.get('id', item.get('username')) for item in
+                    data['results']]
+        return ids
+
+    def offset_ids(self, client, url, key='id'):
+        data = client.get(url).json()
+        ids = [item[key] for item in data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            ids += [item[key] for item in data['results']]
+        return ids
+
+    def test_titles(self, client, many_reviews):
+        assert self.walk(
+            client, '/api/v1/titles/?pagination=cursor'
+        ) == self.offset_ids(client, '/api/v1/titles/'), (
+            'Курсорная пагинация произведений должна отдавать те же '
+            'записи в том же порядке, что и постраничная'
+        )
+
+    def test_reviews(self, client, many_reviews):
+        title, _ = many_reviews
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        ids = self.walk(client, f'{url}?pagination=cursor')
+        assert len(ids) == 12 and ids == self.offset_ids(client, url), (
+            'Курсорная пагинация отзывов должна обходить все отзывы'
+        )
+        assert client.get(
+            '/api/v1/titles/0/reviews/?pagination=cursor'
+        ).status_code == 404, (
+            'Курсор по отзывам несуществующего произведения - 404'
+        )
+
+    def test_users(self, many_reviews):
+        from rest_framework.test import APIClient
+
+        _, admin = many_reviews
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        ids = self.walk(client, '/api/v1/users/?pagination=cursor')
+        assert len(ids) == 13 and ids == self.offset_ids(
+            client, '/api/v1/users/', key='username'
+        ), 'Курсорная пагинация пользователей должна обходить всех'
+
+    def test_ordering_rejected(self, client, many_reviews):
+        response = client.get(
+            '/api/v1/titles/?pagination=cursor&ordering=-rating'
+        )
+        assert response.status_code == 400, (
+            '?ordering= в режиме курсора должен давать 400, а не '
+            'игнорироваться'
+        )
+        assert 'ordering' in response.json()
+        assert client.get(
+            '/api/v1/titles/?ordering=-rating'
+        ).status_code == 200, 'Без курсора сортировка работает как раньше'
@@ -0,0 +1,123 @@
+import pytest
+
+
+@pytest.fixture
+def rankings_catalog(settings, make_catalog):
+    from reviews.models import TitleRanking
+
+    settings.TITLE_RANKING_PRIOR_WEIGHT = 2
+    catalog = make_catalog(
+        genres={'drama': 'Драма', 'comedy': 'Комедия'},
+        titles=[
+            {'name': 'Много отзывов', 'genre': ['drama']},
+            {'name': 'Один отзыв', 'year': 2001,
+             'genre': ['drama', 'comedy']},
+            {'name': 'Без отзывов', 'year': 2001},
+        ],
+        users=4,
+        reviews=[(0, author, 10) for author in range(4)] + [(1, 0, 9)],
+    )
+    # Пересчёт со средней оценкой по всем отзывам: 49 / 5 = 9.8.
+    TitleRanking.objects.rebuild()
+    return catalog.titles, catalog.users
+
+
+@pytest.mark.django_db
+class TestTitleRankings:
+
+    def top(self, client, query=''):
+        response = client.get(f'/api/v1/titles/top/{query}')
+        assert response.status_code == 200, (
+            f'GET /api/v1/titles/top/{query} вернул {response.status_code}'
+        )
+        return [(item['id'], item['score']) for item in response.json()]
+
+    def test_bayesian_order(self, client, rankings_catalog):
+        titles, _ = rankings_catalog
+        # (2 * 9.8 + 40) / 6, (2 * 9.8 + 0) / 2 и (2 * 9.8 + 9) / 3.
+        assert self.top(client) == [
+            (titles[0].pk, 9.93), (titles[2].pk, 9.8), (titles[1].pk, 9.53),
+        ], 'Топ должен быть отсортирован по байесовскому среднему'
+
+    def test_filters(self, client, rankings_catalog):
+        titles, _ = rankings_catalog
+        assert [pk for pk, _ in self.top(client, '?genre=comedy')] == [
+            titles[1].pk
+        ], 'Топ жанра должен содержать только произведения этого жанра'
+        assert [pk for pk, _ in self.top(client, '?year=2001&limit=1')] == [
+            titles[2].pk
+        ], 'Фильтр по году и limit должны ограничивать топ'
+        assert client.get(
+            '/api/v1/titles/top/?genre=missing'
+        ).status_code == 400, 'Несуществующий жанр должен давать 400'
+
+    def test_review_write_refreshes_scores(self, client, rankings_catalog):
+        from reviews.models import Review, TitleRanking
+
+        titles, _ = rankings_catalog
+        review = Review.objects.get(title=titles[1])
+        review.score = 1
+        review.save()
+        scores = TitleRanking.objects.filter(
+            title=titles[1]
+        ).values_list('score', flat=True)
+        assert list(scores) == [pytest.approx((2 * 9.8 + 1) / 3)] * 3, (
+            'Изменение оценки должно пересчитывать строки топов '
+            'произведения во всех жанрах'
+        )
+        review.delete()
+        assert list(scores.all()) == [pytest.approx(9.8)] * 3, (
+            'Удаление отзыва должно пересчитывать строки топов'
+        )
+
+    def test_title_changes_rebuild_rows(self, rankings_catalog):
+        from reviews.models import TitleRanking
+
+        titles, _ = rankings_catalog
+        titles[1].genre.remove(titles[1].genre.get(slug='comedy'))
+        titles[1].year = 1999
+        titles[1].save()
+        assert sorted(
+            TitleRanking.objects.filter(title=titles[1]).values_list(
+                'genre__slug', 'year'
+            ), key=str
+        ) == [('drama', 1999), (None, 1999)], (
+            'Смена жанров и года произведения должна перестраивать его '
+            'строки топов'
+        )
+
+    def test_partial_rebuild_uses_cached_prior(self, rankings_catalog):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import TitleRanking
+
+        titles, _ = rankings_catalog
+        cache.set(TitleRanking.objects.all().prior_key, 5.0)
+        with CaptureQueriesContext(connection) as queries:
+            TitleRanking.objects.rebuild([titles[0].pk])
+        assert not any('SUM(' in query['sql'] for query in queries), (
+            'Пересчёт одного произведения не должен агрегировать оценки '
+            'всех произведений'
+        )
+        assert TitleRanking.objects.get(
+            title=titles[0], genre=None
+        ).score == pytest.approx((2 * 5.0 + 40) / 6)
+        TitleRanking.objects.rebuild()
+        assert TitleRanking.objects.get_prior() == pytest.approx(9.8), (
+            'Полный пересчёт должен обновлять среднюю оценку'
+        )
+
+    def test_bulk_change_enqueues_rebuild(self, rankings_catalog):
+        from reviews.models import Title, TitleRanking
+        from reviews.signals import bulk_changed
+        from tasks.worker import run_pending
+
+        titles, _ = rankings_catalog
+        TitleRanking.objects.all().delete()
+        bulk_changed.send(sender=Title, pks=[titles[0].pk])
+        bulk_changed.send(sender=Title)
+        assert run_pending() == 2
+        assert TitleRanking.objects.filter(genre=None).count() == 3, (
+            'Задача после массового изменения должна перестраивать топы'
+        )
@@ -0,0 +1,97 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestReferenceRegistry:
+
+    def test_other_process_reloads_after_max_age(self, settings,
+                                                 monkeypatch):
+        from django.core.cache import cache
+        from reviews import registry
+        from reviews.models import Genre
+
+        cache.clear()
+        settings.REFERENCE_REGISTRY_CHECK_INTERVAL = 1
+        settings.REFERENCE_REGISTRY_MAX_AGE = 60
+        now = [1000.0]
+        monkeypatch.setattr(registry.time, 'monotonic', lambda: now[0])
+        Genre.objects.create(name='Драма', slug='drama')
+        # Реестр другого процесса: версия в LocMemCache этого процесса
+        # ему не видна, поэтому запись делается без сигналов.
+        other = registry.ReferenceRegistry(Genre)
+        assert [row['slug'] for row in other.as_list()] == ['drama']
+        Genre.objects.bulk_create([Genre(name='Комедия', slug='comedy')])
+        Genre.objects.filter(slug='drama')._raw_delete(Genre.objects.db)
+
+        now[0] += 30
+        assert [row['slug'] for row in other.as_list()] == ['drama'], (
+            'До REFERENCE_REGISTRY_MAX_AGE реестр отдаёт загруженные данные'
+        )
+        now[0] += 30
+        assert sorted(row['slug'] for row in other.as_list()) == [
+            'comedy'
+        ], (
+            'Через REFERENCE_REGISTRY_MAX_AGE реестр должен перечитывать '
+            'справочник, даже если версия в кэше не сдвинулась'
+        )
+        assert other.get_by_slug('drama') is None, (
+            'Удалённый в другом процессе slug не должен приниматься после '
+            'перечитывания'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStaleRegistry:
+    url = '/api/v1/titles/'
+
+    def test_deleted_reference_is_validation_error(self):
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        from reviews import registry
+        from reviews.models import Category, Genre, Title
+        from users.models import User
+
+        cache.clear()
+        Category.objects.create(name='Фильм', slug='film')
+        Category.objects.create(name='Книга', slug='book')
+        Genre.objects.create(name='Драма', slug='drama')
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create(
+            username='admin', email='admin@example.com', role='admin'
+        ))
+        assert registry.categories.get_by_slug('book') is not None
+        assert registry.genres.get_by_slug('drama') is not None
+        # Удаление в другом процессе: реестр этого процесса его не видит.
+        Category.objects.filter(slug='book')._raw_delete(Category.objects.db)
+        Genre.objects.filter(slug='drama')._raw_delete(Genre.objects.db)
+
+        response = client.post(self.url, {
+            'name': 'Новый', 'year': 2000, 'genre': ['drama'],
+            'category': 'book',
+        }, format='json')
+        assert response.status_code == 400, (
+            'Нарушение внешнего ключа из-за устаревшего реестра должно '
+            f'давать 400, а не {response.status_code}'
+        )
+        assert set(response.json()) == {'genre', 'category'}
+        assert not Title.objects.exists()
+        assert registry.categories.get_by_slug('book') is None, (
+            'После ошибки устаревший реестр должен перечитываться'
+        )
+
+    def test_missing_id_is_read_from_database(self):
+        from django.core.cache import cache
+        from reviews import registry
+        from reviews.models import Genre
+
+        cache.clear()
+        registry.genres.as_list()
+        # Запись без сигналов: версия реестра не сдвигается.
+        Genre.objects.bulk_create([Genre(name='Драма', slug='drama')])
+        genre = Genre.objects.get(slug='drama')
+        assert registry.genres.get_representation(genre.pk) == {
+            'name': 'Драма', 'slug': 'drama'
+        }
+        assert registry.genres.get_representation(genre.pk + 1) is None, (
+            'Отсутствующий id не должен давать KeyError'
+        )
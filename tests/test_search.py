@@ -0,0 +1,111 @@
+import json
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+
+@pytest.fixture
+def search_catalog(make_catalog):
+    make_catalog(
+        categories={'movie': 'Movie', 'movies': 'Movies', 'books': 'Books'},
+        genres={'drama': 'Drama', 'melodrama': 'Melodrama',
+                'comedy': 'Comedy'},
+        titles=[
+            {'name': name, 'description': 'Описание', 'genre': ['drama']}
+            for name in ('Star Wars', 'War and Peace', 'Clone Wars', 'Peace',
+                         'Peaceful Days')
+        ],
+    )
+
+
+@pytest.mark.django_db
+class TestSearchLists:
+    """
+    Списки с поиском идут быстрым путём (values() и реестр справочников);
+    их ответ должен совпадать с обычными сериализаторами на той же
+    выборке в том же порядке.
+    """
+
+    def get_results(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'GET {url} вернул {response.status_code}'
+        )
+        return response.json()['results']
+
+    def expected(self, serializer_class, queryset):
+        return json.loads(JSONRenderer().render(
+            serializer_class(queryset, many=True).data
+        ))
+
+    @pytest.mark.parametrize('query, ranked', (
+        ('name=war', False), ('search=peace', True), ('search=PEACE', True),
+    ))
+    def test_titles(self, client, search_catalog, query, ranked):
+        from api.search import search_queryset
+        from api.serializers import TitleReadOnlySerializer
+        from reviews.models import Title
+
+        _, term = query.split('=')
+        queryset = search_queryset(
+            Title.objects.select_related('category')
+                         .prefetch_related('genre').order_by('-id'),
+            'name', term, ranked=ranked
+        )
+        results = self.get_results(client, f'/api/v1/titles/?{query}')
+        assert results, f'?{query} должен находить произведения'
+        assert results == self.expected(TitleReadOnlySerializer, queryset), (
+            f'Список произведений с ?{query} расходится с '
+            'TitleReadOnlySerializer'
+        )
+
+    @pytest.mark.parametrize('url, model, serializer, term', (
+        ('/api/v1/genres/', 'Genre', 'GenreSerializer', 'drama'),
+        ('/api/v1/categories/', 'Category', 'CategorySerializer', 'movie'),
+    ))
+    def test_reference(self, client, search_catalog, url, model, serializer,
+                       term):
+        from api import serializers
+        from api.search import search_queryset
+        from reviews import models
+
+        queryset = getattr(models, model).objects.all()
+        serializer_class = getattr(serializers, serializer)
+        assert self.get_results(client, url) == self.expected(
+            serializer_class, queryset
+        ), f'Список {url} из реестра расходится с {serializer}'
+        results = self.get_results(client, f'{url}?search={term}')
+        assert results == self.expected(
+            serializer_class,
+            search_queryset(queryset, 'name', term, ranked=True)
+        ), f'Поиск {url}?search={term} расходится с {serializer}'
+        assert results[0]['name'].lower() == term, (
+            'Точное совпадение должно идти первым'
+        )
+
+
+@pytest.mark.django_db
+class TestTrigramRanking:
+
+    def test_ranked_by_similarity(self, client, search_catalog):
+        from django.contrib.postgres.search import TrigramSimilarity
+        from django.db import connection
+        from reviews.models import Title
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('Триграммное сходство есть только в PostgreSQL')
+        response = client.get('/api/v1/titles/?search=peace')
+        assert response.status_code == 200
+        names = [title['name'] for title in response.json()['results']]
+        assert names[0] == 'Peace', 'Точное совпадение должно идти первым'
+        assert sorted(names) == ['Peace', 'Peaceful Days', 'War and Peace']
+        similarity = dict(
+            Title.objects.annotate(
+                similarity=TrigramSimilarity('name', 'peace')
+            ).values_list('name', 'similarity')
+        )
+        scores = [similarity[name] for name in names]
+        assert scores == sorted(scores, reverse=True), (
+            'Поиск должен сортировать по убыванию триграммного сходства: '
+            f'{list(zip(names, scores))}'
+        )
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+
+class TestQueryShape:
+
+    def test_in_lists_collapse_to_one_shape(self):
+        from api_yamdb.sql_instrumentation import query_shape
+
+        assert query_shape('SELECT 1 WHERE id IN (%s, %s, %s)') == (
+            query_shape('SELECT 1 WHERE id IN (%s)')
+        )
+        assert query_shape('INSERT INTO t VALUES (%s, %s), (%s, %s)') == (
+            query_shape('INSERT INTO t VALUES (%s, %s)')
+        )
+
+    def test_recorder_counts_repeated_shapes(self):
+        from api_yamdb.sql_instrumentation import QueryRecorder
+
+        recorder = QueryRecorder()
+        for pk in range(6):
+            recorder(lambda *args: None,
+                     'SELECT * FROM users_user WHERE id = %s', (pk,),
+                     False, {})
+        assert recorder.count == 6
+        assert recorder.repeated(5) == [
+            ('SELECT * FROM users_user WHERE id = %s', 6)
+        ]
+
+
+class TestQueryBudget:
+
+    def request(self, budget, method='get'):
+        request = getattr(RequestFactory(), method)('/')
+        view = SimpleNamespace(cls=SimpleNamespace(query_budget=budget),
+                               actions={'get': 'list', 'post': 'create'})
+        request.resolver_match = SimpleNamespace(func=view, view_name='v')
+        return request
+
+    def check(self, request, queries):
+        from api_yamdb.sql_instrumentation import (
+            QueryRecorder, SQLInstrumentationMiddleware)
+
+        recorder = QueryRecorder()
+        recorder.count = queries
+        middleware = SQLInstrumentationMiddleware(lambda r: HttpResponse())
+        middleware.check_budget(request, 'v', recorder)
+
+    def test_budget_per_action(self):
+        from api_yamdb.sql_instrumentation import get_query_budget
+
+        assert get_query_budget(self.request({'list': 3})) == 3
+        assert get_query_budget(self.request({'list': 3}, 'post')) is None
+        assert get_query_budget(self.request(4, 'post')) == 4
+
+    def test_exceeded_budget_fails_in_tests(self):
+        from api_yamdb.sql_instrumentation import QueryBudgetError
+
+        self.check(self.request({'list': 3}), 3)
+        with pytest.raises(QueryBudgetError):
+            self.check(self.request({'list': 3}), 4)
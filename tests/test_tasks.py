@@ -0,0 +1,58 @@
+import pytest
+from django.core import mail
+
+
+@pytest.fixture
+def always_fails():
+    """Задача, которая всегда падает; после теста снимается с регистрации."""
+    from tasks.queue import registry, task
+
+    @task('tests.always_fails')
+    def always_fails(value):
+        raise ValueError(value)
+
+    yield always_fails
+    del registry[always_fails.task_name]
+
+
+@pytest.mark.django_db
+class TestTaskQueue:
+
+    def test_signup_enqueues_confirmation_email(self, client):
+        from tasks.models import Task
+        from tasks.worker import run_pending
+        from users.models import User
+
+        response = client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'queued', 'email': 'queued@example.com'}
+        )
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Регистрация должна ставить письмо в очередь, а не отправлять его'
+        )
+        assert Task.objects.count() == 1
+
+        assert run_pending() == 1
+        user = User.objects.get(username='queued')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['queued@example.com']
+        assert user.confirmation_code in mail.outbox[0].body
+        assert not Task.objects.exists()
+
+    def test_failed_task_is_retried_later(self, settings, always_fails):
+        from tasks.models import Task
+        from tasks.queue import enqueue
+        from tasks.worker import run_pending
+
+        settings.TASK_MAX_ATTEMPTS = 2
+        enqueue(always_fails, value='boom')
+        assert run_pending() == 1
+        queued = Task.objects.get()
+        assert queued.status == Task.QUEUED
+        assert 'boom' in queued.last_error
+        assert run_pending() == 0, 'Повтор должен быть отложен'
+
+        Task.objects.update(run_at=queued.created)
+        assert run_pending() == 1
+        assert Task.objects.get().status == Task.FAILED
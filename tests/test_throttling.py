@@ -0,0 +1,94 @@
+import pytest
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    from django.core.cache import cache
+    from users.throttling import TokenBucketThrottle
+
+    cache.clear()
+    monkeypatch.setitem(
+        TokenBucketThrottle.THROTTLE_RATES, 'anon_read', '3/min'
+    )
+    now = [1000.0]
+    monkeypatch.setattr(TokenBucketThrottle, 'timer', lambda self: now[0])
+    return now
+
+
+@pytest.mark.django_db
+class TestTokenBucketThrottle:
+    url = '/api/v1/genres/'
+
+    def statuses(self, client, count):
+        return [client.get(self.url).status_code for _ in range(count)]
+
+    def test_drain_and_refill(self, client, clock):
+        assert self.statuses(client, 3) == [200] * 3
+        response = client.get(self.url)
+        assert response.status_code == 429, (
+            'Запрос сверх ёмкости корзины должен получать 429'
+        )
+        # 3 токена в минуту: один восстанавливается за 20 секунд.
+        assert response['Retry-After'] == '20', (
+            'Retry-After должен показывать время до следующего токена'
+        )
+        clock[0] += 10
+        assert client.get(self.url)['Retry-After'] == '10'
+        clock[0] += 10
+        assert self.statuses(client, 2) == [200, 429], (
+            'Через Retry-After секунд должен восстановиться один токен'
+        )
+        clock[0] += 600
+        assert self.statuses(client, 4) == [200] * 3 + [429], (
+            'Корзина восстанавливается не больше своей ёмкости'
+        )
+
+    def test_buckets_are_per_client(self, client, clock):
+        from rest_framework.test import APIClient
+        from users.models import User
+
+        assert self.statuses(client, 4)[-1] == 429
+        assert client.get(
+            self.url, REMOTE_ADDR='10.0.0.2'
+        ).status_code == 200, 'У другого IP своя корзина'
+        user_client = APIClient()
+        user_client.force_authenticate(user=User.objects.create(
+            username='user', email='user@example.com'
+        ))
+        assert self.statuses(user_client, 5) == [200] * 5, (
+            'Чтение аутентифицированным пользователем не ограничивается'
+        )
+
+    def test_clients_behind_proxy(self, client, clock):
+        nginx = {'REMOTE_ADDR': '172.18.0.5'}
+        first = {**nginx, 'HTTP_X_FORWARDED_FOR': '10.0.0.1'}
+        assert [client.get(self.url, **first).status_code
+                for _ in range(4)] == [200] * 3 + [429]
+        assert client.get(
+            self.url, **nginx, HTTP_X_FORWARDED_FOR='10.0.0.2'
+        ).status_code == 200, (
+            'Клиенты за одним прокси должны получать разные корзины'
+        )
+        assert client.get(
+            self.url, **nginx, HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.1'
+        ).status_code == 429, (
+            'Подставленный клиентом X-Forwarded-For не должен давать '
+            'новую корзину'
+        )
+
+    def test_process_local_cache_warning(self, settings, tmp_path):
+        from api_yamdb.checks import check_throttle_cache
+
+        assert [warning.id for warning in check_throttle_cache(None)] == [
+            'api_yamdb.W002'
+        ], 'check --deploy должен предупреждать о корзинах в памяти процесса'
+        settings.CACHES = {
+            **settings.CACHES,
+            'shared': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            },
+        }
+        settings.THROTTLE_CACHE_ALIAS = 'shared'
+        assert check_throttle_cache(None) == []
@@ -0,0 +1,79 @@
+import pytest
+
+
+@pytest.fixture
+def title_with_authors(make_catalog):
+    catalog = make_catalog(titles=[{'name': 'Фильм'}], users=3)
+    return catalog.titles[0], catalog.users
+
+
+def rating(title):
+    from reviews.models import Title
+
+    return Title.objects.values_list(
+        'rating_sum', 'rating_count', 'rating'
+    ).get(pk=title.pk)
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_review_writes_shift_rating(self, title_with_authors):
+        from reviews.models import Review
+
+        title, authors = title_with_authors
+        assert rating(title) == (0, 0, None)
+        first = Review.objects.create(
+            author=authors[0], title=title, text='Отзыв', score=4
+        )
+        Review.objects.create(
+            author=authors[1], title=title, text='Отзыв', score=8
+        )
+        assert rating(title) == (12, 2, 6.0), (
+            'Создание отзыва должно сдвигать сумму, количество и среднее'
+        )
+        first.score = 10
+        first.save()
+        assert rating(title) == (18, 2, 9.0), (
+            'Изменение оценки должно заменять старую оценку новой'
+        )
+        first.delete()
+        assert rating(title) == (8, 1, 8.0), (
+            'Удаление отзыва должно вычитать его оценку'
+        )
+        authors[1].delete()
+        assert rating(title) == (0, 0, None), (
+            'Каскадное удаление отзывов должно обнулять рейтинг'
+        )
+
+    def test_recalculate_ratings(self, title_with_authors):
+        from reviews.models import Review, Title
+
+        title, authors = title_with_authors
+        for author, score in zip(authors, (2, 5, 5)):
+            Review.objects.create(
+                author=author, title=title, text='Отзыв', score=score
+            )
+        Title.objects.update(rating_sum=100, rating_count=1, rating=100,
+                             score_5_count=0)
+        Title.objects.recalculate_ratings()
+        assert rating(title) == (12, 3, 4.0), (
+            'recalculate_ratings должна восстанавливать рейтинг по отзывам'
+        )
+        assert Title.objects.get(pk=title.pk).score_5_count == 2
+
+    def test_stale_save_keeps_rating(self, title_with_authors):
+        from reviews.models import Review, Title
+
+        title, authors = title_with_authors
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(
+            author=authors[0], title=title, text='Отзыв', score=7
+        )
+        stale.name = 'Новое название'
+        stale.save()
+        assert rating(title) == (7, 1, 7.0), (
+            'Сохранение устаревшего экземпляра произведения не должно '
+            'затирать рейтинг, сдвинутый отзывом'
+        )
+        assert Title.objects.get(pk=title.pk).name == 'Новое название'
@@ -0,0 +1,33 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestWarmUp:
+
+    def test_warm_up_primes_reference_cache(self, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from api_yamdb.warmup import warm_up
+
+        warm_up()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/genres/')
+        assert response.status_code == 200
+        assert len(queries) == 0, (
+            'После прогрева список жанров должен отдаваться без запросов к БД'
+        )
+
+    def test_failed_warm_up_starts_cold(self, monkeypatch, caplog):
+        from django.db import OperationalError
+
+        from api_yamdb import warmup
+
+        def fail():
+            raise OperationalError('no such table: reviews_genre')
+
+        monkeypatch.setattr(warmup.registry.genres, 'as_list', fail)
+        warmup.safe_warm_up()
+        assert 'Warm-up failed, starting cold' in caplog.text, (
+            'Ошибка прогрева должна логироваться, а не ронять gunicorn'
+        )